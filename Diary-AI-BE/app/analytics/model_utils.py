@@ -4,8 +4,6 @@ import json
 from pathlib import Path
 from typing import Any
 
-import joblib
-
 MODELS_DIR = Path(__file__).resolve().parent / "models"
 MODELS_DIR.mkdir(exist_ok=True)
 
@@ -15,6 +13,8 @@ def model_path(name: str) -> Path:
 
 
 def save_model(name: str, model: Any, scaler: Any | None = None) -> None:
+    import joblib  # deferred: callers that only need model_path() should not pay for it
+
     payload = {"model": model, "scaler": scaler}
     joblib.dump(payload, model_path(name))
 
@@ -23,6 +23,8 @@ def load_model(name: str) -> tuple[Any | None, Any | None]:
     p = model_path(name)
     if not p.exists():
         return None, None
+    import joblib
+
     try:
         payload = joblib.load(p)
         return payload.get("model"), payload.get("scaler")
@@ -111,16 +111,13 @@ class ActivitiesService:
         return item
 
     async def debug_overview(self, days: int) -> Dict[str, Any]:
-        total, with_pace = await self.repo.debug_counts(days)
-        sample = await self.repo.debug_sample(days)
-        all_cnt = await self.repo.count_all()
-        running_total = await self.repo.count_running_total()
+        ov = await self.repo.debug_overview(days)
         return {
-            'total_count': all_cnt,
-            'running_total': running_total,
-            'running_count': total,
-            'running_with_pace': with_pace,
-            'raw_sample': sample,
+            'total_count': ov['total_count'],
+            'running_total': ov['running_total'],
+            'running_count': ov['running_count'],
+            'running_with_pace': ov['running_with_pace'],
+            'raw_sample': ov['sample'],
         }
 
 __all__ = ["ActivitiesService"]
@@ -18,7 +18,7 @@ class CoreService:
     def get_stats(self) -> Dict[str, Any]:
         query = """
         WITH valid_days AS (
-          SELECT * FROM garmin_daily_summaries
+          SELECT day, steps, calories_burned, resting_heart_rate, stress_avg FROM garmin_daily_summaries
           WHERE NOT (COALESCE(steps,0)=0 AND COALESCE(calories_burned,0)=0)
         )
         SELECT 
@@ -10,58 +10,34 @@ class GymService:
 	def __init__(self, repo: IGymRepository) -> None:
 		self.repo = repo
 
-	def list_templates(self) -> list:
-		return self.repo.load_bucket(TEMPLATES_KEY)
+	async def list_templates(self) -> list:
+		return await self.repo.load_bucket(TEMPLATES_KEY)
 
-	def upsert_template(self, tpl: dict) -> dict:
-		data = self.repo.load_bucket(TEMPLATES_KEY)
-		data = [d for d in data if d.get('id') != tpl.get('id')]
-		data.append(tpl)
-		self.repo.save_bucket(TEMPLATES_KEY, data)
+	async def upsert_template(self, tpl: dict) -> dict:
+		await self.repo.append_bucket(TEMPLATES_KEY, [tpl])
 		return tpl
 
-	def delete_template(self, tpl_id: str) -> bool:
-		data = self.repo.load_bucket(TEMPLATES_KEY)
-		new_data = [d for d in data if d.get('id') != tpl_id]
-		if len(new_data) == len(data):
-			return False
-		self.repo.save_bucket(TEMPLATES_KEY, new_data)
-		return True
+	async def delete_template(self, tpl_id: str) -> bool:
+		return await self.repo.remove_from_bucket(TEMPLATES_KEY, tpl_id)
 
-	def list_sessions(self) -> list:
-		return self.repo.load_bucket(SESSIONS_KEY)
+	async def list_sessions(self) -> list:
+		return await self.repo.load_bucket(SESSIONS_KEY)
 
-	def upsert_session(self, session: dict) -> dict:
-		data = self.repo.load_bucket(SESSIONS_KEY)
-		data = [d for d in data if d.get('id') != session.get('id')]
-		data.append(session)
-		self.repo.save_bucket(SESSIONS_KEY, data)
+	async def upsert_session(self, session: dict) -> dict:
+		await self.repo.append_bucket(SESSIONS_KEY, [session])
 		return session
 
-	def delete_session(self, session_id: str) -> bool:
-		data = self.repo.load_bucket(SESSIONS_KEY)
-		new_data = [d for d in data if d.get('id') != session_id]
-		if len(new_data) == len(data):
-			return False
-		self.repo.save_bucket(SESSIONS_KEY, new_data)
-		return True
+	async def delete_session(self, session_id: str) -> bool:
+		return await self.repo.remove_from_bucket(SESSIONS_KEY, session_id)
 
-	def list_manual_1rm(self) -> list:
-		return self.repo.load_bucket(MANUAL1RM_KEY)
+	async def list_manual_1rm(self) -> list:
+		return await self.repo.load_bucket(MANUAL1RM_KEY)
 
-	def upsert_manual_1rm(self, entry: dict) -> dict:
-		data = self.repo.load_bucket(MANUAL1RM_KEY)
-		data = [d for d in data if d.get('id') != entry.get('id')]
-		data.append(entry)
-		self.repo.save_bucket(MANUAL1RM_KEY, data)
+	async def upsert_manual_1rm(self, entry: dict) -> dict:
+		await self.repo.append_bucket(MANUAL1RM_KEY, [entry])
 		return entry
 
-	def delete_manual_1rm(self, entry_id: str) -> bool:
-		data = self.repo.load_bucket(MANUAL1RM_KEY)
-		new_data = [d for d in data if d.get('id') != entry_id]
-		if len(new_data) == len(data):
-			return False
-		self.repo.save_bucket(MANUAL1RM_KEY, new_data)
-		return True
+	async def delete_manual_1rm(self, entry_id: str) -> bool:
+		return await self.repo.remove_from_bucket(MANUAL1RM_KEY, entry_id)
 
 __all__ = ["GymService"]
@@ -24,7 +24,7 @@ class JournalAnalyticsService:
                sleep_quality_rating, soreness_level, social_interactions_quality,
                digestion_quality, workout_intensity_rating, hrv_manual, resting_hr_manual
         FROM daily_journal
-        WHERE day BETWEEN %s - INTERVAL '%s day' AND %s
+        WHERE day BETWEEN %s::date - make_interval(days => %s) AND %s
         ORDER BY day
         """
         )
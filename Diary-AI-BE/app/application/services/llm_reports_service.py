@@ -13,10 +13,9 @@ def ensure_table() -> None:
     sql = SQL_FILE.read_text(encoding='utf-8') if SQL_FILE.exists() else None
     if not sql:
         return
-    with get_connection() as conn:
-        with conn.cursor() as cur:  # type: ignore[attr-defined]
-            cur.execute(sql)
-            conn.commit()
+    # Re-run by the daily scheduler: execute_query never server-side prepares parameterless
+    # SQL, which this multi-statement script could not survive
+    execute_query(sql, fetch_all=False)
 
 
 def upsert_report(day_iso: str, language: str, days_window: int, report: str, raw: Optional[dict[str, Any]] = None) -> dict[str, Any]:
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import date, datetime
 from domain.repositories.sleeps import ISleepsRepository
 
@@ -49,7 +49,7 @@ class SleepsService:
 			item['duration_min'] = round((item['sleep_duration_seconds'] or 0) / 60.0)
 		return item
 
-	async def latest(self, limit: int, offset: int, start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+	def _range_where(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
 		conditions = ["sleep_start IS NOT NULL"]
 		params: List[Any] = []
 		if start_date:
@@ -58,9 +58,21 @@ class SleepsService:
 		if end_date:
 			conditions.append("sleep_start <= %s")
 			params.append(end_date)
-		where_clause = " AND ".join(conditions)
-		total = await self.repo.count_in_range(where_clause, tuple(params))
-		rows = await self.repo.fetch_latest(where_clause, tuple(params), limit, offset)
+		return " AND ".join(conditions), tuple(params)
+
+	async def export(self, start_date: Optional[str], end_date: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+		"""Stream normalized sessions in range (no embedded events) for bulk export."""
+		where_clause, params = self._range_where(start_date, end_date)
+		async for r in self.repo.iter_latest(where_clause, params):
+			item = self._normalize_row(r)
+			label = self._phase_label(item.get('last_sleep_phase'))
+			if label:
+				item['last_sleep_phase_label'] = label
+			yield item
+
+	async def latest(self, limit: int, offset: int, start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+		where_clause, params = self._range_where(start_date, end_date)
+		rows, total = await self.repo.fetch_page(where_clause, params, limit, offset)
 		# Fetch sleep events for each unique day returned so the frontend can compute
 		# 'last_pre_wake_phase' from the embedded events. Perform in parallel.
 		items: List[Dict[str, Any]] = []
@@ -296,9 +308,6 @@ class SleepsService:
 		return self._normalize_row(dict(row))
 
 	async def delete_sleep(self, sleep_id: int) -> bool:
-		if not await self.repo.exists(sleep_id):
-			return False
-		await self.repo.delete(sleep_id)
-		return True
+		return await self.repo.delete(sleep_id)
 
 __all__ = ["SleepsService"]
@@ -46,31 +46,31 @@ class StrengthService:
         return {"slope": float(slope), "intercept": float(intercept), "r2": float(r2)}
 
     # Catalog
-    def list_muscle_groups(self) -> list[dict]:
-        return self.repo.list_muscle_groups()
+    async def list_muscle_groups(self) -> list[dict]:
+        return await self.repo.list_muscle_groups()
 
-    def search_exercises(self, *, query: str | None, muscle_group_id: int | None) -> list[dict]:
-        return self.repo.search_exercises(query=query, muscle_group_id=muscle_group_id)
+    async def search_exercises(self, *, query: str | None, muscle_group_id: int | None) -> list[dict]:
+        return await self.repo.search_exercises(query=query, muscle_group_id=muscle_group_id)
 
-    def list_exercises(self) -> list[dict]:
-        return self.repo.list_exercises()
+    async def list_exercises(self) -> list[dict]:
+        return await self.repo.list_exercises()
 
     # Workouts
-    def save_workout(self, payload: dict) -> dict:
+    async def save_workout(self, payload: dict) -> dict:
         # compute derived metrics client-side if needed later; for now just persist
-        return self.repo.create_workout(payload)
+        return await self.repo.create_workout(payload)
 
-    def get_workout(self, workout_id: int) -> Optional[dict]:
-        return self.repo.get_workout(workout_id)
+    async def get_workout(self, workout_id: int) -> Optional[dict]:
+        return await self.repo.get_workout(workout_id)
 
-    def list_workouts(self, *, limit: int = 50, offset: int = 0) -> list[dict]:
-        return self.repo.list_workouts(limit=limit, offset=offset)
+    async def list_workouts(self, *, limit: int = 50, offset: int = 0) -> list[dict]:
+        return await self.repo.list_workouts(limit=limit, offset=offset)
 
-    def update_workout(self, workout_id: int, payload: dict) -> dict:
-        return self.repo.update_workout(workout_id, payload)
+    async def update_workout(self, workout_id: int, payload: dict) -> Optional[dict]:
+        return await self.repo.update_workout(workout_id, payload)
 
-    def delete_workout(self, workout_id: int) -> bool:
-        return self.repo.delete_workout(workout_id)
+    async def delete_workout(self, workout_id: int) -> bool:
+        return await self.repo.delete_workout(workout_id)
 
     # Metrics
     def exercise_log_metrics(self, exercise_log: dict) -> dict:
@@ -81,11 +81,11 @@ class StrengthService:
             "bestE1RM": round(max(e1rms) if e1rms else 0.0, 2),
         }
 
-    def session_muscle_group_volumes(self, workout: dict) -> dict:
+    async def session_muscle_group_volumes(self, workout: dict) -> dict:
         # Build map primary MG -> volume; ignore secondary for initial version
         mg_map: dict[int, float] = {}
         # prefetch exercise meta
-        ex_by_id = {ex["id"]: ex for ex in self.repo.list_exercises()}
+        ex_by_id = {ex["id"]: ex for ex in await self.repo.list_exercises()}
         for log in workout.get("exercises", []) or []:
             ex_def = ex_by_id.get(log.get("exercise_definition_id") or log.get("exerciseDefinitionId"))
             if not ex_def:
@@ -97,8 +97,8 @@ class StrengthService:
         return mg_map
 
     # Suggestions
-    def suggestion_for_next(self, *, exercise_definition_id: int) -> Optional[dict]:
-        last = self.repo.last_exercise_log(exercise_definition_id)
+    async def suggestion_for_next(self, *, exercise_definition_id: int) -> Optional[dict]:
+        last = await self.repo.last_exercise_log(exercise_definition_id)
         if not last or not last.get("sets"):
             return None
         # Aggregate basic pattern: detect typical scheme (same reps/weight across working sets)
@@ -136,53 +136,53 @@ class StrengthService:
             "suggestions": suggestions,
         }
 
-    def exercise_stats(self, exercise_definition_id: int) -> dict:
+    async def exercise_stats(self, exercise_definition_id: int) -> dict:
         # type: ignore[attr-defined]
         if hasattr(self.repo, "exercise_stats"):
-            return self.repo.exercise_stats(exercise_definition_id)  # type: ignore[misc]
+            return await self.repo.exercise_stats(exercise_definition_id)  # type: ignore[misc]
         return {"series": []}
 
-    def muscle_group_weekly_volume(self, muscle_group_id: int, weeks: int = 12) -> dict:
+    async def muscle_group_weekly_volume(self, muscle_group_id: int, weeks: int = 12) -> dict:
         if hasattr(self.repo, "muscle_group_weekly_volume"):
-            rows = self.repo.muscle_group_weekly_volume(muscle_group_id, weeks)  # type: ignore[misc]
+            rows = await self.repo.muscle_group_weekly_volume(muscle_group_id, weeks)  # type: ignore[misc]
             return {"series": rows}
         return {"series": []}
 
-    def exercise_contribution_last_month(self, muscle_group_id: int, days: int = 30) -> dict:
+    async def exercise_contribution_last_month(self, muscle_group_id: int, days: int = 30) -> dict:
         if hasattr(self.repo, "exercise_contribution_last_month"):
-            rows = self.repo.exercise_contribution_last_month(muscle_group_id, days)  # type: ignore[misc]
+            rows = await self.repo.exercise_contribution_last_month(muscle_group_id, days)  # type: ignore[misc]
             return {"series": rows}
         return {"series": []}
 
-    def weekly_training_frequency(self, muscle_group_id: int, weeks: int = 12) -> dict:
+    async def weekly_training_frequency(self, muscle_group_id: int, weeks: int = 12) -> dict:
         if hasattr(self.repo, "weekly_training_frequency"):
-            rows = self.repo.weekly_training_frequency(muscle_group_id, weeks)  # type: ignore[misc]
+            rows = await self.repo.weekly_training_frequency(muscle_group_id, weeks)  # type: ignore[misc]
             return {"series": rows}
         return {"series": []}
 
-    def exercise_history(self, exercise_definition_id: int, limit: int = 20) -> dict:
+    async def exercise_history(self, exercise_definition_id: int, limit: int = 20) -> dict:
         if hasattr(self.repo, "exercise_history"):
-            rows = self.repo.exercise_history(exercise_definition_id, limit)  # type: ignore[misc]
+            rows = await self.repo.exercise_history(exercise_definition_id, limit)  # type: ignore[misc]
             return {"items": rows}
         return {"items": []}
 
     # Aggregated analytics for dashboard and charts
-    def exercise_e1rm_progress(self, exercise_definition_id: int) -> dict:
+    async def exercise_e1rm_progress(self, exercise_definition_id: int) -> dict:
         if hasattr(self.repo, "exercise_e1rm_progress"):
-            rows = self.repo.exercise_e1rm_progress(exercise_definition_id)  # type: ignore[misc]
+            rows = await self.repo.exercise_e1rm_progress(exercise_definition_id)  # type: ignore[misc]
             return {"series": rows}
         return {"series": []}
 
-    def workouts_volume_series(self, days: int = 90) -> dict:
+    async def workouts_volume_series(self, days: int = 90) -> dict:
         if hasattr(self.repo, "workouts_volume_series"):
-            rows = self.repo.workouts_volume_series(days)  # type: ignore[misc]
+            rows = await self.repo.workouts_volume_series(days)  # type: ignore[misc]
             return {"series": rows}
         return {"series": []}
 
-    def exercise_summary(self, exercise_definition_id: int, days: int = 180) -> dict:
+    async def exercise_summary(self, exercise_definition_id: int, days: int = 180) -> dict:
         # Summarize progress using e1RM time series: slope (per point index), r2, last PR, last PR date
         if hasattr(self.repo, "exercise_e1rm_progress"):
-            series = self.repo.exercise_e1rm_progress(exercise_definition_id)  # type: ignore[misc]
+            series = await self.repo.exercise_e1rm_progress(exercise_definition_id)  # type: ignore[misc]
         else:
             series = []
         ys = [float(row.get("best_e1rm") or 0) for row in series]
@@ -206,10 +206,10 @@ class StrengthService:
             "lastPRDate": last_pr_date,
         }
 
-    def top_progress(self, days: int = 90, limit: int = 5) -> dict:
+    async def top_progress(self, days: int = 90, limit: int = 5) -> dict:
         # Compute slope per exercise and return top ascending trends
         if hasattr(self.repo, "all_exercises_e1rm_progress"):
-            rows = self.repo.all_exercises_e1rm_progress(days)  # type: ignore[misc]
+            rows = await self.repo.all_exercises_e1rm_progress(days)  # type: ignore[misc]
         else:
             rows = []
         # Group by exercise id
@@ -218,7 +218,7 @@ class StrengthService:
             ex_id = int(r.get("exercise_definition_id"))
             by_ex.setdefault(ex_id, []).append(r)
         # Build id->name map
-        names = {ex["id"]: ex["name"] for ex in self.repo.list_exercises()}
+        names = {ex["id"]: ex["name"] for ex in await self.repo.list_exercises()}
         items = []
         for ex_id, series in by_ex.items():
             ys = [float(row.get("best_e1rm") or 0) for row in series]
@@ -247,14 +247,14 @@ class StrengthService:
         items.sort(key=lambda x: x["slope"], reverse=True)
         return {"items": items[: max(1, int(limit))]}
 
-    def correlations(self, days: int = 90) -> dict:
+    async def correlations(self, days: int = 90) -> dict:
         # Correlate daily total strength volume with basic training load proxies: logs_count and sets_count
         if hasattr(self.repo, "workouts_volume_series"):
-            vol = self.repo.workouts_volume_series(days)  # type: ignore[misc]
+            vol = await self.repo.workouts_volume_series(days)  # type: ignore[misc]
         else:
             vol = []
         if hasattr(self.repo, "daily_strength_counts"):
-            counts = self.repo.daily_strength_counts(days)  # type: ignore[misc]
+            counts = await self.repo.daily_strength_counts(days)  # type: ignore[misc]
         else:
             counts = []
         vmap = {str(r["day"]): float(r.get("total_volume") or 0) for r in vol}
@@ -289,19 +289,19 @@ class StrengthService:
         }
 
     # Templates
-    def list_templates(self) -> list[dict]:
+    async def list_templates(self) -> list[dict]:
         if hasattr(self.repo, "list_templates"):
-            return self.repo.list_templates()  # type: ignore[misc]
+            return await self.repo.list_templates()  # type: ignore[misc]
         return []
 
-    def upsert_template(self, tpl: dict) -> dict:
+    async def upsert_template(self, tpl: dict) -> dict:
         if hasattr(self.repo, "upsert_template"):
-            return self.repo.upsert_template(tpl)  # type: ignore[misc]
+            return await self.repo.upsert_template(tpl)  # type: ignore[misc]
         return tpl
 
-    def delete_template(self, tpl_id: str) -> bool:
+    async def delete_template(self, tpl_id: str) -> bool:
         if hasattr(self.repo, "delete_template"):
-            return self.repo.delete_template(tpl_id)  # type: ignore[misc]
+            return await self.repo.delete_template(tpl_id)  # type: ignore[misc]
         return False
 
 __all__ = ["StrengthService", "epley_e1rm", "set_volume"]
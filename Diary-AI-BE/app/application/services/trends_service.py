@@ -18,7 +18,7 @@ class TrendsService:
             (light_sleep_seconds/60.0) as light_sleep,
             (rem_sleep_seconds/60.0) as rem_sleep
         FROM garmin_sleep_sessions 
-        WHERE day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_sleep_sessions) - INTERVAL '%s days'
+        WHERE day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_sleep_sessions) - make_interval(days => %s)
         ORDER BY day DESC
         LIMIT %s
         """
@@ -37,7 +37,7 @@ class TrendsService:
             day,
             weight_kg as weight
         FROM garmin_weight 
-        WHERE day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_sleep_sessions) - INTERVAL '%s days'
+        WHERE day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_sleep_sessions) - make_interval(days => %s)
         ORDER BY day DESC
         """
         data = execute_query(query, (days,)) or []
@@ -9,12 +9,12 @@ class WeightService:
 		self.repo = repo
 
 	def get_current(self) -> dict:
-		row = self.repo.latest()
+		summary = self.repo.latest_summary()
+		if not summary:
+			raise LookupError("no weight data")
+		row = summary.get("latest")
 		if not row:
-			empty = self.repo.latest_day_only()
-			if not empty:
-				raise LookupError("no weight data")
-			day = empty.get("day")
+			day = summary.get("latest_day")
 			if hasattr(day, "isoformat"):
 				day = day.isoformat()
 			return {
@@ -33,6 +33,8 @@ from app.blueprints import (
 from presentation.controllers.llm_controller import _build_health_brief
 from application.services.llm_reports_service import ensure_table, upsert_report
 from application.services.llm_service import LLMService
+from presentation.di import di
+from app.db import close_async_pool, open_async_pool
 from app.presentation.routers.weight import router as weight_router
 
 load_dotenv("config.env")
@@ -184,7 +186,7 @@ async def _scheduler_loop():  # pragma: no cover
         if not enabled:
             logger.info("LLM report scheduler disabled via env")
             return
-        ensure_table()
+        await asyncio.to_thread(ensure_table)
         llm_days = int(os.getenv("LLM_REPORT_DAYS", "30"))
         language = os.getenv("LLM_REPORT_LANGUAGE", "pl")
         hour = int(os.getenv("LLM_SCHEDULE_HOUR", "8"))
@@ -198,14 +200,14 @@ async def _scheduler_loop():  # pragma: no cover
             wait_sec = (run_at - now).total_seconds()
             await asyncio.sleep(wait_sec)
             try:
-                brief = _build_health_brief(llm_days)
+                brief = await asyncio.to_thread(_build_health_brief, llm_days)
                 messages = [
                     {"role": "system", "content": f"You are a health assistant. Prepare a concise report ({llm_days} days)."},
                     {"role": "user", "content": f"Data for the report (JSON/text):\n{brief}"},
                 ]
                 res = await client.chat(messages, temperature=0.2, max_tokens=700, top_p=0.9)
                 content = res.get("content", "")
-                upsert_report(date.today().isoformat(), language, llm_days, content, res.get("raw"))
+                await asyncio.to_thread(upsert_report, date.today().isoformat(), language, llm_days, content, res.get("raw"))
                 logger.info("Daily LLM health report stored")
             except Exception as e:
                 logger.exception("Failed to generate/store daily LLM report: %s", e)
@@ -223,7 +225,21 @@ async def _on_startup():  # pragma: no cover
             "GarminDb configuration not found at %s. Run ./setup_garmindb.sh (outside container) or configure credentials.",
             str(cfg),
         )
+    try:
+        # Fill the pool's min_size connections now rather than on the first requests
+        await open_async_pool(wait=True)
+    except Exception as e:
+        logging.getLogger("startup").warning("DB pool warm-up failed: %s", e)
+    try:
+        await di.strength_repo().ensure_tables()
+    except Exception as e:
+        logging.getLogger("startup").warning("Strength schema init failed: %s", e)
     asyncio.create_task(_scheduler_loop())
 
 
+@app.on_event("shutdown")
+async def _on_shutdown():  # pragma: no cover
+    await close_async_pool()
+
+
 __all__ = ["app"]
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from contextlib import contextmanager, suppress, asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, Iterable, Iterator, Mapping
+from typing import Any, AsyncIterator, Iterable, Iterator, Mapping, Sequence
+import asyncio
+from uuid import uuid4
 import os
 
 from app.utils import DbConfig, load_env, get_logger
@@ -52,6 +54,21 @@ class _ConnConfig:
         return cls(host=c.host, port=c.port, name=c.name, user=c.user, password=c.password)
 
 
+def _prepare_threshold(env: str = "DB_PREPARE_THRESHOLD", default: str = "0") -> int | None:
+    """prepare_threshold for pooled connections, read from ``env``.
+
+    The async pool (DB_PREPARE_THRESHOLD, default 0) prepares on first execute; the sync pool
+    (DB_SYNC_PREPARE_THRESHOLD, default 1) prepares a statement on its second execute, so the
+    one-off multi-statement migration scripts run through its raw cursors never get prepared.
+    Set either to 'none' to disable server-side prepared statements, e.g. behind a PgBouncer
+    in transaction mode that cannot track them.
+    """
+    raw = os.getenv(env, default).strip().lower()
+    if raw in {"", "none", "off", "disable"}:
+        return None
+    return int(raw)
+
+
 def _connect_psycopg3(cfg: _ConnConfig):  # pragma: no cover - I/O wrapper
     # psycopg3 uses connection objects with context manager support
     return psycopg.connect(  # type: ignore[name-defined]
@@ -86,11 +103,16 @@ if _USING_PSYCOPG3:
         AsyncConnectionPool = None  # type: ignore
         ConnectionPool = None  # type: ignore
 
-@asynccontextmanager
-async def get_async_connection():
-    """Yield an async connection from a global pool.
+_ASYNC_POOL_LOCK = asyncio.Lock()
 
-    If psycopg3 or psycopg_pool are not available, raises RuntimeError.
+
+async def open_async_pool(*, wait: bool = False) -> Any:
+    """Create and open the process-wide AsyncConnectionPool (idempotent).
+
+    Sizing via env: DB_POOL_MIN (default 5) connections are kept open so a burst does not
+    pay connect latency, DB_POOL_MAX (default 20) caps it, and DB_POOL_TIMEOUT (seconds,
+    default 10) bounds how long a caller waits for a free connection. With ``wait=True``
+    (used at startup) this returns only once min_size connections are established.
     """
     if not _USING_PSYCOPG3:
         raise RuntimeError("Async DB not available: psycopg3 not in use")
@@ -100,16 +122,46 @@ async def get_async_connection():
         raise RuntimeError("psycopg_pool not installed; run `pip install psycopg[pool]`") from e
 
     global _ASYNC_POOL
-    if _ASYNC_POOL is None:
-        cfg = _ConnConfig.from_env()
-        conninfo = f"host={cfg.host} port={cfg.port} dbname={cfg.name} user={cfg.user} password={cfg.password}"
-        _ASYNC_POOL = AsyncConnectionPool(
-            conninfo=conninfo,
-            min_size=int(os.getenv("DB_POOL_MIN", "1")),
-            max_size=int(os.getenv("DB_POOL_MAX", "20")),
-            kwargs={"autocommit": False},
-        )
-    async with _ASYNC_POOL.connection() as conn:  # type: ignore[union-attr]
+    async with _ASYNC_POOL_LOCK:
+        if _ASYNC_POOL is None:
+            cfg = _ConnConfig.from_env()
+            conninfo = f"host={cfg.host} port={cfg.port} dbname={cfg.name} user={cfg.user} password={cfg.password}"
+            timeout = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+            pool = AsyncConnectionPool(
+                conninfo=conninfo,
+                min_size=int(os.getenv("DB_POOL_MIN", "5")),
+                max_size=int(os.getenv("DB_POOL_MAX", "20")),
+                timeout=timeout,
+                kwargs={"autocommit": False, "prepare_threshold": _prepare_threshold()},
+                open=False,
+            )
+            try:
+                await pool.open(wait=wait, timeout=timeout)
+            except Exception:
+                # Do not leave the pool's workers and partial connections behind
+                await pool.close()
+                raise
+            _ASYNC_POOL = pool
+    return _ASYNC_POOL
+
+
+async def close_async_pool() -> None:
+    """Close the shared async pool (application shutdown)."""
+    global _ASYNC_POOL
+    async with _ASYNC_POOL_LOCK:
+        if _ASYNC_POOL is not None:
+            pool, _ASYNC_POOL = _ASYNC_POOL, None
+            await pool.close()
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """Yield an async connection from the global pool (opened on first use if startup did not).
+
+    If psycopg3 or psycopg_pool are not available, raises RuntimeError.
+    """
+    pool = _ASYNC_POOL or await open_async_pool()
+    async with pool.connection() as conn:  # type: ignore[union-attr]
         yield conn
 
 async def async_execute_query(
@@ -118,7 +170,10 @@ async def async_execute_query(
     *,
     fetch_one: bool = False,
     fetch_all: bool = True,
+    prepare: bool | None = None,
 ) -> list[dict[str, Any]] | dict[str, Any] | bool | None:
+    """Async variant of execute_query; ``prepare=True`` prepares the statement server-side
+    on first use per pooled connection (None defers to the connection's prepare_threshold)."""
     if not _USING_PSYCOPG3:
         raise RuntimeError("async_execute_query requires psycopg3")
     from psycopg.rows import dict_row  # type: ignore
@@ -126,13 +181,14 @@ async def async_execute_query(
     async with get_async_connection() as conn:  # type: ignore
         try:
             async with conn.cursor(row_factory=dict_row) as cur:  # type: ignore[attr-defined]
-                await cur.execute(query, params)
+                if prepare is None and params is None:
+                    prepare = False  # DDL/one-off SQL may hold several statements; never prepare it
+                await cur.execute(query, params, prepare=prepare)
+                # dict_row already builds plain dicts; return them without another copy
                 if fetch_one:
-                    row = await cur.fetchone()
-                    return dict(row) if row is not None else None
+                    return await cur.fetchone()
                 if fetch_all:
-                    rows = await cur.fetchall()
-                    return [dict(r) for r in rows]
+                    return await cur.fetchall()
                 await conn.commit()
                 return True
         except Exception:
@@ -174,7 +230,7 @@ def _get_sync_pool() -> "ConnectionPool":  # type: ignore[return-type]
             conninfo=conninfo,
             min_size=int(os.getenv("DB_POOL_MIN", "1")),
             max_size=int(os.getenv("DB_POOL_MAX", "20")),
-            kwargs={"autocommit": False},
+            kwargs={"autocommit": False, "prepare_threshold": _prepare_threshold("DB_SYNC_PREPARE_THRESHOLD", "1")},
         )
     return _SYNC_POOL
 
@@ -221,12 +277,12 @@ def execute_query(
             if _USING_PSYCOPG3:
                 # psycopg3: use row_factory for dict rows
                 with conn.cursor(row_factory=dict_row) as cur:  # type: ignore[attr-defined]
-                    cur.execute(query, params)
+                    # DDL/one-off SQL may hold several statements; never prepare it
+                    cur.execute(query, params, prepare=False if params is None else None)
                     if fetch_one:
-                        row = cur.fetchone()
-                        return dict(row) if row is not None else None
+                        return cur.fetchone()
                     if fetch_all:
-                        return [dict(r) for r in cur.fetchall()]
+                        return cur.fetchall()
                     conn.commit()
                     return True
             else:
@@ -261,3 +317,197 @@ def execute_query(
             if fetch_one:
                 return None
             return False
+
+
+def execute_raw_script(cur: Any, sql: str) -> None:
+    """Run unparameterized one-off SQL (DDL, migration statements) on a sync cursor.
+
+    On psycopg3 it is kept out of the connection's prepared-statement cache; psycopg2 never prepares.
+    """
+    if _USING_PSYCOPG3:
+        cur.execute(sql, prepare=False)
+    else:
+        cur.execute(sql)
+
+
+def _values_pages(query: str, rows: list[tuple], template: str | None, page_size: int) -> Iterator[tuple[str, list[Any]]]:
+    """Expand the ``VALUES %s`` placeholder of ``query`` page by page (flattened args per page)."""
+    head, _, tail = query.partition("%s")
+    tpl = template or "(" + ",".join(["%s"] * len(rows[0])) + ")"
+    for i in range(0, len(rows), page_size):
+        page = rows[i : i + page_size]
+        yield head + ",".join([tpl] * len(page)) + tail, [v for r in page for v in r]
+
+
+def execute_values(
+    query: str,
+    rows: Iterable[Sequence[Any]],
+    *,
+    template: str | None = None,
+    page_size: int = 1000,
+    fetch: bool = False,
+) -> list[dict[str, Any]] | bool:
+    """Execute a multi-row statement (``psycopg2.extras.execute_values`` semantics).
+
+    ``query`` holds a single ``VALUES %s`` placeholder which is expanded to one
+    ``(..),(..)`` list per page of ``page_size`` rows; all pages run in one transaction.
+
+    - On fetch=True: returns RETURNING rows as list[dict], in input order
+    - Otherwise: commits and returns True on success
+    """
+    rows = [tuple(r) for r in rows]
+    if not rows:
+        return [] if fetch else True
+    with get_connection() as conn:  # type: ignore[assignment]
+        try:
+            if _USING_PSYCOPG3:
+                out: list[dict[str, Any]] = []
+                with conn.cursor(row_factory=dict_row) as cur:  # type: ignore[attr-defined]
+                    for sql, args in _values_pages(query, rows, template, page_size):
+                        cur.execute(sql, args)
+                        if fetch:
+                            out.extend(cur.fetchall())
+                conn.commit()
+                return out if fetch else True
+            from psycopg2.extras import execute_values as _pg2_execute_values  # type: ignore
+
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:  # type: ignore[name-defined]
+                result = _pg2_execute_values(cur, query, rows, template=template, page_size=page_size, fetch=fetch)
+            conn.commit()
+            return [dict(r) for r in result] if fetch else True
+        except Exception:
+            with suppress(Exception):  # type: ignore[name-defined]
+                conn.rollback()
+            try:
+                LOGGER = get_logger("db")
+                LOGGER.exception("DB execute_values failed: %s | rows=%d", query, len(rows))
+            except Exception:
+                pass
+            if os.getenv("DB_DEBUG_RAISE"):
+                raise
+            return [] if fetch else False
+
+
+class AsyncTransaction:
+    """Statements bound to one pooled connection inside a single transaction.
+
+    Obtained from ``async_transaction()``. Unlike async_execute_query, errors propagate
+    (the transaction is rolled back) so callers never see a half-applied write.
+    """
+
+    def __init__(self, conn: Any) -> None:
+        self.conn = conn
+
+    async def fetch_one(self, query: str, params: Iterable[Any] | Mapping[str, Any] | None = None) -> dict[str, Any] | None:
+        async with self.conn.cursor(row_factory=dict_row) as cur:  # type: ignore[attr-defined]
+            await cur.execute(query, params)
+            return await cur.fetchone()
+
+    async def fetch_all(self, query: str, params: Iterable[Any] | Mapping[str, Any] | None = None) -> list[dict[str, Any]]:
+        async with self.conn.cursor(row_factory=dict_row) as cur:  # type: ignore[attr-defined]
+            await cur.execute(query, params)
+            return await cur.fetchall()
+
+    async def execute(self, query: str, params: Iterable[Any] | Mapping[str, Any] | None = None) -> int:
+        """Run a statement without fetching; returns the affected row count."""
+        async with self.conn.cursor() as cur:  # type: ignore[attr-defined]
+            await cur.execute(query, params)
+            return cur.rowcount
+
+    async def execute_values(
+        self,
+        query: str,
+        rows: Iterable[Sequence[Any]],
+        *,
+        template: str | None = None,
+        page_size: int = 1000,
+        fetch: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Multi-row statement as in execute_values; returns RETURNING rows when fetch=True."""
+        rows = [tuple(r) for r in rows]
+        out: list[dict[str, Any]] = []
+        if not rows:
+            return out
+        async with self.conn.cursor(row_factory=dict_row) as cur:  # type: ignore[attr-defined]
+            for sql, args in _values_pages(query, rows, template, page_size):
+                await cur.execute(sql, args)
+                if fetch:
+                    out.extend(await cur.fetchall())
+        return out
+
+    async def copy_rows(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+        """Bulk-load rows with ``COPY table (columns) FROM STDIN``.
+
+        Much cheaper than INSERT for large batches (no per-row parse/plan), but returns no
+        generated values; callers re-select what they need.
+        """
+        from psycopg import sql  # type: ignore
+
+        stmt = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table), sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+        )
+        async with self.conn.cursor() as cur:  # type: ignore[attr-defined]
+            async with cur.copy(stmt) as copy:
+                for r in rows:
+                    await copy.write_row(r)
+
+
+@asynccontextmanager
+async def async_transaction():
+    """Yield an AsyncTransaction; commits when the block exits cleanly, rolls back on error."""
+    if not _USING_PSYCOPG3:
+        raise RuntimeError("async_transaction requires psycopg3")
+    async with get_async_connection() as conn:  # type: ignore
+        async with conn.transaction():  # type: ignore[attr-defined]
+            yield AsyncTransaction(conn)
+
+
+async def async_execute_values(
+    query: str,
+    rows: Iterable[Sequence[Any]],
+    *,
+    template: str | None = None,
+    page_size: int = 1000,
+    fetch: bool = False,
+) -> list[dict[str, Any]] | bool:
+    """Async variant of execute_values (psycopg3 only)."""
+    try:
+        async with async_transaction() as tx:
+            out = await tx.execute_values(query, rows, template=template, page_size=page_size, fetch=fetch)
+        return out if fetch else True
+    except Exception:
+        try:
+            LOGGER = get_logger("db")
+            LOGGER.exception("DB async execute_values failed: %s", query)
+        except Exception:
+            pass
+        if os.getenv("DB_DEBUG_RAISE"):
+            raise
+        return [] if fetch else False
+
+
+async def async_iter_query(
+    query: str,
+    params: Iterable[Any] | Mapping[str, Any] | None = None,
+    *,
+    batch_size: int = 1000,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream dict rows through a named (server-side) cursor, ``batch_size`` rows at a time.
+
+    Memory stays bounded by one batch instead of the whole result set, so use this for
+    exports and other unbounded reads. Errors propagate: a half-consumed stream cannot be
+    turned into an empty result the way async_execute_query does.
+    """
+    if not _USING_PSYCOPG3:
+        raise RuntimeError("async_iter_query requires psycopg3")
+    async with get_async_connection() as conn:  # type: ignore
+        # Named cursors only live inside a transaction
+        async with conn.transaction():  # type: ignore[attr-defined]
+            async with conn.cursor(f"srv_{uuid4().hex}", row_factory=dict_row) as cur:  # type: ignore[attr-defined]
+                await cur.execute(query, params)
+                while True:
+                    batch = await cur.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    for row in batch:
+                        yield row
@@ -11,6 +11,9 @@ class IActivitiesRepository(Protocol):
     async def debug_counts(self, days: int) -> Tuple[int, int]:
         ...
 
+    async def debug_overview(self, days: int) -> dict:
+        ...
+
     async def debug_sample(self, days: int) -> List[dict]:
         ...
 
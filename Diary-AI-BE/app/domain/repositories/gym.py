@@ -2,11 +2,17 @@ from __future__ import annotations
 from typing import Protocol
 
 class IGymRepository(Protocol):
-    def ensure_table(self) -> None:
+    async def ensure_table(self) -> None:
         ...
 
-    def load_bucket(self, key: str) -> list:
+    async def load_bucket(self, key: str) -> list:
         ...
 
-    def save_bucket(self, key: str, payload: list) -> None:
+    async def save_bucket(self, key: str, payload: list) -> None:
+        ...
+
+    async def append_bucket(self, key: str, items: list) -> None:
+        ...
+
+    async def remove_from_bucket(self, key: str, item_id: str) -> bool:
         ...
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Protocol, Any, List, Optional, Tuple
+from typing import Protocol, Any, AsyncIterator, List, Optional, Tuple
 
 class ISleepsRepository(Protocol):
     async def count_in_range(self, where_sql: str, params: Tuple[Any, ...]) -> int:
@@ -8,6 +8,12 @@ class ISleepsRepository(Protocol):
     async def fetch_latest(self, where_sql: str, params: Tuple[Any, ...], limit: int, offset: int) -> List[dict]:
         ...
 
+    async def fetch_page(self, where_sql: str, params: Tuple[Any, ...], limit: int, offset: int) -> Tuple[List[dict], int]:
+        ...
+
+    def iter_latest(self, where_sql: str, params: Tuple[Any, ...]) -> AsyncIterator[dict]:
+        ...
+
     async def get_by_id(self, sleep_id: int) -> Optional[dict]:
         ...
 
@@ -8,6 +8,9 @@ class IWeightRepository(Protocol):
     def latest_day_only(self) -> Optional[dict]:
         ...
 
+    def latest_summary(self) -> Optional[dict]:
+        ...
+
     def history(self, limit_days: int) -> list[dict]:
         ...
 
@@ -1,3 +1,4 @@
+from bisect import bisect_left, insort
 import math
 import os
 from statistics import mean, stdev
@@ -31,6 +32,32 @@ def correlation(x, y):
     
     return numerator / denominator
 
+def rolling_median(seq, window, min_count=1, include_current=True):
+    """Trailing rolling median of ``seq`` (None values skipped).
+
+    Keeps the window in a sorted list updated with bisect insert/remove, instead of
+    re-sorting every window. Entry i covers seq[i-window+1..i] (or seq[i-window..i-1]
+    when ``include_current`` is False) and is None with fewer than ``min_count`` values.
+    """
+    out = []
+    ordered = []
+    lag = 0 if include_current else 1
+    for i in range(len(seq)):
+        j = i - lag
+        if j >= 0 and seq[j] is not None:
+            insort(ordered, seq[j])
+        k = j - window
+        if k >= 0 and seq[k] is not None:
+            del ordered[bisect_left(ordered, seq[k])]
+        n = len(ordered)
+        if n < min_count or n == 0:
+            out.append(None)
+        elif n % 2 == 1:
+            out.append(ordered[n // 2])
+        else:
+            out.append((ordered[n // 2 - 1] + ordered[n // 2]) / 2.0)
+    return out
+
 load_dotenv('config.env')
 
 class EnhancedHealthAnalytics:
@@ -207,7 +234,7 @@ class EnhancedHealthAnalytics:
             GROUP BY DATE(ts)
         ) rr_stats ON g.day = rr_stats.day
     -- Anchor window to latest day in daily summaries (broader coverage than sleep sessions)
-    WHERE g.day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_daily_summaries) - INTERVAL '%s days'
+    WHERE g.day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_daily_summaries) - make_interval(days => %s)
         ORDER BY g.day DESC
         """
         
@@ -298,6 +325,30 @@ class EnhancedHealthAnalytics:
         ORDER BY g.day ASC
         """
         return execute_query(query, (start_date, end_date))
+
+    def get_period_averages(self, start_date, end_date):
+        """Average the period-comparison metrics between dates (inclusive) in SQL.
+
+        Returns one row of ``<metric>_avg`` floats (None when no value) plus ``count``, the number
+        of rows the range query above would return for the same dates.
+        """
+        query = """
+        SELECT
+            AVG(g.steps)::float8 AS steps_avg,
+            AVG(g.calories_burned)::float8 AS calories_total_avg,
+            AVG(g.resting_heart_rate)::float8 AS rhr_avg,
+            AVG(g.stress_avg)::float8 AS stress_avg_avg,
+            AVG(s.sleep_score)::float8 AS sleep_score_avg,
+            AVG(s.time_in_bed_minutes)::float8 AS time_in_bed_minutes_avg,
+            AVG(d.mood)::float8 AS mood_avg,
+            AVG(d.energy_level)::float8 AS energy_level_avg,
+            COUNT(*) AS count
+        FROM garmin_daily_summaries g
+        LEFT JOIN garmin_sleep_sessions s ON g.day = s.day
+        LEFT JOIN daily_journal d ON g.day = d.day
+        WHERE g.day >= %s AND g.day <= %s
+        """
+        return execute_query(query, (start_date, end_date), fetch_one=True)
     
     def get_recovery_trend_range(self, start_date, end_date):
         """Compute daily recovery score series for a date range (inclusive)."""
@@ -1005,27 +1056,13 @@ class EnhancedHealthAnalytics:
         hrv_stdev = (_stats.stdev(hrvs_all) if len(hrvs_all) > 1 else 0) if hrvs_all else None
 
         # Rolling median baselines per day (window=14) for adaptive scoring
-        rolling_rhr_baselines = []  # list of baselines (median of prev window)
-        rolling_hrv_baselines = []
         window = 14
         # Build simple aligned arrays preserving order of recovery_data
         rhr_sequence = [m.get('rhr') for m in recovery_data]
         hrv_sequence = [m.get('hrv') for m in recovery_data]
-        def _rolling_median(seq, i):
-            start = max(0, i - window)
-            subset = [v for v in seq[start:i] if v is not None]
-            if len(subset) < 5:  # need enough history
-                return None
-            s = sorted(subset)
-            mid = len(s)//2
-            if len(s) % 2 == 1:
-                return s[mid]
-            return (s[mid-1]+s[mid])/2.0
-        for i,_row in enumerate(recovery_data):
-            rb = _rolling_median(rhr_sequence, i)
-            hb = _rolling_median(hrv_sequence, i)
-            rolling_rhr_baselines.append(rb)
-            rolling_hrv_baselines.append(hb)
+        # Median of the previous `window` values; need >= 5 for enough history
+        rolling_rhr_baselines = rolling_median(rhr_sequence, window, min_count=5, include_current=False)
+        rolling_hrv_baselines = rolling_median(hrv_sequence, window, min_count=5, include_current=False)
 
         # Build EMA for HRV (used after sufficient history for adaptive cap)
         hrv_ema_series = []
@@ -1273,21 +1310,8 @@ class EnhancedHealthAnalytics:
             component_trend_series.append(trend_row)
         
         # --- Post-process: add 3-day rolling median smoothing for hrv_raw ---
-        def _rolling_median_simple(values, window=3):
-            out = []
-            from statistics import median
-            for i in range(len(values)):
-                window_vals = [v for v in values[max(0,i-window+1):i+1] if v is not None]
-                if window_vals:
-                    try:
-                        out.append(median(window_vals))
-                    except Exception:
-                        out.append(window_vals[-1])
-                else:
-                    out.append(None)
-            return out
         hrv_raw_series = [r.get('hrv_raw') for r in component_trend_series]
-        hrv_raw_smoothed = _rolling_median_simple(hrv_raw_series, 3)
+        hrv_raw_smoothed = rolling_median(hrv_raw_series, 3)
         for i, sm in enumerate(hrv_raw_smoothed):
             component_trend_series[i]['hrv_raw_smoothed'] = sm
 
@@ -1,11 +1,21 @@
-from datetime import datetime
+from datetime import datetime, time as _time
+import hashlib
+import heapq
+from operator import itemgetter
 import os
 from statistics import mean, stdev, median
 import math
 
 from dotenv import load_dotenv
+import numpy as np
+from app.lib.cache import TTLCache
 from db import execute_query
 
+try:  # optional JIT for the recovery numeric kernels; NumPy fallbacks are used without it
+    from numba import njit
+except ImportError:  # pragma: no cover - numba not installed
+    njit = None
+
 load_dotenv('config.env')
 
 # Database configuration
@@ -25,6 +35,257 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=True):
     except Exception:
         return None
 
+
+# Per-run keys projected into the running chart timeseries (every key is always present on a run dict)
+_RUN_TIMESERIES_KEYS = (
+    'start_time', 'day', 'distance_km', 'avg_pace', 'avg_hr', 'avg_rr', 'max_rr',
+    'avg_steps_per_min', 'avg_step_length_m', 'avg_vertical_oscillation', 'avg_vertical_ratio',
+    'avg_ground_contact_time', 'vo2_max', 'avg_stress',
+)
+_run_timeseries_values = itemgetter(*_RUN_TIMESERIES_KEYS)
+
+# Minimum number of runs before pace-form and training-load blocks are computed
+_MIN_RUNS_FOR_FORM = 7
+
+# Minimum HRV and resting-HR observations before the full recovery pattern analysis runs
+_MIN_RECOVERY_SAMPLES = 10
+
+
+def _pearson_matrix(X):
+    """Pairwise-complete Pearson matrix for an (N, F) float array with NaN for missing values.
+
+    All F x F cells come from a handful of matrix products over the presence mask instead of
+    one Python pass per pair. Cells with fewer than 3 shared samples or zero variance are NaN.
+    """
+    M = ~np.isnan(X)
+    Mf = M.astype(np.float64)
+    # Shift each column by its own mean first; Pearson is shift-invariant and this keeps the
+    # sum-of-squares form below numerically well-conditioned
+    X0 = np.where(M, X, 0.0)
+    X0 = np.where(M, X0 - X0.sum(axis=0) / np.maximum(M.sum(axis=0), 1), 0.0)
+    n = Mf.T @ Mf
+    sx = X0.T @ Mf            # sx[i, j]: sum of column i over rows where i and j are both present
+    sxx = (X0 * X0).T @ Mf
+    sxy = X0.T @ X0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx * sx / n
+        var_y = var_x.T
+        # relative tolerance: a constant column leaves only rounding noise in var
+        valid = (n >= 3) & (var_x > 1e-12 * sxx) & (var_y > 1e-12 * sxx.T)
+        r = np.where(valid, cov / np.sqrt(var_x * var_y), np.nan)
+    return r
+
+
+def _trailing_nanmedian(values, window, min_count=1, include_current=True):
+    """NaN-aware median of the trailing `window` values at every index.
+
+    With include_current=False only prior values are used. Indices with fewer than
+    `min_count` valid values in their window are NaN.
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    pad = window - 1 if include_current else window
+    padded = np.concatenate((np.full(pad, np.nan), values))
+    win = np.lib.stride_tricks.sliding_window_view(padded, window)[:n]
+    ok = (~np.isnan(win)).sum(axis=1) >= min_count
+    if ok.any():
+        out[ok] = np.nanmedian(win[ok], axis=1)
+    return out
+
+
+def _nan_to_none(arr):
+    """Convert a float array to a list of Python floats with NaN mapped to None."""
+    return [None if math.isnan(v) else v for v in arr.tolist()]
+
+
+def _prefix_sums(values):
+    """Column-wise prefix sums and valid counts (NaN skipped), each with a leading zero row."""
+    valid = ~np.isnan(values)
+    zero = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate((zero, np.cumsum(np.where(valid, values, 0.0), axis=0)))
+    counts = np.concatenate((zero, np.cumsum(valid, axis=0)))
+    return sums, counts
+
+
+def _window_mean(prefix, lo, hi):
+    """Mean of rows [lo, hi) from _prefix_sums output; NaN where the window has no values."""
+    sums, counts = prefix
+    n = counts[hi] - counts[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n > 0, (sums[hi] - sums[lo]) / n, np.nan)
+
+
+def _steps_load_score(steps):
+    """Activity-load component for daily steps (array-aware): penalize very low and very high volume."""
+    return np.where(
+        steps < 4000, np.maximum(0.0, 50.0 - (4000 - steps) / 80.0),
+        np.where(steps > 15000, np.maximum(0.0, 80.0 - (steps - 15000) / 150.0), 90.0),
+    )
+
+
+def _hrv_scores_np(hrv, rolling, ema, cap_global, use_ema):
+    """Dynamic HRV cap and (hrv/cap)**0.7 component per day; NaN where HRV (or a cap) is missing.
+
+    cap = max(cap_global, rolling*1.2 when rolling > 0, ema*1.15 when use_ema and ema != 0).
+    """
+    cap = np.full(hrv.shape[0], cap_global)
+    cap = np.where(rolling > 0, np.maximum(np.nan_to_num(cap, nan=0.0), rolling * 1.2), cap)
+    if use_ema:
+        ema_ok = ~np.isnan(ema) & (ema != 0)
+        cap = np.where(ema_ok, np.maximum(np.nan_to_num(cap, nan=0.0), ema * 1.15), cap)
+    hrv_valid = ~np.isnan(hrv)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.clip((hrv / cap) ** 0.7 * 100.0, 0.0, 100.0)
+    scores = np.where(hrv_valid & (cap > 0), scores, np.nan)
+    return scores, np.where(hrv_valid, cap, np.nan)
+
+
+def _hrv_scores_loop(hrv, rolling, ema, cap_global, use_ema):
+    """Scalar-loop twin of _hrv_scores_np, compiled with numba when available."""
+    n = hrv.shape[0]
+    scores = np.full(n, np.nan)
+    caps = np.full(n, np.nan)
+    for i in range(n):
+        v = hrv[i]
+        if np.isnan(v):
+            continue
+        cap = cap_global
+        if rolling[i] > 0:
+            cap = max(0.0 if np.isnan(cap) else cap, rolling[i] * 1.2)
+        if use_ema and not np.isnan(ema[i]) and ema[i] != 0:
+            cap = max(0.0 if np.isnan(cap) else cap, ema[i] * 1.15)
+        caps[i] = cap
+        if cap > 0:
+            scores[i] = min(100.0, max(0.0, (v / cap) ** 0.7 * 100.0))
+    return scores, caps
+
+
+def _recovery_raw_np(rhr, hrv_comp, ss, se, stress, steps):
+    """Mean of the available recovery components per day and how many were available."""
+    components = np.column_stack((
+        np.maximum(0.0, 100.0 - (rhr - 40.0) * 2.0),
+        hrv_comp,
+        ss,
+        np.clip(se, 0.0, 100.0),
+        np.maximum(0.0, 100.0 - stress),
+        np.where(np.isnan(steps), np.nan, _steps_load_score(steps)),
+    ))
+    count = (~np.isnan(components)).sum(axis=1)
+    return np.nansum(components, axis=1) / np.maximum(count, 1), count
+
+
+def _recovery_raw_loop(rhr, hrv_comp, ss, se, stress, steps):
+    """Scalar-loop twin of _recovery_raw_np, compiled with numba when available."""
+    n = rhr.shape[0]
+    rec = np.zeros(n)
+    count = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        acc = 0.0
+        c = 0
+        if not np.isnan(rhr[i]):
+            acc += max(0.0, 100.0 - (rhr[i] - 40.0) * 2.0)
+            c += 1
+        if not np.isnan(hrv_comp[i]):
+            acc += hrv_comp[i]
+            c += 1
+        if not np.isnan(ss[i]):
+            acc += ss[i]
+            c += 1
+        if not np.isnan(se[i]):
+            acc += max(0.0, min(100.0, se[i]))
+            c += 1
+        if not np.isnan(stress[i]):
+            acc += max(0.0, 100.0 - stress[i])
+            c += 1
+        st = steps[i]
+        if not np.isnan(st):
+            if st < 4000:
+                acc += max(0.0, 50.0 - (4000 - st) / 80.0)
+            elif st > 15000:
+                acc += max(0.0, 80.0 - (st - 15000) / 150.0)
+            else:
+                acc += 90.0
+            c += 1
+        if c:
+            rec[i] = acc / c
+        count[i] = c
+    return rec, count
+
+
+# No fastmath: the kernels rely on NaN checks for missing values
+if njit is not None:
+    _hrv_scores = njit(cache=True)(_hrv_scores_loop)
+    _recovery_raw = njit(cache=True)(_recovery_raw_loop)
+else:
+    _hrv_scores = _hrv_scores_np
+    _recovery_raw = _recovery_raw_np
+
+
+def _cast_num(v):
+    """Cast numerics safely (Decimal -> float); None for missing/unparseable values."""
+    try:
+        if v is None:
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+def _pace_to_min_per_km(val):
+    """Normalize a stored pace (time, ISO8601 duration, 'MM:SS' or minutes) to min/km."""
+    try:
+        if val is None:
+            return None
+        # datetime.time from DB
+        if isinstance(val, _time):
+            secs = val.hour*3600 + val.minute*60 + val.second
+            return secs / 60.0
+        # ISO8601 duration like PT4M35S or PT34M or PT1H05M30S
+        if isinstance(val, str) and val.startswith('PT'):
+            # Strip PT then parse tokens ending with H, M, S
+            iso = val[2:]
+            h = m = s = 0.0
+            cur = ''
+            for ch in iso:
+                if ch.isdigit() or ch == '.':
+                    cur += ch
+                else:
+                    try:
+                        num = float(cur) if cur else 0.0
+                    except Exception:
+                        num = 0.0
+                    if ch == 'H':
+                        h = num
+                    elif ch == 'M':
+                        m = num
+                    elif ch == 'S':
+                        s = num
+                    cur = ''
+            secs = h*3600 + m*60 + s
+            if secs > 0:
+                return secs / 60.0
+        # string like HH:MM:SS or MM:SS
+        if isinstance(val, str):
+            parts = val.split(':')
+            parts = [p for p in parts if p!='']
+            if len(parts) == 3:
+                h = int(parts[0]); m = int(parts[1]); s = float(parts[2])
+                secs = h*3600 + m*60 + s
+                return secs / 60.0
+            if len(parts) == 2:
+                m = int(parts[0]); s = float(parts[1])
+                secs = m*60 + s
+                return secs / 60.0
+            # fallback numeric string -> assume already minutes
+            return float(val)
+        # numeric: assume minutes (float)
+        return float(val)
+    except Exception:
+        return None
+
 class SleepAnalytics:
     """Specialized sleep analysis"""
     
@@ -480,29 +741,12 @@ class SleepAnalytics:
         return ts
 
     def _correlate_sleep_with_context(self, rows):
-        """Compute multiple correlations to support charts and insights."""
-        # Helper to build pairs filtering None
-        def pairs(a_key, b_key):
-            p = [(r.get(a_key), r.get(b_key)) for r in rows]
-            p = [(a, b) for a, b in p if a is not None and b is not None]
-            return p
-        
-        def pearson(p):
-            try:
-                if len(p) < 3:
-                    return None
-                xs, ys = zip(*p)
-                mx, my = mean(xs), mean(ys)
-                num = sum((x - mx)*(y - my) for x, y in p)
-                denx = sum((x - mx)**2 for x in xs)
-                deny = sum((y - my)**2 for y in ys)
-                denom = (denx*deny) ** 0.5
-                if denom == 0:
-                    return None
-                return round(num/denom, 3)
-            except Exception:
-                return None
-        
+        """Compute multiple correlations to support charts and insights.
+
+        Values go through _cast_num, so NUMERIC columns (Decimal from the driver) correlate like
+        floats. This is intended: the old per-pair helper returned None for any pair involving a
+        Decimal only because ``Decimal ** 0.5`` raised a TypeError that it swallowed.
+        """
         metrics = [
             ('sleep_score','next_energy'),
             ('sleep_score','next_rhr'),
@@ -522,13 +766,26 @@ class SleepAnalytics:
             ('prev_vigorous_activity','sleep_score'),
             ('prev_stress','sleep_score'),
         ]
+        # Each field is extracted once and shared by every pair it appears in; one
+        # pairwise-complete matrix (and its sample counts) covers all metrics
+        fields = list(dict.fromkeys(f for pair in metrics for f in pair))
+        col = {f: j for j, f in enumerate(fields)}
+        X = np.array(
+            [[_cast_num(r.get(f)) for f in fields] for r in rows], dtype=np.float64
+        ).reshape(len(rows), len(fields))
+        present = (~np.isnan(X)).astype(np.int64)
+        counts = present.T @ present
+        r_mat = _pearson_matrix(X)
         detail = {}
+        samples = {}
         for a, b in metrics:
-            pr = pearson(pairs(a, b))
-            detail[f'{a}_vs_{b}'] = pr
+            i, j = col[a], col[b]
+            r_ab = r_mat[i, j]
+            detail[f'{a}_vs_{b}'] = None if np.isnan(r_ab) else round(float(r_ab), 3)
+            samples[f'{a}_vs_{b}'] = int(counts[i, j])
         return {
             'pearson': detail,
-            'samples': { k: len([(r.get(a), r.get(b)) for r in rows if r.get(a) is not None and r.get(b) is not None]) for a,b in metrics for k in [f'{a}_vs_{b}'] }
+            'samples': samples,
         }
 
     def _analyze_sleep_timing(self, data):
@@ -1089,7 +1346,7 @@ class ActivityAnalytics:
         
         return recommendations
 
-    def analyze_running(self, days: int = 90, start_date: str | None = None, end_date: str | None = None):
+    def analyze_running(self, days: int = 90, start_date: str | None = None, end_date: str | None = None, weekly_limit: int | None = None):
         """Produce running-focused analytics using garmin_activities and related tables.
 
         Extended version adds:
@@ -1099,6 +1356,7 @@ class ActivityAnalytics:
           - Multiple duo scatter datasets (distance↔pace, distance↔hr, cadence↔pace, step_length↔pace, vert_osc↔pace, ground_contact↔pace)
           - Summary metrics (total distance, avg & median pace, avg HR, avg cadence, avg step length, load per week)
           - Available field list for frontend dynamic chart building
+          - Optional weekly_limit: only the most recent N weekly aggregates are returned (all when None)
 
         
                             Basic validation; silently ignore if malformed (fallback to days).
@@ -1107,7 +1365,7 @@ class ActivityAnalytics:
                              
                              * weekly: weekly aggregates
                              
-                             * correlations_extended: extended matrix (inline dates into SQL to avoid param-binding/date-casting issues)
+                             * correlations_extended: extended matrix
                              * summary: aggregate stats
                              * meta: {'mode':'range'|'rolling','range':{...}}
                              * available_fields: list of numeric fields present (non-null at least once)
@@ -1120,9 +1378,8 @@ class ActivityAnalytics:
                 from datetime import date as _date
                 _date.fromisoformat(start_date)
                 _date.fromisoformat(end_date)
-                # Inline the date range into SQL (matches debug endpoint which returned rows)
-                date_clause = f"COALESCE(day, start_time::date) BETWEEN '{start_date}' AND '{end_date}'"
-                query = f"""
+                # Bound, with explicit ::date casts, so the text stays constant across ranges
+                query = """
                 SELECT
                     activity_id,
                     name,
@@ -1154,11 +1411,11 @@ class ActivityAnalytics:
                     avg_stress,
                     max_stress
                 FROM garmin_activities
-                WHERE lower(sport) = 'running' AND {date_clause}
+                WHERE lower(sport) = 'running' AND COALESCE(day, start_time::date) BETWEEN %s::date AND %s::date
                 ORDER BY start_time DESC
                 """
                 mode = 'range'
-                params = None
+                params = [start_date, end_date]
             except Exception:
                 # Fallback to rolling window if dates invalid
                 query = """
@@ -1262,9 +1519,11 @@ class ActivityAnalytics:
         _debug_skipped_rows = 0
         # Track how many times we had to fallback to start_time date because day was NULL
         _fallback_day_assigned = 0
+        _append_run = runs.append
         for r in rows:
             try:
-                dist_m = r.get('distance')
+                g = r.get
+                dist_m = g('distance')
                 dist_km = None
                 if dist_m is not None:
                     try:
@@ -1274,7 +1533,8 @@ class ActivityAnalytics:
                             dist_km = None
                     except Exception:
                         dist_km = None
-                dur_s = r.get('moving_time') if r.get('moving_time') not in (None, 0) else r.get('elapsed_time')
+                moving = g('moving_time')
+                dur_s = moving if moving not in (None, 0) else g('elapsed_time')
                 dur_min = None
                 if dur_s is not None and dur_s != 0:
                     try:
@@ -1285,64 +1545,13 @@ class ActivityAnalytics:
                         dur_min = None
                 # avg_pace may already be stored as min/km; compute a canonical avg_pace value
                 avg_pace_val = None
-                def _pace_to_min_per_km(val):
-                    try:
-                        if val is None:
-                            return None
-                        import datetime as _dt
-                        # datetime.time from DB
-                        if isinstance(val, _dt.time):
-                            secs = val.hour*3600 + val.minute*60 + val.second
-                            return secs / 60.0
-                        # ISO8601 duration like PT4M35S or PT34M or PT1H05M30S
-                        if isinstance(val, str) and val.startswith('PT'):
-                            # Strip PT then parse tokens ending with H, M, S
-                            iso = val[2:]
-                            h = m = s = 0.0
-                            cur = ''
-                            for ch in iso:
-                                if ch.isdigit() or ch == '.':
-                                    cur += ch
-                                else:
-                                    try:
-                                        num = float(cur) if cur else 0.0
-                                    except Exception:
-                                        num = 0.0
-                                    if ch == 'H':
-                                        h = num
-                                    elif ch == 'M':
-                                        m = num
-                                    elif ch == 'S':
-                                        s = num
-                                    cur = ''
-                            secs = h*3600 + m*60 + s
-                            if secs > 0:
-                                return secs / 60.0
-                        # string like HH:MM:SS or MM:SS
-                        if isinstance(val, str):
-                            parts = val.split(':')
-                            parts = [p for p in parts if p!='']
-                            if len(parts) == 3:
-                                h = int(parts[0]); m = int(parts[1]); s = float(parts[2])
-                                secs = h*3600 + m*60 + s
-                                return secs / 60.0
-                            if len(parts) == 2:
-                                m = int(parts[0]); s = float(parts[1])
-                                secs = m*60 + s
-                                return secs / 60.0
-                            # fallback numeric string -> assume already minutes
-                            return float(val)
-                        # numeric: assume minutes (float)
-                        return float(val)
-                    except Exception:
-                        return None
-
-                raw_avg_pace = r.get('avg_pace')
+                raw_avg_pace = g('avg_pace')
+                raw_avg_speed = g('avg_speed')
                 if raw_avg_pace is not None:
                     avg_pace_val = _pace_to_min_per_km(raw_avg_pace)
-                elif r.get('avg_speed') is not None:
+                elif raw_avg_speed is not None:
                     try:
-                        spd = float(r.get('avg_speed'))
+                        spd = float(raw_avg_speed)
                         # Detect unit heuristically: if spd < 25 assume km/h, if < 8 maybe m/s (convert)
                         if spd <= 12:  # could be km/h typical easy runs 8-12
                             avg_pace_val = 60.0 / spd if spd > 0 else None
@@ -1359,8 +1568,8 @@ class ActivityAnalytics:
                         avg_pace_val = None
 
                 # Fallback day if NULL using start_time
-                start_dt = r.get('start_time')
-                day_val = r.get('day')
+                start_dt = g('start_time')
+                day_val = g('day')
                 if day_val is not None:
                     try:
                         day_iso = day_val.isoformat()
@@ -1376,41 +1585,39 @@ class ActivityAnalytics:
                     else:
                         day_iso = None
 
-                # Cast numerics safely (Decimal -> float)
-                def _cast_num(v):
-                    try:
-                        if v is None:
-                            return None
-                        return float(v)
-                    except Exception:
-                        return None
-
-                runs.append({
-                    'activity_id': r.get('activity_id'),
-                    'name': r.get('name'),
+                dist_km_r = round(dist_km, 3) if dist_km is not None else None
+                dur_min_r = round(dur_min, 1) if dur_min is not None else None
+                calories = _cast_num(g('calories'))
+                _append_run({
+                    'activity_id': g('activity_id'),
+                    'name': g('name'),
                     'start_time': start_dt.isoformat() if start_dt else None,
                     'day': day_iso,
-                    'distance_km': round(dist_km, 3) if dist_km is not None else None,
-                    'duration_min': round(dur_min, 1) if dur_min is not None else None,
+                    'distance_km': dist_km_r,
+                    'duration_min': dur_min_r,
                     'avg_pace': round(avg_pace_val, 3) if avg_pace_val is not None else None,
-                    'avg_hr': _cast_num(r.get('avg_hr')),
-                    'max_hr': _cast_num(r.get('max_hr')),
-                    'avg_rr': _cast_num(r.get('avg_rr')),
-                    'max_rr': _cast_num(r.get('max_rr')),
-                    'calories': _cast_num(r.get('calories')),
-                    'training_load': _cast_num(r.get('training_load')),
-                    'avg_step_length_m': _cast_num(r.get('avg_step_length')),
+                    'avg_hr': _cast_num(g('avg_hr')),
+                    'max_hr': _cast_num(g('max_hr')),
+                    'avg_rr': _cast_num(g('avg_rr')),
+                    'max_rr': _cast_num(g('max_rr')),
+                    'calories': calories,
+                    'training_load': _cast_num(g('training_load')),
+                    'avg_step_length_m': _cast_num(g('avg_step_length')),
                     # No dedicated avg_cadence column in DB; use avg_steps_per_min as cadence proxy
                     # (frontend previously consumed avg_cadence)
-                    'avg_steps_per_min': _cast_num(r.get('avg_steps_per_min')),
-                    'avg_vertical_oscillation': _cast_num(r.get('avg_vertical_oscillation')),
-                    'avg_vertical_ratio': _cast_num(r.get('avg_vertical_ratio')),
-                    'avg_ground_contact_time': _cast_num(r.get('avg_ground_contact_time')),
-                    'vo2_max': _cast_num(r.get('vo2_max')),
-                    'steps': _cast_num(r.get('steps')),
-                    'max_steps_per_min': _cast_num(r.get('max_steps_per_min')),
-                    'avg_stress': _cast_num(r.get('avg_stress')),
-                    'max_stress': _cast_num(r.get('max_stress')),
+                    'avg_steps_per_min': _cast_num(g('avg_steps_per_min')),
+                    'avg_vertical_oscillation': _cast_num(g('avg_vertical_oscillation')),
+                    'avg_vertical_ratio': _cast_num(g('avg_vertical_ratio')),
+                    'avg_ground_contact_time': _cast_num(g('avg_ground_contact_time')),
+                    'vo2_max': _cast_num(g('vo2_max')),
+                    'steps': _cast_num(g('steps')),
+                    'max_steps_per_min': _cast_num(g('max_steps_per_min')),
+                    'avg_stress': _cast_num(g('avg_stress')),
+                    'max_stress': _cast_num(g('max_stress')),
+                    # Derived fields for the full correlation heatmap (note: avg_pace is canonical)
+                    'speed_kmh': (dist_km_r / (dur_min_r / 60.0)) if dur_min_r and dist_km_r and dist_km_r > 0 else None,
+                    # Energy proxy: calories per km
+                    'calories_per_km': (calories / dist_km_r) if dist_km_r and calories and dist_km_r > 0 else None,
                 })
             except Exception as _row_ex:
                 try:
@@ -1435,84 +1642,26 @@ class ActivityAnalytics:
             wk = iso_week_key(rr.get('day'))
             if not wk:
                 continue
-            w = weekly.setdefault(wk, {'week': wk, 'total_distance_km': 0.0, 'pace_vals': [], 'active_days': set()})
+            w = weekly.setdefault(wk, {'week': wk, 'total_distance_km': 0.0, 'pace_vals': [], 'days': []})
             if rr.get('distance_km'):
                 w['total_distance_km'] += rr['distance_km']
             if rr.get('avg_pace') is not None:
                 w['pace_vals'].append(rr['avg_pace'])
-            if rr.get('day'):
-                w['active_days'].add(rr['day'])
+            # wk is only set when day parsed, so day is always present here; dedupe once per week on emit
+            w['days'].append(rr['day'])
 
+        # Newest weeks first; when only the latest N weeks are needed a bounded heap beats a full sort
+        if weekly_limit:
+            weekly_items = heapq.nlargest(weekly_limit, weekly.items(), key=itemgetter(0))
+        else:
+            weekly_items = sorted(weekly.items(), reverse=True)
         weekly_out = []
-        for k, v in sorted(weekly.items(), reverse=True):
+        for k, v in weekly_items:
             avg_pace = (sum(v['pace_vals']) / len(v['pace_vals'])) if v['pace_vals'] else None
-            weekly_out.append({'week': v['week'], 'total_distance_km': round(v['total_distance_km'], 2), 'avg_pace': round(avg_pace,3) if avg_pace else None, 'active_days': len(v['active_days'])})
+            weekly_out.append({'week': v['week'], 'total_distance_km': round(v['total_distance_km'], 2), 'avg_pace': round(avg_pace,3) if avg_pace else None, 'active_days': len(set(v['days']))})
 
         # Correlations (pearson) between distance_km, duration_min, avg_pace, avg_hr, vo2_max (extended with training_load)
-        import math
-
-        def pearson(pairs):
-            try:
-                n = len(pairs)
-                if n < 3:
-                    return None
-                xs, ys = zip(*pairs)
-                mx = sum(xs)/n; my = sum(ys)/n
-                num = sum((x-mx)*(y-my) for x,y in pairs)
-                denx = sum((x-mx)**2 for x in xs)
-                deny = sum((y-my)**2 for y in ys)
-                denom = math.sqrt(denx*deny)
-                if denom == 0:
-                    return None
-                return round(num/denom, 3)
-            except Exception:
-                return None
-
-        fields = ['distance_km','duration_min','avg_pace','avg_hr','avg_rr','max_rr','vo2_max','avg_steps_per_min','training_load']
-        corr_matrix = {f: {g: None for g in fields} for f in fields}
-        for i, a in enumerate(fields):
-            for j, b in enumerate(fields):
-                if j <= i:
-                    continue
-                pairs = [(r.get(a), r.get(b)) for r in runs if r.get(a) is not None and r.get(b) is not None]
-                v = pearson(pairs) if pairs else None
-                corr_matrix[a][b] = v
-                corr_matrix[b][a] = v
-
-        scatter = [{'x': r.get('distance_km'), 'y': r.get('avg_pace'), 'label': r.get('start_time')} for r in runs if r.get('distance_km') is not None and r.get('avg_pace') is not None]
-
-        # Extended correlations
-        extended_fields = ['distance_km','duration_min','avg_pace','avg_hr','avg_rr','max_rr','vo2_max','avg_steps_per_min','training_load','avg_step_length_m','avg_vertical_oscillation','avg_vertical_ratio','avg_ground_contact_time','avg_stress']
-        corr_ext = {f: {g: None for g in extended_fields} for f in extended_fields}
-        for i, a in enumerate(extended_fields):
-            for j, b in enumerate(extended_fields):
-                if j <= i:
-                    continue
-                pairs = [(r.get(a), r.get(b)) for r in runs if r.get(a) is not None and r.get(b) is not None]
-                v = pearson(pairs) if pairs else None
-                corr_ext[a][b] = v
-                corr_ext[b][a] = v
-
         # Full correlations (raw + derived) for heatmap the user requested
-        # Prepare additional derived numeric fields inside per-run dicts (non-mutating base list except adding ephemeral keys)
-        for rr in runs:
-            try:
-                if rr.get('duration_min') and rr.get('distance_km') and rr.get('distance_km') > 0:
-                    rr['speed_kmh'] = (rr['distance_km'] / (rr['duration_min'] / 60.0))
-                else:
-                    rr['speed_kmh'] = None
-                # cadence based step length alt (already have avg_step_length_m)
-                # note: avg_pace is canonical
-                # Energy proxy: calories per km
-                if rr.get('distance_km') and rr.get('calories'):
-                    try:
-                        rr['calories_per_km'] = rr['calories'] / rr['distance_km'] if rr['distance_km'] > 0 else None
-                    except Exception:
-                        rr['calories_per_km'] = None
-                else:
-                    rr['calories_per_km'] = None
-            except Exception:
-                rr['speed_kmh'] = rr.get('speed_kmh') or None
         full_fields = [
             # Core distance/time
             'distance_km','duration_min','avg_pace',
@@ -1530,15 +1679,22 @@ class ActivityAnalytics:
             # Performance / physiology
             'vo2_max'
         ]
-        correlations_full = {f: {g: None for g in full_fields} for f in full_fields}
-        for i, a in enumerate(full_fields):
-            for j, b in enumerate(full_fields):
-                if j <= i:
-                    continue
-                pairs = [(r.get(a), r.get(b)) for r in runs if r.get(a) is not None and r.get(b) is not None]
-                v = pearson(pairs) if pairs else None
-                correlations_full[a][b] = v
-                correlations_full[b][a] = v
+        # One NaN-aware matrix computation covers every pair (see _pearson_matrix)
+        full_r = _pearson_matrix(np.array([[r.get(f) for f in full_fields] for r in runs], dtype=np.float64).reshape(len(runs), len(full_fields))).tolist()
+        correlations_full = {
+            a: {b: (None if i == j or math.isnan(full_r[i][j]) else round(full_r[i][j], 3)) for j, b in enumerate(full_fields)}
+            for i, a in enumerate(full_fields)
+        }
+
+        # Base and extended matrices are strict subsets of the full matrix: project instead of recomputing
+        fields = ['distance_km','duration_min','avg_pace','avg_hr','avg_rr','max_rr','vo2_max','avg_steps_per_min','training_load']
+        corr_matrix = {f: {g: correlations_full[f][g] for g in fields} for f in fields}
+
+        scatter = [{'x': r.get('distance_km'), 'y': r.get('avg_pace'), 'label': r.get('start_time')} for r in runs if r.get('distance_km') is not None and r.get('avg_pace') is not None]
+
+        # Extended correlations
+        extended_fields = ['distance_km','duration_min','avg_pace','avg_hr','avg_rr','max_rr','vo2_max','avg_steps_per_min','training_load','avg_step_length_m','avg_vertical_oscillation','avg_vertical_ratio','avg_ground_contact_time','avg_stress']
+        corr_ext = {f: {g: correlations_full[f][g] for g in extended_fields} for f in extended_fields}
 
         # Running Economy Insights
         economy = {}
@@ -1552,8 +1708,8 @@ class ActivityAnalytics:
             for f in focus_candidates:
                 if f == target_metric:
                     continue
-                pairs = [(r.get(f), r.get(target_metric)) for r in runs if r.get(f) is not None and r.get(target_metric) is not None]
-                r_val = pearson(pairs) if len(pairs) >= 3 else None
+                # every candidate is a full-matrix field: reuse the cell rather than recomputing the pair
+                r_val = correlations_full[f][target_metric]
                 if r_val is not None:
                     # Interpret direction: negative r with pace => desirable (associate with faster pace)
                     direction = 'improves_with_increase'
@@ -1608,27 +1764,10 @@ class ActivityAnalytics:
         }
 
         # Ascending timeseries for charts (older first)
-        runs_desc = list(runs)  # current order is DESC
-        runs_asc = sorted(runs, key=lambda x: x.get('start_time') or '')
-        timeseries = [
-            {
-                'start_time': r['start_time'],
-                'day': r['day'],
-                'distance_km': r['distance_km'],
-                'avg_pace': r['avg_pace'],
-                'avg_hr': r['avg_hr'],
-                'avg_rr': r.get('avg_rr'),
-                'max_rr': r.get('max_rr'),
-                'avg_steps_per_min': r.get('avg_steps_per_min'),
-                'avg_step_length_m': r.get('avg_step_length_m'),
-                'avg_vertical_oscillation': r.get('avg_vertical_oscillation'),
-                'avg_vertical_ratio': r.get('avg_vertical_ratio'),
-                'avg_ground_contact_time': r.get('avg_ground_contact_time'),
-                'vo2_max': r.get('vo2_max'),
-                'avg_stress': r.get('avg_stress'),
-            }
-            for r in runs_asc
-        ]
+        # The query already orders by start_time DESC, so ascending is just the reverse (no re-sort)
+        runs_desc = runs
+        runs_asc = runs[::-1]
+        timeseries = [dict(zip(_RUN_TIMESERIES_KEYS, _run_timeseries_values(r))) for r in runs_asc]
 
         # Summary
         distances = [r['distance_km'] for r in runs if r.get('distance_km') is not None]
@@ -1651,13 +1790,14 @@ class ActivityAnalytics:
             'date_start': runs_asc[0]['day'] if runs_asc else None,
             'date_end': runs_asc[-1]['day'] if runs_asc else None,
         }
-        # Weekly load per week (km)
-        if weekly_out:
-            summary['avg_weekly_distance_km'] = round(sum(w['total_distance_km'] for w in weekly_out)/len(weekly_out),2)
+        # Weekly load per week (km) over all weeks, independent of weekly_limit
+        if weekly:
+            summary['avg_weekly_distance_km'] = round(sum(round(w['total_distance_km'], 2) for w in weekly.values())/len(weekly),2)
 
         # Pace form (z-score) & recent vs baseline comparison
+        # Form/load metrics are statistically meaningless for a handful of runs; skip straight to the sample count
         pace_form = {}
-        if paces and len(paces) >= 3:
+        if len(runs_asc) >= _MIN_RUNS_FOR_FORM and len(paces) >= 3:
             try:
                 p_mean = mean(paces)
                 p_std = stdev(paces) if len(paces) > 1 else None
@@ -1711,76 +1851,55 @@ class ActivityAnalytics:
 
         # Training load & monotony (Acute vs Chronic) + interpretation & timeseries
         training_load = {}
-        if runs_asc:
+        if len(runs_asc) >= _MIN_RUNS_FOR_FORM:
             from datetime import date as _date
-            from datetime import timedelta as _td
-            # Aggregate distance per day
-            day_distance: dict[str, float] = {}
+            # Aggregate distance per calendar day (ordinal keys avoid string gap-filling)
+            day_distance: dict[int, float] = {}
             for r in runs_asc:
                 d = r.get('day')
-                if d and r.get('distance_km') is not None:
-                    day_distance.setdefault(d, 0.0)
-                    day_distance[d] += r['distance_km']
-            if day_distance:
-                # Build ordered list of days (ascending)
-                ordered_days = sorted(day_distance.keys())
-                if ordered_days:
-                    first = _date.fromisoformat(ordered_days[0])
-                    last = _date.fromisoformat(ordered_days[-1])
-                    # Ensure continuity (fill gaps with 0 distance for monotony / rolling windows)
-                    cursor = first
-                    while cursor < last:
-                        iso = cursor.isoformat()
-                        day_distance.setdefault(iso, day_distance.get(iso, 0.0))
-                        cursor += _td(days=1)
-                    ordered_days = sorted(day_distance.keys())
-
-                def _rolling_sum(end_date_iso: str, window: int) -> float:
-                    try:
-                        end_d = _date.fromisoformat(end_date_iso)
-                    except Exception:
-                        return 0.0
-                    total = 0.0
-                    for i in range(window):
-                        dt = (end_d - _td(days=i)).isoformat()
-                        total += day_distance.get(dt, 0.0)
-                    return total
-
-                def _monotony(end_date_iso: str) -> tuple[float|None, float|None]:
-                    try:
-                        end_d = _date.fromisoformat(end_date_iso)
-                    except Exception:
-                        return None, None
-                    vals = []
-                    for i in range(7):
-                        dt = (end_d - _td(days=i)).isoformat()
-                        vals.append(day_distance.get(dt, 0.0))
-                    if not any(v > 0 for v in vals):
-                        return None, None
+                dk = r.get('distance_km')
+                if d and dk is not None:
                     try:
-                        m_mean = mean(vals)
-                        m_std = stdev(vals) if len(set(vals)) > 1 else 0.0
-                        monotony = round(m_mean / m_std, 3) if m_std > 0 else None
-                        strain = round(_rolling_sum(end_date_iso,7) * (monotony or 0), 2) if monotony else None
-                        return monotony, strain
+                        o = _date.fromisoformat(d).toordinal()
                     except Exception:
-                        return None, None
+                        continue
+                    day_distance[o] = day_distance.get(o, 0.0) + dk
+            if day_distance:
+                # Dense ascending day axis (gaps are 0 distance); every rolling window is derived
+                # from one prefix sum with vectorized slices instead of a per-day Python scan
+                first = min(day_distance)
+                n_days = max(day_distance) - first + 1
+                daily = np.zeros(n_days, dtype=np.float64)
+                for o, dist in day_distance.items():
+                    daily[o - first] = dist
+                ordered_days = [_date.fromordinal(first + i).isoformat() for i in range(n_days)]
+                csum = np.concatenate(([0.0], np.cumsum(daily)))
+                idx = np.arange(n_days)
+                # days before the first run contribute 0; clamp float noise from the subtraction
+                acute_arr = np.maximum(csum[idx + 1] - csum[np.maximum(0, idx - 6)], 0.0)
+                chronic_arr = np.maximum(csum[idx + 1] - csum[np.maximum(0, idx - 27)], 0.0)
+                acr_arr = np.divide(acute_arr, chronic_arr, out=np.full(n_days, np.nan), where=chronic_arr > 1e-9)
+                # Monotony over trailing 7-day windows (zero-padded before the first day)
+                windows = np.lib.stride_tricks.sliding_window_view(np.concatenate((np.zeros(6), daily)), 7)
+                w_mean = windows.mean(axis=1)
+                w_std = windows.std(axis=1, ddof=1)
+                varied = (windows.max(axis=1) > windows.min(axis=1)) & (w_std > 0)
+                mono_arr = np.divide(w_mean, w_std, out=np.full(n_days, np.nan), where=varied & (windows > 0).any(axis=1))
 
                 # Build timeseries
                 tl_timeseries = []
-                for d_iso in ordered_days:
-                    acute = _rolling_sum(d_iso, 7)
-                    chronic = _rolling_sum(d_iso, 28)
-                    acr = round(acute / chronic, 3) if chronic > 0 else None
-                    mono, strain = _monotony(d_iso)
+                for d_iso, dist, acute, chronic, acr_v, mono_v in zip(
+                    ordered_days, daily.tolist(), acute_arr.tolist(), chronic_arr.tolist(), acr_arr.tolist(), mono_arr.tolist()
+                ):
+                    mono = None if math.isnan(mono_v) else round(mono_v, 3)
                     tl_timeseries.append({
                         'day': d_iso,
-                        'distance_km': round(day_distance.get(d_iso, 0.0), 3),
+                        'distance_km': round(dist, 3),
                         'acute_7d': round(acute, 2),
                         'chronic_28d': round(chronic, 2),
-                        'acute_chronic_ratio': acr,
+                        'acute_chronic_ratio': None if math.isnan(acr_v) else round(acr_v, 3),
                         'monotony_index': mono,
-                        'training_strain': strain,
+                        'training_strain': round(acute * mono, 2) if mono else None,
                     })
 
                 # Current metrics (latest day)
@@ -1967,7 +2086,8 @@ class RecoveryPatternAnalytics:
 
     This module complements the generic recovery scoring in the enhanced engine by
     performing a more granular multi-indicator pattern decomposition using only
-    lightweight SQL (no SciPy / sklearn dependencies here to keep import surface small).
+    lightweight SQL and NumPy/pandas vectorization (no SciPy / sklearn dependencies
+    here to keep import surface small).
 
     Returned structure (all keys optional if data scarce):
       {
@@ -1995,9 +2115,67 @@ class RecoveryPatternAnalytics:
         'factor_correlations': [ { 'factor': str, 'r': float, 'n': int } ],
         'recommendations': [ str, ... ]
       }
+
+    With fewer than 10 HRV or resting-HR observations the analysis stops early and returns
+    'status': 'partial' with the window means only (empty breakdown/classification/correlations).
+    """
+
+    # Cheap stamp of what _analyze_recovery_patterns reads for a window, scoped to that window and
+    # served from the day/ts indexes. The per-day tables contribute row count plus the sum of row
+    # xmins: every insert, update or delete (Garmin re-syncs, sleep edits, manual HRV) changes it
+    # whatever the write path, and none of them keeps an updated_at reliably. Heart-rate samples
+    # only append, so count plus newest ts catches samples backfilled inside the window too.
+    # Derived from the DB, so every worker agrees on it.
+    _VERSION_SQL = """
+    WITH w AS (
+        SELECT COALESCE(MAX(day), CURRENT_DATE) - (%s * INTERVAL '1 day') AS start
+        FROM garmin_daily_summaries
+    )
+    SELECT concat_ws(':', w.start,
+        (SELECT COUNT(*) || '/' || COALESCE(SUM(xmin::text::bigint), 0) FROM garmin_daily_summaries WHERE day >= w.start),
+        (SELECT COUNT(*) || '/' || COALESCE(SUM(xmin::text::bigint), 0) FROM garmin_sleep_sessions WHERE day >= w.start),
+        (SELECT COUNT(*) || '/' || COALESCE(SUM(xmin::text::bigint), 0) FROM daily_journal WHERE day >= w.start),
+        (SELECT COUNT(*) || '/' || COALESCE(MAX(ts)::text, '') FROM garmin_heart_rate_data WHERE ts >= w.start)
+    ) AS version
+    FROM w
     """
 
-    def analyze_recovery_patterns(self, days: int = 90, baseline_window: int = 30, recent_window: int = 7):
+    def data_version(self, days: int = 90):
+        """DB-derived version of the inputs for a ``days`` window; None when the read fails."""
+        row = execute_query(self._VERSION_SQL, (days,), fetch_one=True)
+        return row.get('version') if row else None
+
+    def analyze_recovery_patterns(self, days: int = 90, baseline_window: int = 30, recent_window: int = 7, version=None):
+        """Memoized entry point for :meth:`_analyze_recovery_patterns`.
+
+        Results are keyed on (days, baseline_window, recent_window, :meth:`data_version`); pass
+        ``version`` when it was already read for this request (e.g. to build the ETag) so the payload
+        and its validator describe the same data. Error and partial results are never memoized.
+        The returned dict is shared between callers and must be treated as read-only.
+        """
+        if version is None:
+            version = self.data_version(days)
+        if version is None:
+            return self._analyze_recovery_patterns(days, baseline_window, recent_window)
+        key = f"{days}:{baseline_window}:{recent_window}:{version}"
+        hit = _recovery_patterns_cache.get(key)
+        if hit is not None:
+            return hit
+        result = self._analyze_recovery_patterns(days, baseline_window, recent_window)
+        # 'error' covers insufficient data and failed reads (execute_query returns None on DB errors)
+        if 'error' not in result and result.get('status') != 'partial':
+            _recovery_patterns_cache.set(key, result)
+        return result
+
+    @staticmethod
+    def etag(version, days: int = 90, baseline_window: int = 30, recent_window: int = 7):
+        """Validator for :meth:`analyze_recovery_patterns` output for a :meth:`data_version`; None without one."""
+        if version is None:
+            return None
+        key = f"{version}:{days}:{baseline_window}:{recent_window}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _analyze_recovery_patterns(self, days: int = 90, baseline_window: int = 30, recent_window: int = 7):
         """Enhanced recovery pattern analysis with improved HRV handling.
 
         
@@ -2033,14 +2211,16 @@ class RecoveryPatternAnalytics:
         LEFT JOIN garmin_sleep_sessions s ON g.day = s.day
         LEFT JOIN daily_journal d ON g.day = d.day
         LEFT JOIN (
+            -- Same window as the outer filter so only the analyzed days are scanned (uses idx_garmin_hr_ts)
             SELECT DATE(ts) as day, STDDEV(bpm) as hr_variability
             FROM garmin_heart_rate_data
+            WHERE ts >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_daily_summaries) - (%s * INTERVAL '1 day')
             GROUP BY DATE(ts)
         ) proxy ON g.day = proxy.day
         WHERE g.day >= (SELECT COALESCE(MAX(day), CURRENT_DATE) FROM garmin_daily_summaries) - (%s * INTERVAL '1 day')
         ORDER BY g.day ASC
         """
-        rows = execute_query(query, (days,)) or []
+        rows = execute_query(query, (days, days)) or []
         if len(rows) < 5:
             return {'error': 'insufficient_data', 'days_available': len(rows)}
 
@@ -2050,25 +2230,14 @@ class RecoveryPatternAnalytics:
                 return float(val) if val is not None else None
             except Exception:
                 return None
-        def _mean(vals):
-            v = [ _f(x) for x in vals if _f(x) is not None ]
-            return (sum(v)/len(v)) if v else None
-        def _pct(arr, p):
-            if not arr:
-                return None
-            arr_sorted = sorted(arr)
-            k = (len(arr_sorted)-1)*(p/100.0)
-            f = int(k); c = min(f+1, len(arr_sorted)-1)
-            if f == c:
-                return arr_sorted[f]
-            return arr_sorted[f] + (arr_sorted[c]-arr_sorted[f])*(k-f)
-        def _winsor(arr, low=5, high=95):
-            if not arr:
-                return []
-            pl = _pct(arr, low); ph = _pct(arr, high)
-            if pl is None or ph is None or pl >= ph:
-                return arr[:]
-            return [min(max(v, pl), ph) for v in arr]
+
+        # Columnar view of the window: extract every field once instead of per-row dict lookups
+        n_rows = len(rows)
+        days_col = [r.get('day') for r in rows]
+        cols = {
+            k: np.array([_f(r.get(k)) for r in rows], dtype=np.float64)
+            for k in ('rhr', 'stress_avg', 'steps', 'sleep_score', 'sleep_duration_min', 'awake_sec', 'hrv_manual', 'hrv_proxy')
+        }
 
         # Forward-fill manual HRV logic (similar to enhanced engine)
         from datetime import datetime as _dt, date as _date
@@ -2077,182 +2246,150 @@ class RecoveryPatternAnalytics:
             ffill_limit_days = int(ffill_limit_env) if ffill_limit_env else None
         except Exception:
             ffill_limit_days = None
-        last_manual_hrv = None
-        last_manual_day = None
-        for r in rows:
-            manual = r.get('hrv_manual')
-            proxy = r.get('hrv_proxy')
+        def _day_ordinal(day_obj):
             # Parse day to date object if possible
-            day_obj = r.get('day')
             if day_obj is not None and not hasattr(day_obj, 'isoformat'):
                 try:
                     day_obj = _dt.fromisoformat(str(day_obj)).date()
                 except Exception:
                     day_obj = None
-            if manual is not None:
-                try:
-                    val = float(manual)
-                    r['hrv'] = val
-                    r['hrv_source'] = 'manual_journal'
-                    last_manual_hrv = val
-                    last_manual_day = day_obj
-                    continue
-                except Exception:
-                    pass
-            # forward fill
-            chosen = None; source = None
-            if last_manual_hrv is not None and last_manual_day is not None:
-                allow_ffill = True
-                if ffill_limit_days is not None and isinstance(day_obj, _date) and isinstance(last_manual_day, _date):
-                    if (day_obj - last_manual_day).days > ffill_limit_days:
-                        allow_ffill = False
-                if allow_ffill:
-                    chosen = last_manual_hrv
-                    source = 'manual_ffill'
-            if chosen is None and proxy is not None:
-                try:
-                    chosen = float(proxy); source = 'garmin_stddev_proxy'
-                except Exception:
-                    pass
-            r['hrv'] = chosen
-            r['hrv_source'] = source
-
-        # Sleep efficiency simple calc
-        for r in rows:
-            try:
-                dur = _f(r.get('sleep_duration_min'))
-                awake_sec = _f(r.get('awake_sec'))
-                tib_min = dur if dur else None
-                asleep_min = None
-                if dur is not None and awake_sec is not None:
-                    awake_min = awake_sec/60.0
-                    asleep_min = max(0.0, dur - awake_min)
-                if asleep_min is not None and tib_min and tib_min > 0:
-                    r['sleep_efficiency'] = round(asleep_min / tib_min * 100, 1)
-                else:
-                    r['sleep_efficiency'] = None
-            except Exception:
-                r['sleep_efficiency'] = None
-
-        # Derive HRV baselines & components
-        hrv_sequence = [ _f(r.get('hrv')) for r in rows ]
-        hrv_all_raw = [v for v in hrv_sequence if v is not None]
-        hrv_all_w = _winsor(hrv_all_raw, 5, 95)
-        hrv_cap_global = _pct(hrv_all_w, 75) if hrv_all_w else None
-        # Rolling median (window 14, prior values only)
-        window = 14
-        def _rolling_median(seq, idx):
-            start = max(0, idx-window)
-            subset = [v for v in seq[start:idx] if v is not None]
-            if len(subset) < 5:
-                return None
-            s = sorted(subset)
-            m = len(s)//2
-            return s[m] if len(s)%2==1 else (s[m-1]+s[m])/2.0
-        rolling_baselines = []
-        for i in range(len(hrv_sequence)):
-            rolling_baselines.append(_rolling_median(hrv_sequence, i))
-        # EMA series
-        ema_alpha = 0.1
-        hrv_ema = []
-        for v in hrv_sequence:
-            if v is None:
-                hrv_ema.append(hrv_ema[-1] if hrv_ema else None)
-            else:
-                if not hrv_ema or hrv_ema[-1] is None:
-                    hrv_ema.append(v)
-                else:
-                    hrv_ema.append(hrv_ema[-1] + ema_alpha*(v - hrv_ema[-1]))
-        # 3-day rolling median smoothing of raw
-        def _rolling_median_simple(values, win=3):
-            out = []
-            from statistics import median
-            for i in range(len(values)):
-                subset = [v for v in values[max(0,i-win+1):i+1] if v is not None]
-                if subset:
-                    try:
-                        out.append(median(subset))
-                    except Exception:
-                        out.append(subset[-1])
-                else:
-                    out.append(None)
-            return out
-        hrv_smoothed = _rolling_median_simple(hrv_sequence, 3)
-
-        def _hrv_component(val, idx):
-            if val is None:
-                return None, None, None
-            adaptive = rolling_baselines[idx]
-            cap = hrv_cap_global
-            if adaptive and adaptive > 0:
-                cap = max(cap or 0, adaptive*1.2)
-            if len(hrv_all_raw) >= 30 and hrv_ema[idx]:
-                cap = max(cap or 0, hrv_ema[idx]*1.15)
-            if not cap or cap <= 0:
-                return None, adaptive, cap
-            ratio = val / cap
-            score = (ratio ** 0.7) * 100.0
-            score = max(0.0, min(100.0, score))
-            return score, adaptive, cap
-
-        # Annotate rows with HRV contextual fields
-        for i, r in enumerate(rows):
-            val = hrv_sequence[i]
-            comp, base, cap = _hrv_component(val, i)
-            r['hrv_component'] = comp
-            r['hrv_baseline_adaptive'] = base
-            r['hrv_cap_use'] = cap
-            r['hrv_raw_smoothed'] = hrv_smoothed[i]
-
-        # Baseline vs recent windows for summary (RHR oriented)
-        baseline_slice = rows[-baseline_window:]
-        recent_slice = rows[-recent_window:]
-        baseline_rhr = _mean([r.get('rhr') for r in baseline_slice])
-        current_rhr = _mean([r.get('rhr') for r in recent_slice])
+            return day_obj.toordinal() if isinstance(day_obj, _date) else np.nan
+        day_ord = np.array([_day_ordinal(d) for d in days_col], dtype=np.float64)
+        manual = cols['hrv_manual']
+        proxy = cols['hrv_proxy']
+        is_manual = ~np.isnan(manual)
+        # Index of the most recent manual entry at or before each row (-1 when none yet)
+        last_manual = np.maximum.accumulate(np.where(is_manual, np.arange(n_rows), -1))
+        prev = np.maximum(last_manual, 0)
+        allow_ffill = ~is_manual & (last_manual >= 0) & ~np.isnan(day_ord[prev])
+        if ffill_limit_days is not None:
+            allow_ffill &= ~((day_ord - day_ord[prev]) > ffill_limit_days)
+        use_proxy = ~is_manual & ~allow_ffill & ~np.isnan(proxy)
+        hrv = np.where(is_manual, manual, np.where(allow_ffill, manual[prev], proxy))
+        hrv_source = np.select(
+            [is_manual, allow_ffill, use_proxy],
+            ['manual_journal', 'manual_ffill', 'garmin_stddev_proxy'],
+            default='',
+        )
+
+        # Sleep efficiency simple calc (asleep / time in bed; NaN where either input is missing)
+        dur = cols['sleep_duration_min']
+        asleep = np.maximum(0.0, dur - cols['awake_sec'] / 60.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            se_pct = np.where(dur > 0, asleep / dur * 100, np.nan)
+        se_arr = np.array([round(v, 1) for v in se_pct.tolist()], dtype=np.float64)
+
+        rhr_arr = cols['rhr']
+        ss_arr = cols['sleep_score']
+        stress_arr = cols['stress_avg']
+        steps_arr = cols['steps']
+
+        # Baseline vs recent window means from one set of prefix sums over the summary columns
+        prefix = _prefix_sums(np.column_stack((rhr_arr, hrv, se_arr, ss_arr, stress_arr, steps_arr)))
+        baseline_lo = max(0, n_rows - baseline_window) if baseline_window else 0
+        recent_lo = max(0, n_rows - recent_window) if recent_window else 0
+        (baseline_rhr, avg_hrv, avg_sleep_eff, avg_sleep_score, avg_stress, avg_steps) = _nan_to_none(
+            _window_mean(prefix, baseline_lo, n_rows)
+        )
+        current_rhr = _nan_to_none(_window_mean(prefix, recent_lo, n_rows))[0]
         rhr_dev = None
         if baseline_rhr and current_rhr:
             try:
                 rhr_dev = round((current_rhr - baseline_rhr)/baseline_rhr * 100, 2)
             except Exception:
                 rhr_dev = None
-        avg_hrv = _mean([r.get('hrv') for r in baseline_slice])
+
+        def _r(v, ndigits=1):
+            return round(v, ndigits) if v else None
+
+        # Sparse history: rolling baselines, EMA caps, classification and correlations would be
+        # noise, so return the cheap window means only
+        n_hrv_obs = int(np.count_nonzero(~np.isnan(manual) | ~np.isnan(proxy)))
+        n_rhr_obs = int(np.count_nonzero(~np.isnan(rhr_arr)))
+        if n_hrv_obs < _MIN_RECOVERY_SAMPLES or n_rhr_obs < _MIN_RECOVERY_SAMPLES:
+            summary = {
+                'days_analyzed': n_rows,
+                'baseline_rhr': _r(baseline_rhr),
+                'current_rhr': _r(current_rhr),
+                'rhr_deviation_pct': rhr_dev,
+                'avg_hrv': _r(avg_hrv),
+                'avg_sleep_efficiency': _r(avg_sleep_eff),
+                'avg_sleep_score': _r(avg_sleep_score),
+                'avg_stress': _r(avg_stress),
+                'avg_steps': _r(avg_steps, 0),
+            }
+            return {
+                'status': 'partial',
+                'reason': 'insufficient_hrv_rhr_samples',
+                'samples': {'hrv': n_hrv_obs, 'rhr': n_rhr_obs, 'required': _MIN_RECOVERY_SAMPLES},
+                'summary': summary,
+                'indicator_breakdown': {},
+                'daily_classification': [],
+                'classification_distribution': { 'optimal':0,'balanced':0,'under_recovered':0,'overreached':0 },
+                'factor_correlations': [],
+                'recommendations': ["Log more days of HRV and resting HR for a full recovery analysis"],
+            }
+
+        # Derive HRV baselines & components (vectorized over the whole window)
+        import pandas as pd  # type: ignore
+        hrv_valid = ~np.isnan(hrv)
+        n_hrv_raw = int(hrv_valid.sum())
+        hrv_cap_global = None
+        if n_hrv_raw:
+            # Winsorize (5-95%) before deriving the percentile cap
+            hrv_all_raw = hrv[hrv_valid]
+            lo, hi = np.percentile(hrv_all_raw, [5, 95])
+            hrv_all_w = np.clip(hrv_all_raw, lo, hi) if lo < hi else hrv_all_raw
+            hrv_cap_global = float(np.percentile(hrv_all_w, 75))
+        # Rolling median (window 14, prior values only, >= 5 samples)
+        rolling_baselines = _trailing_nanmedian(hrv, 14, min_count=5, include_current=False)
+        # EMA series (missing days carry the previous value forward)
+        hrv_ema = pd.Series(hrv).ewm(alpha=0.1, adjust=False, ignore_na=True).mean().to_numpy()
+        # 3-day rolling median smoothing of raw
+        hrv_smoothed_arr = _trailing_nanmedian(hrv, 3)
+
+        # Dynamic cap: max(global 75th pct, adaptive*1.2, EMA*1.15 after >=30 samples)
+        scores, cap = _hrv_scores(
+            hrv, rolling_baselines, hrv_ema,
+            np.nan if hrv_cap_global is None else hrv_cap_global, n_hrv_raw >= 30,
+        )
+
         # Trend (smoothed last3 vs prev3)
-        hrv_vals_trend = [v for v in hrv_smoothed if v is not None]
+        hrv_vals_trend = hrv_smoothed_arr[~np.isnan(hrv_smoothed_arr)]
         hrv_trend = None
         if len(hrv_vals_trend) >= 6:
-            last3 = _mean(hrv_vals_trend[-3:])
-            prev3 = _mean(hrv_vals_trend[-6:-3])
+            trend_prefix = _prefix_sums(hrv_vals_trend)
+            n_trend = len(hrv_vals_trend)
+            last3 = float(_window_mean(trend_prefix, n_trend - 3, n_trend))
+            prev3 = float(_window_mean(trend_prefix, n_trend - 6, n_trend - 3))
             if last3 and prev3:
                 delta = last3 - prev3
                 if abs(delta) < 0.5:
                     hrv_trend = 'stable'
                 else:
                     hrv_trend = 'rising' if delta > 0 else 'falling'
-        avg_sleep_eff = _mean([r.get('sleep_efficiency') for r in baseline_slice])
-        avg_sleep_score = _mean([r.get('sleep_score') for r in baseline_slice])
-        avg_stress = _mean([r.get('stress_avg') for r in baseline_slice])
-        avg_steps = _mean([r.get('steps') for r in baseline_slice])
-
-        latest_idx = len(rows)-1
-        latest_row = rows[latest_idx]
-        latest_hrv_raw = hrv_sequence[latest_idx]
-        latest_hrv_comp = latest_row.get('hrv_component')
-        latest_hrv_base = latest_row.get('hrv_baseline_adaptive')
-        latest_hrv_cap = latest_row.get('hrv_cap_use')
-        latest_hrv_smoothed = latest_row.get('hrv_raw_smoothed')
-        latest_hrv_source = latest_row.get('hrv_source')
+
+        # Latest-day values: one gather over the last row of each column
+        (
+            latest_hrv_raw, latest_hrv_comp, latest_hrv_base, latest_hrv_cap, latest_hrv_smoothed,
+            rhr_v, ss_v, stress_v, steps_v,
+        ) = _nan_to_none(np.array([
+            hrv[-1], scores[-1], rolling_baselines[-1] if hrv_valid[-1] else np.nan, cap[-1],
+            hrv_smoothed_arr[-1], rhr_arr[-1], ss_arr[-1], stress_arr[-1], steps_arr[-1],
+        ]))
+        latest_hrv_source = str(hrv_source[-1]) or None
 
         summary = {
             'days_analyzed': len(rows),
-            'baseline_rhr': round(baseline_rhr,1) if baseline_rhr else None,
-            'current_rhr': round(current_rhr,1) if current_rhr else None,
+            'baseline_rhr': _r(baseline_rhr),
+            'current_rhr': _r(current_rhr),
             'rhr_deviation_pct': rhr_dev,
-            'avg_hrv': round(avg_hrv,1) if avg_hrv else None,
+            'avg_hrv': _r(avg_hrv),
             'hrv_trend': hrv_trend,
-            'avg_sleep_efficiency': round(avg_sleep_eff,1) if avg_sleep_eff else None,
-            'avg_sleep_score': round(avg_sleep_score,1) if avg_sleep_score else None,
-            'avg_stress': round(avg_stress,1) if avg_stress else None,
-            'avg_steps': round(avg_steps,0) if avg_steps else None,
+            'avg_sleep_efficiency': _r(avg_sleep_eff),
+            'avg_sleep_score': _r(avg_sleep_score),
+            'avg_stress': _r(avg_stress),
+            'avg_steps': _r(avg_steps, 0),
             # HRV context
             'hrv_raw': latest_hrv_raw,
             'hrv_raw_smoothed': latest_hrv_smoothed,
@@ -2262,109 +2399,67 @@ class RecoveryPatternAnalytics:
             'hrv_source': latest_hrv_source,
         }
 
-        # Daily classification using component scores
-        daily = []
-        for r in rows:
-            metrics = {}
-            score_acc = 0.0
-            count = 0
-            rhr_v = _f(r.get('rhr'))
-            if rhr_v is not None:
-                score_acc += max(0.0, 100.0 - (rhr_v - 40.0) * 2.0); count += 1; metrics['rhr'] = rhr_v
-            hrv_comp = r.get('hrv_component')
-            if hrv_comp is not None:
-                score_acc += hrv_comp; count += 1; metrics['hrv_component'] = hrv_comp
-            ss_v = _f(r.get('sleep_score'))
-            if ss_v is not None:
-                score_acc += ss_v; count += 1; metrics['sleep_score'] = ss_v
-            se_v = _f(r.get('sleep_efficiency'))
-            if se_v is not None:
-                score_acc += max(0.0, min(100.0, se_v)); count += 1; metrics['sleep_eff'] = se_v
-            stress_v = _f(r.get('stress_avg'))
-            if stress_v is not None:
-                score_acc += max(0.0, 100.0 - stress_v); count += 1; metrics['stress'] = stress_v
-            steps_v = _f(r.get('steps'))
-            if steps_v is not None:
-                if steps_v < 4000:
-                    load_score = max(0.0, 50.0 - (4000-steps_v)/80.0)
-                elif steps_v > 15000:
-                    load_score = max(0.0, 80.0 - (steps_v-15000)/150.0)
-                else:
-                    load_score = 90.0
-                score_acc += load_score; count += 1; metrics['steps'] = steps_v
-            if count == 0:
-                continue
-            rec_score = round(score_acc / count, 1)
-            cls = 'balanced'
-            if rec_score >= 80:
-                cls = 'optimal'
-            elif rec_score < 55:
-                if steps_v and steps_v > 14000 and (ss_v and ss_v < 65):
-                    cls = 'overreached'
-                else:
-                    cls = 'under_recovered'
-            daily.append({
-                'day': r.get('day').isoformat() if hasattr(r.get('day'),'isoformat') else r.get('day'),
-                'recovery_score': rec_score,
-                'classification': cls
-            })
+        # Daily classification using component scores: one (N, 6) component matrix, NaN where missing
+        rec_raw, comp_count = _recovery_raw(rhr_arr, scores, ss_arr, se_arr, stress_arr, steps_arr)
+        has_score = comp_count > 0
+        rec_rounded = [round(v, 1) for v in rec_raw.tolist()]
+        rec_arr = np.array(rec_rounded, dtype=np.float64)
+        overreached = (steps_arr > 14000) & (ss_arr != 0) & (ss_arr < 65)
+        cls_arr = np.select(
+            [rec_arr >= 80, (rec_arr < 55) & overreached, rec_arr < 55],
+            ['optimal', 'overreached', 'under_recovered'],
+            default='balanced',
+        )
+        daily = [
+            {
+                'day': d.isoformat() if hasattr(d,'isoformat') else d,
+                'recovery_score': rec_rounded[i],
+                'classification': str(cls_arr[i]),
+            }
+            for i, d in enumerate(days_col) if has_score[i]
+        ]
 
         dist = { 'optimal':0,'balanced':0,'under_recovered':0,'overreached':0 }
         for d in daily:
             if d['classification'] in dist:
                 dist[d['classification']] += 1
 
-        # Correlations
-        def _pearson(pairs):
-            try:
-                if len(pairs) < 5:
-                    return None
-                xs, ys = zip(*pairs)
-                mx, my = _mean(xs), _mean(ys)
-                num = sum((x-mx)*(y-my) for x,y in pairs)
-                denx = sum((x-mx)**2 for x in xs)
-                deny = sum((y-my)**2 for y in ys)
-                denom = (denx*deny)**0.5
-                if denom == 0:
-                    return None
-                return round(num/denom,3)
-            except Exception:
-                return None
+        # Correlations of each factor with the day's recovery score: one masked, mean-centred
+        # einsum over an (N, 5) factor matrix instead of a Python pass per factor
         factors = ['sleep_score','steps','stress_avg','rhr','hrv_component']
-        corr_list = []
-        score_map = { d['day']: d['recovery_score'] for d in daily }
-        for f in factors:
-            pairs = []
-            for r in rows:
-                day_key = r.get('day').isoformat() if hasattr(r.get('day'),'isoformat') else r.get('day')
-                if day_key in score_map:
-                    val = _f(r.get(f)) if f!='hrv_component' else _f(r.get('hrv_component'))
-                    if val is not None:
-                        pairs.append((val, score_map[day_key]))
-            r_val = _pearson(pairs)
-            if r_val is not None:
-                corr_list.append({'factor': f, 'r': r_val, 'n': len(pairs)})
+        factor_mat = np.column_stack((ss_arr, steps_arr, stress_arr, rhr_arr, scores))
+        pair_mask = (~np.isnan(factor_mat)) & has_score[:, None]
+        w = pair_mask.astype(np.float64)
+        n_pairs = w.sum(axis=0)
+        x0 = np.where(pair_mask, factor_mat, 0.0)
+        y0 = np.where(pair_mask, rec_arr[:, None], 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dx = (x0 - x0.sum(axis=0) / n_pairs) * w
+            dy = (y0 - y0.sum(axis=0) / n_pairs) * w
+            num = np.einsum('ij,ij->j', dx, dy)
+            denom = np.sqrt(np.einsum('ij,ij->j', dx, dx) * np.einsum('ij,ij->j', dy, dy))
+            r_vals = num / denom
+        corr_list = [
+            {'factor': f, 'r': round(float(r_vals[j]), 3), 'n': int(n_pairs[j])}
+            for j, f in enumerate(factors)
+            if n_pairs[j] >= 5 and denom[j] > 0
+        ]
 
         # Indicator breakdown
         indicator_breakdown = {}
         if rows:
-            last_row = rows[-1]
-            rhr_v = _f(last_row.get('rhr'))
             if rhr_v is not None:
                 indicator_breakdown['rhr_score'] = round(max(0.0, 100.0 - (rhr_v - 40.0) * 2.0),1)
-            if last_row.get('hrv_component') is not None:
-                indicator_breakdown['hrv_score'] = round(last_row['hrv_component'],1)
-                indicator_breakdown['hrv_raw'] = last_row.get('hrv')
-                indicator_breakdown['hrv_baseline'] = last_row.get('hrv_baseline_adaptive')
-                indicator_breakdown['hrv_cap'] = last_row.get('hrv_cap_use')
-                indicator_breakdown['hrv_source'] = last_row.get('hrv_source')
-            ss_v = _f(last_row.get('sleep_score'))
+            if latest_hrv_comp is not None:
+                indicator_breakdown['hrv_score'] = round(latest_hrv_comp,1)
+                indicator_breakdown['hrv_raw'] = latest_hrv_raw
+                indicator_breakdown['hrv_baseline'] = latest_hrv_base
+                indicator_breakdown['hrv_cap'] = latest_hrv_cap
+                indicator_breakdown['hrv_source'] = latest_hrv_source
             if ss_v is not None:
                 indicator_breakdown['sleep_score_component'] = round(ss_v,1)
-            stress_v = _f(last_row.get('stress_avg'))
             if stress_v is not None:
                 indicator_breakdown['stress_score'] = round(max(0.0, 100.0 - stress_v),1)
-            steps_v = _f(last_row.get('steps'))
             if steps_v is not None:
                 if steps_v < 4000:
                     load_score = max(0.0, 50.0 - (4000-steps_v)/80.0)
@@ -2401,5 +2496,10 @@ class RecoveryPatternAnalytics:
         }
 
 
+
+# Keyed by data_version, so entries never go stale; the TTL only bounds memory held by old versions
+_recovery_patterns_cache = TTLCache[dict](ttl_seconds=6 * 3600, maxsize=64)
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
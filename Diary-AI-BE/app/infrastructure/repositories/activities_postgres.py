@@ -3,9 +3,17 @@ from typing import Any, List, Tuple
 from app.db import async_execute_query
 from domain.repositories.activities import IActivitiesRepository
 
+# Debug samples: dates rendered as ISO strings by Postgres (start_time is a naive timestamp,
+# so this matches datetime.isoformat() for whole seconds) instead of a Python loop per row
+RUNNING_DEBUG_COLS = (
+    "ga.activity_id, ga.sport, "
+    "to_char(ga.start_time, 'YYYY-MM-DD\"T\"HH24:MI:SS') AS start_time, "
+    "to_char(ga.day, 'YYYY-MM-DD') AS day, ga.distance, ga.avg_pace"
+)
+
 class PostgresActivitiesRepository(IActivitiesRepository):
     async def fetch_latest(self, where_sql: str, params: Tuple[Any, ...], limit: int) -> List[dict]:
-        # Clamp the limit to a sane range and avoid SQL injection by not interpolating params
+        # Clamp the limit to a sane range; it is bound as a parameter so the statement text stays stable
         try:
             safe_limit = int(limit)
         except Exception:
@@ -36,10 +44,9 @@ class PostgresActivitiesRepository(IActivitiesRepository):
               FROM garmin_activities
              WHERE {where_sql}
              ORDER BY start_time DESC
-             LIMIT {safe_limit}
+             LIMIT %s
             """
-        rows = await async_execute_query(query, params) or []
-        return [dict(r) for r in rows]
+        return await async_execute_query(query, tuple(params) + (safe_limit,)) or []
 
     async def get_detail(self, activity_id: int) -> dict | None:
         query = """
@@ -68,91 +75,117 @@ class PostgresActivitiesRepository(IActivitiesRepository):
          WHERE activity_id = %s
          LIMIT 1
         """
-        row = await async_execute_query(query, (activity_id,), fetch_one=True)
-        return dict(row) if row else None
+        return await async_execute_query(query, (activity_id,), fetch_one=True)
 
     async def debug_counts(self, days: int) -> tuple[int, int]:
         q_count = (
             """
             SELECT COUNT(*) as cnt FROM garmin_activities
-            WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
-              AND (COALESCE(day, start_time::date) >= CURRENT_DATE - INTERVAL '%s days')
+            WHERE LOWER(sport) IN ('running', 'run')
+              AND (COALESCE(day, start_time::date) >= CURRENT_DATE - make_interval(days => %s))
             """
-            % days
         )
-        c = await async_execute_query(q_count, fetch_one=True) or {'cnt': 0}
+        c = await async_execute_query(q_count, (days,), fetch_one=True) or {'cnt': 0}
         q_pace = (
             """
             SELECT COUNT(*) as cnt FROM garmin_activities
-            WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
+            WHERE LOWER(sport) IN ('running', 'run')
               AND avg_pace IS NOT NULL
-              AND (COALESCE(day, start_time::date) >= CURRENT_DATE - INTERVAL '%s days')
+              AND (COALESCE(day, start_time::date) >= CURRENT_DATE - make_interval(days => %s))
             """
-            % days
         )
-        p = await async_execute_query(q_pace, fetch_one=True) or {'cnt': 0}
+        p = await async_execute_query(q_pace, (days,), fetch_one=True) or {'cnt': 0}
         return int(c.get('cnt') or 0), int(p.get('cnt') or 0)
 
+    async def debug_overview(self, days: int) -> dict:
+        """Running debug counts, sport labels and a recent sample in a single round trip."""
+        q = """
+        WITH w AS (
+            SELECT CURRENT_DATE - make_interval(days => %(days)s) AS since
+        ),
+        running AS (
+            SELECT activity_id, sport, start_time, day, distance, avg_pace, vo2_max
+            FROM garmin_activities
+            WHERE LOWER(sport) IN ('running', 'run')
+        )
+        SELECT
+            (SELECT COUNT(*) FROM garmin_activities) AS total_count,
+            (SELECT COUNT(*) FROM running) AS running_total,
+            (SELECT COUNT(*) FROM running, w
+              WHERE COALESCE(day, start_time::date) >= w.since) AS running_count,
+            (SELECT COUNT(*) FROM running, w
+              WHERE avg_pace IS NOT NULL AND COALESCE(day, start_time::date) >= w.since) AS running_with_pace,
+            (SELECT COUNT(*) FROM running, w
+              WHERE vo2_max IS NOT NULL AND start_time::date >= w.since) AS with_vo2,
+            (SELECT COALESCE(json_agg(l ORDER BY l.cnt DESC), '[]'::json) FROM (
+                SELECT sport, COUNT(*) AS cnt FROM garmin_activities, w
+                WHERE start_time::date >= w.since
+                GROUP BY sport ORDER BY cnt DESC LIMIT 20
+            ) l) AS labels,
+            (SELECT COALESCE(json_agg(s ORDER BY s.start_time DESC), '[]'::json) FROM (
+                SELECT activity_id, sport, start_time, day, distance, avg_pace
+                FROM running, w
+                WHERE COALESCE(day, start_time::date) >= w.since
+                ORDER BY start_time DESC
+                LIMIT 20
+            ) s) AS sample
+        """
+        row = await async_execute_query(q, {'days': days}, fetch_one=True) or {}
+        return {
+            'total_count': int(row.get('total_count') or 0),
+            'running_total': int(row.get('running_total') or 0),
+            'running_count': int(row.get('running_count') or 0),
+            'running_with_pace': int(row.get('running_with_pace') or 0),
+            'with_vo2': int(row.get('with_vo2') or 0),
+            'labels': row.get('labels') or [],
+            'sample': row.get('sample') or [],
+        }
+
     async def debug_sample(self, days: int) -> List[dict]:
         q_sample = (
-            """
-            SELECT activity_id, sport, start_time, day, distance, avg_pace
-            FROM garmin_activities
-            WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
-              AND (COALESCE(day, start_time::date) >= CURRENT_DATE - INTERVAL '%s days')
-            ORDER BY start_time DESC
+            f"""
+            SELECT {RUNNING_DEBUG_COLS}
+            FROM garmin_activities ga
+            WHERE LOWER(ga.sport) IN ('running', 'run')
+              AND (COALESCE(ga.day, ga.start_time::date) >= CURRENT_DATE - make_interval(days => %s))
+            ORDER BY ga.start_time DESC
             LIMIT 20
             """
-            % days
         )
-        sample = await async_execute_query(q_sample) or []
-        for r in sample:
-            if r.get('start_time') and hasattr(r['start_time'], 'isoformat'):
-                r['start_time'] = r['start_time'].isoformat()
-            if r.get('day') and hasattr(r['day'], 'isoformat'):
-                r['day'] = r['day'].isoformat()
-        return sample
+        return await async_execute_query(q_sample, (days,)) or []
 
     async def labels(self, days: int) -> List[dict]:
         q_labels = (
             """
             SELECT sport, COUNT(*) as cnt FROM garmin_activities
-            WHERE start_time::date >= CURRENT_DATE - INTERVAL '%s days'
+            WHERE start_time::date >= CURRENT_DATE - make_interval(days => %s)
             GROUP BY sport ORDER BY cnt DESC LIMIT 20
             """
-            % days
         )
-        return await async_execute_query(q_labels) or []
+        return await async_execute_query(q_labels, (days,)) or []
 
     async def vo2_count(self, days: int) -> int:
         q_vo2 = (
             """
             SELECT COUNT(*) as with_vo2 FROM garmin_activities
-            WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
+            WHERE LOWER(sport) IN ('running', 'run')
                 AND vo2_max IS NOT NULL
-                AND start_time::date >= CURRENT_DATE - INTERVAL '%s days'
+                AND start_time::date >= CURRENT_DATE - make_interval(days => %s)
             """
-            % days
         )
-        res = await async_execute_query(q_vo2, fetch_one=True) or {"with_vo2": 0}
+        res = await async_execute_query(q_vo2, (days,), fetch_one=True) or {"with_vo2": 0}
         return int(res.get("with_vo2") or 0)
 
     async def raw_running_range(self, start_date: str, end_date: str) -> List[dict]:
         q = f"""
-        SELECT activity_id, sport, start_time, day, distance, avg_pace
-        FROM garmin_activities
-        WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
-          AND (COALESCE(day, start_time::date) BETWEEN '{start_date}' AND '{end_date}')
-        ORDER BY start_time DESC
+        SELECT {RUNNING_DEBUG_COLS}
+        FROM garmin_activities ga
+        WHERE LOWER(ga.sport) IN ('running', 'run')
+          AND (COALESCE(ga.day, ga.start_time::date) BETWEEN %s AND %s)
+        ORDER BY ga.start_time DESC
         LIMIT 50
         """
-        rows = await async_execute_query(q) or []
-        for r in rows:
-            if r.get('start_time') and hasattr(r['start_time'], 'isoformat'):
-                r['start_time'] = r['start_time'].isoformat()
-            if r.get('day') and hasattr(r['day'], 'isoformat'):
-                r['day'] = r['day'].isoformat()
-        return rows
+        return await async_execute_query(q, (start_date, end_date)) or []
 
     async def count_all(self) -> int:
         q = "SELECT COUNT(*) AS cnt FROM garmin_activities"
@@ -166,7 +199,7 @@ class PostgresActivitiesRepository(IActivitiesRepository):
         q = (
             """
             SELECT COUNT(*) AS cnt FROM garmin_activities
-            WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
+            WHERE LOWER(sport) IN ('running', 'run')
             """
         )
         res = await async_execute_query(q, fetch_one=True) or {"cnt": 0}
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from app.db import execute_query
+from functools import partial
+import json
+from app.db import async_execute_query
 from domain.repositories.gym import IGymRepository
 
 INIT_SQL = """
@@ -10,21 +12,80 @@ CREATE TABLE IF NOT EXISTS gym_store (
 );
 """
 
+def _json_default(obj):
+    return obj.isoformat() if hasattr(obj, 'isoformat') else str(obj)
+
+_dumps = partial(json.dumps, default=_json_default)
+
+SAVE_SQL = """
+INSERT INTO gym_store(key,payload,updated_at) VALUES(%(key)s,%(payload)s,NOW())
+ON CONFLICT (key) DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW()
+"""
+
 class PostgresGymRepository(IGymRepository):
-    def ensure_table(self) -> None:
-        execute_query(INIT_SQL)
+    # INIT_SQL is idempotent; run it once per process instead of on every load/save
+    _table_ready: bool = False
+
+    async def ensure_table(self) -> None:
+        if PostgresGymRepository._table_ready:
+            return
+        if await async_execute_query(INIT_SQL, fetch_all=False):
+            PostgresGymRepository._table_ready = True
 
-    def load_bucket(self, key: str) -> list:
-        self.ensure_table()
-        row = execute_query("SELECT payload FROM gym_store WHERE key=%s", (key,), fetch_one=True)
+    async def load_bucket(self, key: str) -> list:
+        await self.ensure_table()
+        row = await async_execute_query("SELECT payload FROM gym_store WHERE key=%s", (key,), fetch_one=True)
         return row['payload'] if row and row['payload'] else []
 
-    def save_bucket(self, key: str, payload: list) -> None:
-        self.ensure_table()
-        execute_query(
+    async def save_bucket(self, key: str, payload: list) -> None:
+        from psycopg.types.json import Jsonb  # psycopg3 only, like the async pool; keeps psycopg2 imports working
+        await self.ensure_table()
+        await async_execute_query(
+            SAVE_SQL,
+            {'key': key, 'payload': Jsonb(payload, dumps=_dumps)},
+            fetch_all=False,
+            prepare=True,
+        )
+
+    async def append_bucket(self, key: str, items: list) -> None:
+        """Append items server-side, replacing existing entries that share an item's id."""
+        from psycopg.types.json import Jsonb  # psycopg3 only, like the async pool
+        await self.ensure_table()
+        await async_execute_query(
             """
             INSERT INTO gym_store(key,payload,updated_at) VALUES(%s,%s,NOW())
-            ON CONFLICT (key) DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW()
+            ON CONFLICT (key) DO UPDATE SET payload=COALESCE((
+                SELECT jsonb_agg(e.value ORDER BY e.ord)
+                  FROM jsonb_array_elements(gym_store.payload) WITH ORDINALITY AS e(value, ord)
+                 WHERE NOT EXISTS (
+                    SELECT 1 FROM jsonb_array_elements(EXCLUDED.payload) AS x(value)
+                     WHERE (x.value->'id') IS NOT DISTINCT FROM (e.value->'id')
+                 )
+            ), '[]'::jsonb) || EXCLUDED.payload, updated_at=NOW()
+            """,
+            (key, Jsonb(items, dumps=_dumps)),
+            fetch_all=False,
+            prepare=True,
+        )
+
+    async def remove_from_bucket(self, key: str, item_id: str) -> bool:
+        """Drop the entries whose id equals item_id server-side; False when none matched."""
+        await self.ensure_table()
+        row = await async_execute_query(
+            """
+            UPDATE gym_store SET payload=COALESCE((
+                SELECT jsonb_agg(e.value ORDER BY e.ord)
+                  FROM jsonb_array_elements(gym_store.payload) WITH ORDINALITY AS e(value, ord)
+                 WHERE (e.value->'id') IS DISTINCT FROM to_jsonb(%(id)s::text)
+            ), '[]'::jsonb), updated_at=NOW()
+            WHERE key=%(key)s AND EXISTS (
+                SELECT 1 FROM jsonb_array_elements(gym_store.payload) AS x(value)
+                 WHERE (x.value->'id') = to_jsonb(%(id)s::text)
+            )
+            RETURNING key
             """,
-            (key, payload),
+            {'key': key, 'id': item_id},
+            fetch_one=True,
+            prepare=True,
         )
+        return row is not None
@@ -1,9 +1,31 @@
 from __future__ import annotations
-from typing import Any, List, Optional, Tuple
-from app.db import async_execute_query
+import asyncio
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from app.db import async_execute_query, async_iter_query
 from domain.repositories.sleeps import ISleepsRepository
 
+# Columns the sleep list (and its frontend mapper) reads; the detail endpoint keeps SELECT *
+_SLEEP_LIST_COLS = (
+    "sleep_id", "day", "sleep_start", "sleep_end", "sleep_duration_seconds",
+    "deep_sleep_seconds", "light_sleep_seconds", "rem_sleep_seconds", "awake_seconds",
+    "sleep_score", "avg_sleep_hr", "avg_sleep_rr", "avg_respiration", "avg_sleep_stress",
+    "avg_spo2", "lowest_spo2", "highest_spo2", "last_sleep_phase",
+)
+
 class PostgresSleepsRepository(ISleepsRepository):
+    # Some list columns are added by later migrations; the projection is resolved once per process
+    _list_select: Optional[str] = None
+    _columns_cache: Optional[set[str]] = None
+    _columns_lock = asyncio.Lock()
+
+    async def _list_columns_sql(self) -> str:
+        if PostgresSleepsRepository._list_select is None:
+            present = await self.columns_present()
+            if not present:
+                return "*"
+            PostgresSleepsRepository._list_select = ", ".join(c for c in _SLEEP_LIST_COLS if c in present)
+        return PostgresSleepsRepository._list_select
+
     async def count_in_range(self, where_sql: str, params: Tuple[Any, ...]) -> int:
         q = f"SELECT COUNT(*) as total_count FROM garmin_sleep_sessions WHERE {where_sql}"
         row = await async_execute_query(q, params, fetch_one=True) or {"total_count": 0}
@@ -11,56 +33,101 @@ class PostgresSleepsRepository(ISleepsRepository):
 
     async def fetch_latest(self, where_sql: str, params: Tuple[Any, ...], limit: int, offset: int) -> List[dict]:
         q = f"""
-        SELECT * FROM garmin_sleep_sessions
+        SELECT {await self._list_columns_sql()} FROM garmin_sleep_sessions
+        WHERE {where_sql}
+        ORDER BY sleep_start DESC
+        LIMIT %s OFFSET %s
+        """
+        return await async_execute_query(q, (*params, limit, offset)) or []
+
+    async def fetch_page(self, where_sql: str, params: Tuple[Any, ...], limit: int, offset: int) -> Tuple[List[dict], int]:
+        """One round-trip for a page and the total match count (COUNT(*) OVER () on each row)."""
+        q = f"""
+        SELECT {await self._list_columns_sql()}, COUNT(*) OVER () AS total_count FROM garmin_sleep_sessions
         WHERE {where_sql}
         ORDER BY sleep_start DESC
         LIMIT %s OFFSET %s
         """
         rows = await async_execute_query(q, (*params, limit, offset)) or []
-        return [dict(r) for r in rows]
+        if not rows:
+            # An empty page past the end carries no count; only then ask separately
+            return [], (await self.count_in_range(where_sql, params) if offset else 0)
+        total = int(rows[0].get("total_count") or 0)
+        for r in rows:
+            r.pop("total_count", None)
+        return rows, total
+
+    async def iter_latest(self, where_sql: str, params: Tuple[Any, ...]) -> AsyncIterator[dict]:
+        """Stream every matching session (newest first) without buffering the full result.
+
+        For exports and analytics; UI pages keep using fetch_page/fetch_latest.
+        """
+        q = f"""
+        SELECT {await self._list_columns_sql()} FROM garmin_sleep_sessions
+        WHERE {where_sql}
+        ORDER BY sleep_start DESC
+        """
+        async for row in async_iter_query(q, params):
+            yield row
 
     async def get_by_id(self, sleep_id: int) -> Optional[dict]:
         q = "SELECT * FROM garmin_sleep_sessions WHERE sleep_id = %s"
-        row = await async_execute_query(q, (sleep_id,), fetch_one=True)
-        return dict(row) if row else None
+        return await async_execute_query(q, (sleep_id,), fetch_one=True)
 
     async def columns_present(self) -> set[str]:
-        rows = await async_execute_query(
-            "SELECT column_name FROM information_schema.columns WHERE table_name = 'garmin_sleep_sessions'",
-            None,
-            fetch_all=True,
-        ) or []
-        return {r.get('column_name') for r in rows if isinstance(r, dict)}
+        # The schema does not change while the app runs; look it up once (see invalidate_columns_cache)
+        cls = PostgresSleepsRepository
+        if cls._columns_cache is not None:
+            return cls._columns_cache
+        async with cls._columns_lock:
+            if cls._columns_cache is None:
+                rows = await async_execute_query(
+                    "SELECT column_name FROM information_schema.columns WHERE table_name = 'garmin_sleep_sessions'",
+                    None,
+                    fetch_all=True,
+                ) or []
+                cols = {r.get('column_name') for r in rows if isinstance(r, dict)}
+                if not cols:
+                    return cols  # lookup failed or table missing; retry next call
+                cls._columns_cache = cols
+        return cls._columns_cache
+
+    @classmethod
+    def invalidate_columns_cache(cls) -> None:
+        """Forget cached column info, e.g. after a migration altered garmin_sleep_sessions."""
+        cls._columns_cache = None
+        cls._list_select = None
 
     async def insert_returning(self, cols: list[str], params: Tuple[Any, ...]) -> Optional[dict]:
         placeholders = ', '.join(['%s'] * len(cols))
         q = f"INSERT INTO garmin_sleep_sessions ({', '.join(cols)}) VALUES ({placeholders}) RETURNING *"
-        row = await async_execute_query(q, params, fetch_one=True)
-        return dict(row) if row else None
+        return await async_execute_query(q, params, fetch_one=True)
 
     async def update_returning(self, sleep_id: int, updates: list[tuple[str, Any]]) -> Optional[dict]:
         set_sql = ', '.join([f"{c} = %s" for c, _ in updates])
         params = tuple(val for _, val in updates) + (sleep_id,)
         q = f"UPDATE garmin_sleep_sessions SET {set_sql} WHERE sleep_id = %s RETURNING *"
-        row = await async_execute_query(q, params, fetch_one=True)
-        return dict(row) if row else None
+        return await async_execute_query(q, params, fetch_one=True)
 
     async def exists(self, sleep_id: int) -> bool:
         row = await async_execute_query("SELECT sleep_id FROM garmin_sleep_sessions WHERE sleep_id = %s", (sleep_id,), fetch_one=True)
         return bool(row)
 
     async def delete(self, sleep_id: int) -> bool:
-        await async_execute_query("DELETE FROM garmin_sleep_sessions WHERE sleep_id = %s", (sleep_id,))
-        return True
+        # RETURNING doubles as the existence check: no row back means nothing was deleted
+        row = await async_execute_query(
+            "DELETE FROM garmin_sleep_sessions WHERE sleep_id = %s RETURNING sleep_id", (sleep_id,), fetch_one=True
+        )
+        return row is not None
 
     async def fetch_events_for_day(self, day: str) -> List[dict]:
         # garmin_sleep_events schema uses `timestamp`, `event`, `duration`.
-        # Query by date(timestamp) to match provided day string (YYYY-MM-DD).
+        # Half-open range on the provided day (YYYY-MM-DD) rather than date(timestamp) = %s,
+        # so the btree index on timestamp (idx_gse_timestamp) can be used.
         q = """
         SELECT timestamp, event, duration
         FROM garmin_sleep_events
-        WHERE date(timestamp) = %s
+        WHERE timestamp >= %s::date AND timestamp < %s::date + 1
         ORDER BY timestamp
         """
-        rows = await async_execute_query(q, (day,)) or []
-        return [dict(r) for r in rows]
+        return await async_execute_query(q, (day, day)) or []
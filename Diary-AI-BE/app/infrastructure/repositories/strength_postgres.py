@@ -1,43 +1,229 @@
 from __future__ import annotations
-from typing import Optional, Sequence
-
-from app.db import execute_query
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+from app.lib.cache import TTLCache
+from app.db import AsyncTransaction, async_execute_query, async_execute_values, async_transaction
+from app.utils import get_logger
 from domain.repositories.strength import IStrengthRepository
 
+LOGGER = get_logger(__name__)
+
 
 INIT_SQL = """
 CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE TABLE IF NOT EXISTS strength_templates (
+  id TEXT PRIMARY KEY,
+  payload JSONB NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+-- search_exercises relies on this for both ILIKE '%q%' and the trigram % operator
+DO $$
+BEGIN
+  IF to_regclass('public.exercise_definitions') IS NOT NULL THEN
+    CREATE INDEX IF NOT EXISTS idx_ex_defs_name_trgm ON exercise_definitions USING GIN (name gin_trgm_ops);
+  END IF;
+END $$;
+-- The muscle-group dashboards read only the rollup and workout writes stamp its state, so both
+-- must exist even where 20251105_create_strength_daily_rollup.sql has not been applied
+CREATE TABLE IF NOT EXISTS strength_rollup_state (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+DO $$
+BEGIN
+  IF to_regclass('public.v_exercise_log_metrics') IS NOT NULL AND to_regclass('public.garmin_activities') IS NOT NULL THEN
+    CREATE MATERIALIZED VIEW IF NOT EXISTS mv_strength_daily_exdef AS
+    SELECT ga.start_time::date AS day,
+           el.exercise_definition_id,
+           SUM(m.total_volume) AS total_volume,
+           array_agg(DISTINCT ga.activity_id) AS activity_ids
+    FROM v_exercise_log_metrics m
+    JOIN exercise_logs el ON el.id = m.exercise_log_id
+    JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id
+    WHERE LOWER(COALESCE(ga.sub_sport, '')) = 'strength_training'
+    GROUP BY 1, 2;
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_strength_daily_exdef ON mv_strength_daily_exdef(day, exercise_definition_id);
+  END IF;
+END $$;
+"""
+
+# Bulk inserts take one array per column and unnest them, so the SQL text (and its
+# server-side prepared plan) is the same for any number of rows. Ids are assigned in
+# ORDER BY n order, so sorting RETURNING rows by id restores input order.
+INSERT_LOGS_SQL = """
+INSERT INTO exercise_logs(garmin_activity_id, exercise_definition_id, ord, notes)
+SELECT %s, t.exercise_definition_id, t.ord, t.notes
+FROM unnest(%s::int[], %s::int[], %s::text[]) WITH ORDINALITY AS t(exercise_definition_id, ord, notes, n)
+ORDER BY t.n
+RETURNING id, garmin_activity_id, exercise_definition_id, ord, notes
+"""
+
+INSERT_SETS_SQL = """
+INSERT INTO exercise_sets(exercise_log_id, set_number, reps, weight, rpe, is_warmup)
+SELECT t.exercise_log_id, t.set_number, t.reps, t.weight, t.rpe, t.is_warmup
+FROM unnest(%s::int[], %s::int[], %s::int[], %s::numeric[], %s::numeric[], %s::bool[])
+  WITH ORDINALITY AS t(exercise_log_id, set_number, reps, weight, rpe, is_warmup, n)
+ORDER BY t.n
+RETURNING id, exercise_log_id, set_number, reps, weight, rpe, is_warmup
+"""
+
+# exercise_sets cascade from exercise_logs (20251103_exercise_sets_cascade.sql), so one DELETE clears both
+DELETE_LOGS_SQL = "DELETE FROM exercise_logs WHERE garmin_activity_id=%s RETURNING id"
+# A strength activity with no logs yet is still found; only a missing activity is reported as such
+DELETE_WORKOUT_SQL = (
+    "WITH a AS (SELECT activity_id FROM garmin_activities WHERE activity_id=%s), "
+    "d AS (DELETE FROM exercise_logs WHERE garmin_activity_id IN (SELECT activity_id FROM a) RETURNING id) "
+    "SELECT EXISTS (SELECT 1 FROM a) AS found, (SELECT COUNT(*) FROM d) AS deleted"
+)
+
+SET_COLUMNS = ("exercise_log_id", "set_number", "reps", "weight", "rpe", "is_warmup")
+SET_SELECT = "id, " + ", ".join(SET_COLUMNS)
+
+# Above this many sets (e.g. device imports) COPY beats a multi-row INSERT
+COPY_MIN_SETS = 256
+
+
+WORKOUT_HEADER_COLS = (
+    "ga.activity_id, ga.start_time, ga.name, ga.sub_sport, "
+    "(SELECT v.total_activity_volume FROM v_strength_activity_metrics v "
+    "WHERE v.garmin_activity_id = ga.activity_id) AS total_activity_volume"
+)
+
+# Header, metrics, logs and their sets nested as jsonb in one round trip
+GET_WORKOUT_SQL = f"""
+SELECT {WORKOUT_HEADER_COLS},
+COALESCE((
+  SELECT jsonb_agg(jsonb_build_object(
+    'id', el.id, 'garmin_activity_id', el.garmin_activity_id,
+    'exercise_definition_id', el.exercise_definition_id, 'ord', el.ord, 'notes', el.notes,
+    'sets', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'id', es.id, 'exercise_log_id', es.exercise_log_id, 'set_number', es.set_number,
+        'reps', es.reps, 'weight', es.weight, 'rpe', es.rpe, 'is_warmup', es.is_warmup
+      ) ORDER BY es.set_number)
+      FROM exercise_sets es WHERE es.exercise_log_id = el.id
+    ), '[]'::jsonb)
+  ) ORDER BY el.ord, el.id)
+  FROM exercise_logs el WHERE el.garmin_activity_id = ga.activity_id
+), '[]'::jsonb) AS exercises
+FROM garmin_activities ga WHERE ga.activity_id = %s
 """
 
+# Per-day volume rollup behind the muscle-group dashboards (created by INIT_SQL and 20251105_create_strength_daily_rollup.sql)
+REFRESH_ROLLUP_SQL = "REFRESH MATERIALIZED VIEW CONCURRENTLY mv_strength_daily_exdef"
+# Stamped in the refresh transaction; the dashboard cache is keyed on it, so every process sees a
+# new snapshot as soon as it commits and a failed refresh leaves the cached results valid
+MARK_ROLLUP_SQL = (
+    "INSERT INTO strength_rollup_state(id, refreshed_at) VALUES (TRUE, clock_timestamp()) "
+    "ON CONFLICT (id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at"
+)
+ROLLUP_VERSION_SQL = "SELECT COALESCE((SELECT refreshed_at::text FROM strength_rollup_state), '') AS version"
+# Writes arriving within this many seconds share one background refresh
+ROLLUP_REFRESH_DELAY = 2.0
+
+LIST_WORKOUTS_SQL = (
+    "SELECT activity_id AS id, start_time, name, sub_sport FROM garmin_activities "
+    "WHERE LOWER(COALESCE(sub_sport,'')) = 'strength_training' "
+    "ORDER BY start_time DESC LIMIT %s OFFSET %s"
+)
+
+
+def _opt(cast, value):
+    return None if value is None else cast(value)
+
+
+# SQL assembly is pure in the set of filters present; build each shape once per process
+@lru_cache(maxsize=8)
+def _search_exercises_sql(has_query: bool, has_muscle_group: bool) -> str:
+    where: list[str] = []
+    if has_query:
+        # %% is pg_trgm's similarity operator (escaped for the driver); both arms use the GIN trigram index
+        where.append("(e.name ILIKE %s OR e.name %% %s)")
+    if has_muscle_group:
+        # @> (not = ANY) so the secondary-groups arm can use the GIN index on the array
+        where.append("(e.primary_muscle_group_id = %s OR e.secondary_muscle_group_ids @> ARRAY[%s]::int[])")
+    sql = (
+        "SELECT e.id, e.name, e.primary_muscle_group_id, e.secondary_muscle_group_ids, e.equipment_type, e.exercise_type, e.description "
+        "FROM exercise_definitions e "
+    )
+    if where:
+        sql += "WHERE " + " AND ".join(where) + " "
+    if has_query:
+        return sql + "ORDER BY similarity(e.name, %s) DESC, e.name LIMIT 100"
+    return sql + "ORDER BY e.name LIMIT 100"
+
+
+@lru_cache(maxsize=8)
+def _sets_by_log_sql(columns: str) -> str:
+    return (
+        f"SELECT exercise_log_id AS _log_id, {columns} FROM exercise_sets "
+        "WHERE exercise_log_id = ANY(%s) ORDER BY exercise_log_id, set_number"
+    )
+
 
 class PostgresStrengthRepository(IStrengthRepository):
-    def ensure_tables(self) -> None:
+    # INIT_SQL is idempotent; run it once per process (app startup) instead of on every call
+    _tables_ready: bool = False
+    _init_lock = asyncio.Lock()
+    # Muscle groups and exercise definitions change only through the upserts below (seeding),
+    # which clear this; the TTL bounds staleness from writes made by other processes.
+    _catalog_cache = TTLCache[Any](600.0, maxsize=1024)
+    # Muscle-group dashboards, keyed by (query, muscle group, window, rollup version). The version
+    # comes from the DB, so a refresh by any process invalidates them everywhere. The TTL bounds how
+    # long exercise names/groups edited by another process stay stale, like the catalog cache.
+    _analytics_cache = TTLCache[Any](600.0, maxsize=1024)
+    # Debounced background refresh of the rollup (see _schedule_rollup_refresh)
+    _refresh_task: Optional[asyncio.Task] = None
+    _refresh_requested: bool = False
+
+    async def ensure_tables(self) -> None:
         # Ensure extensions and base tables (tables are created by SQL file; this is safe idempotent extra)
-        execute_query(INIT_SQL)
+        if PostgresStrengthRepository._tables_ready:
+            return
+        async with PostgresStrengthRepository._init_lock:
+            # Concurrent first callers wait for one INIT_SQL run instead of each sending it
+            if PostgresStrengthRepository._tables_ready:
+                return
+            if await async_execute_query(INIT_SQL, fetch_all=False):
+                PostgresStrengthRepository._tables_ready = True
 
     # ------------- Muscle groups -------------
-    def list_muscle_groups(self) -> list[dict]:
-        self.ensure_tables()
-        return execute_query("SELECT id, name, description FROM muscle_groups ORDER BY id", fetch_all=True) or []
-
-    def upsert_muscle_groups(self, groups: Sequence[dict]) -> None:
-        self.ensure_tables()
-        for g in groups:
-            execute_query(
-                """
-                INSERT INTO muscle_groups(name, description)
-                VALUES(%s, %s)
-                ON CONFLICT (name) DO UPDATE SET description=EXCLUDED.description
-                """,
-                (g.get("name"), g.get("description")),
-                fetch_all=False,
-                fetch_one=False,
-            )
+    async def _cached(self, key: str, load, cache: TTLCache[Any] | None = None) -> Any:
+        # Empty results are not cached: async_execute_query returns []/None on errors too
+        cache = self._catalog_cache if cache is None else cache
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        value = await load()
+        if value:
+            cache.set(key, value)
+        return value
+
+    async def list_muscle_groups(self) -> list[dict]:
+        return await self._cached(
+            "muscle_groups",
+            lambda: async_execute_query("SELECT id, name, description FROM muscle_groups ORDER BY id", fetch_all=True),
+        ) or []
+
+    async def upsert_muscle_groups(self, groups: Sequence[dict]) -> None:
+        await async_execute_values(
+            """
+            INSERT INTO muscle_groups(name, description)
+            VALUES %s
+            ON CONFLICT (name) DO UPDATE SET description=EXCLUDED.description
+            """,
+            # ON CONFLICT cannot touch a row twice per statement; last duplicate wins, as before
+            [(g.get("name"), g.get("description")) for g in {g.get("name"): g for g in groups}.values()],
+            page_size=1000,
+        )
+        self._catalog_cache.clear()
 
     # ------------- Exercises -------------
-    def list_exercises(self) -> list[dict]:
-        self.ensure_tables()
-        return execute_query(
+    async def list_exercises(self) -> list[dict]:
+        return await self._cached("exercises", lambda: async_execute_query(
             """
             SELECT e.id, e.name, e.primary_muscle_group_id, e.secondary_muscle_group_ids,
                    e.equipment_type, e.exercise_type, e.description,
@@ -47,235 +233,209 @@ class PostgresStrengthRepository(IStrengthRepository):
             ORDER BY e.name
             """,
             fetch_all=True,
-        ) or []
+        )) or []
 
-    def get_exercise(self, exercise_id: int) -> Optional[dict]:
-        self.ensure_tables()
-        return execute_query(
+    async def get_exercise(self, exercise_id: int) -> Optional[dict]:
+        return await self._cached(f"exercise:{exercise_id}", lambda: async_execute_query(
             """
-            SELECT e.* FROM exercise_definitions e WHERE e.id = %s
+            SELECT e.id, e.name, e.primary_muscle_group_id, e.secondary_muscle_group_ids,
+                   e.equipment_type, e.exercise_type, e.description
+            FROM exercise_definitions e WHERE e.id = %s
             """,
             (exercise_id,),
             fetch_one=True,
             fetch_all=False,
-        )
+        ))
 
-    def search_exercises(self, *, query: str | None, muscle_group_id: int | None) -> list[dict]:
-        self.ensure_tables()
+    async def search_exercises(self, *, query: str | None, muscle_group_id: int | None) -> list[dict]:
+        await self.ensure_tables()  # pg_trgm operator; no-op after startup
         q = query or ""
         mg = muscle_group_id
         params: list = []
-        where: list[str] = []
         if q:
-            where.append("(e.name ILIKE %s OR e.name %s %s)")
-            # fallback plain ilike; pg_trgm similarity operator %
-            params.extend([f"%{q}%", "%", q])
+            params.extend([f"%{q}%", q])
         if mg is not None:
-            where.append("(e.primary_muscle_group_id = %s OR %s = ANY(e.secondary_muscle_group_ids))")
             params.extend([mg, mg])
-        sql = (
-            "SELECT e.id, e.name, e.primary_muscle_group_id, e.secondary_muscle_group_ids, e.equipment_type, e.exercise_type, e.description "
-            "FROM exercise_definitions e "
-        )
-        if where:
-            sql += "WHERE " + " AND ".join(where) + " "
-        sql += "ORDER BY e.name LIMIT 100"
-        return execute_query(sql, tuple(params) if params else None, fetch_all=True) or []
-
-    def upsert_exercises(self, exercises: Sequence[dict]) -> None:
-        self.ensure_tables()
-        for ex in exercises:
-            execute_query(
-                """
-                INSERT INTO exercise_definitions(name, primary_muscle_group_id, secondary_muscle_group_ids, equipment_type, exercise_type, description)
-                VALUES(%s,%s,%s,%s,%s,%s)
-                ON CONFLICT (name) DO UPDATE SET
-                    primary_muscle_group_id = EXCLUDED.primary_muscle_group_id,
-                    secondary_muscle_group_ids = EXCLUDED.secondary_muscle_group_ids,
-                    equipment_type = EXCLUDED.equipment_type,
-                    exercise_type = EXCLUDED.exercise_type,
-                    description = EXCLUDED.description
-                """,
+        if q:
+            params.append(q)  # ORDER BY similarity
+        sql = _search_exercises_sql(bool(q), mg is not None)
+        return await async_execute_query(sql, tuple(params) if params else None, fetch_all=True) or []
+
+    async def upsert_exercises(self, exercises: Sequence[dict]) -> None:
+        await async_execute_values(
+            """
+            INSERT INTO exercise_definitions(name, primary_muscle_group_id, secondary_muscle_group_ids, equipment_type, exercise_type, description)
+            VALUES %s
+            ON CONFLICT (name) DO UPDATE SET
+                primary_muscle_group_id = EXCLUDED.primary_muscle_group_id,
+                secondary_muscle_group_ids = EXCLUDED.secondary_muscle_group_ids,
+                equipment_type = EXCLUDED.equipment_type,
+                exercise_type = EXCLUDED.exercise_type,
+                description = EXCLUDED.description
+            """,
+            [
                 (
                     ex.get("name"),
                     ex.get("primary_muscle_group_id"),
-                    ex.get("secondary_muscle_group_ids") or [],
+                    # Python list -> int[]; explicit cast so an empty list is not typed as text[]
+                    list(ex.get("secondary_muscle_group_ids") or []),
                     ex.get("equipment_type"),
                     ex.get("exercise_type"),
                     ex.get("description"),
-                ),
-                fetch_all=False,
-                fetch_one=False,
-            )
+                )
+                for ex in {ex.get("name"): ex for ex in exercises}.values()
+            ],
+            template="(%s,%s,%s::int[],%s,%s,%s)",
+            page_size=1000,
+        )
+        self._catalog_cache.clear()
+        # Dashboards join muscle groups and names from the definitions at query time
+        self._analytics_cache.clear()
 
     # ------------- Workouts -------------
-    def create_workout(self, payload: dict) -> dict:
-        self.ensure_tables()
+    async def create_workout(self, payload: dict) -> dict:
         activity_id = payload.get("activityId")
         if not activity_id:
             raise ValueError("activityId is required to attach strength logs to a Garmin activity")
-        # verify activity exists and is strength_training
-        a = execute_query(
-            "SELECT activity_id, start_time, name, sub_sport FROM garmin_activities WHERE activity_id=%s",
-            (activity_id,),
-            fetch_one=True,
-            fetch_all=False,
-        )
-        if not a:
-            raise ValueError("Garmin activity not found")
-        # Insert logs + sets linked to garmin activity
-        out_logs: list[dict] = []
-        for idx, ex in enumerate(payload.get("exercises", []) or []):
-            log_row = execute_query(
-                """
-                INSERT INTO exercise_logs(garmin_activity_id, exercise_definition_id, ord, notes)
-                VALUES(%s,%s,%s,%s)
-                RETURNING id, garmin_activity_id, exercise_definition_id, ord, notes
-                """,
-                (
-                    activity_id,
-                    ex.get("exerciseDefinitionId"),
-                    ex.get("order") or (idx + 1),
-                    ex.get("notes"),
-                ),
-                fetch_one=True,
-                fetch_all=False,
+        # Verify the activity and insert logs + sets on one connection in one transaction: a single
+        # commit, no partial workouts, and FOR SHARE keeps the activity from vanishing midway
+        async with async_transaction() as tx:
+            a = await tx.fetch_one(
+                "SELECT activity_id, start_time, name, sub_sport FROM garmin_activities WHERE activity_id=%s FOR SHARE",
+                (activity_id,),
             )
-            log_id = log_row["id"]
-            out_sets: list[dict] = []
-            for s in ex.get("sets", []) or []:
-                set_row = execute_query(
-                    """
-                    INSERT INTO exercise_sets(exercise_log_id, set_number, reps, weight, rpe, is_warmup)
-                    VALUES(%s,%s,%s,%s,%s,%s)
-                    RETURNING id, exercise_log_id, set_number, reps, weight, rpe, is_warmup
-                    """,
-                    (
-                        log_id,
-                        s.get("setNumber"),
-                        s.get("reps"),
-                        s.get("weight"),
-                        s.get("rpe"),
-                        bool(s.get("isWarmup", False)),
-                    ),
-                    fetch_one=True,
-                    fetch_all=False,
-                )
-                out_sets.append(set_row)
-            log_row["sets"] = out_sets
-            out_logs.append(log_row)
+            if not a:
+                raise ValueError("Garmin activity not found")
+            out_logs = await self._insert_logs(tx, activity_id, payload.get("exercises", []) or [])
+        self._schedule_rollup_refresh()
 
         return {"activity_id": activity_id, "start_time": a.get("start_time"), "name": a.get("name"), "sub_sport": a.get("sub_sport"), "exercises": out_logs}
 
-    def get_workout(self, workout_id: int) -> Optional[dict]:
-        self.ensure_tables()
-        # Treat workout_id as garmin activity id
-        a = execute_query(
-            "SELECT activity_id, start_time, name, sub_sport FROM garmin_activities WHERE activity_id=%s",
-            (workout_id,),
-            fetch_one=True,
-            fetch_all=False,
+    async def _insert_logs(self, tx: AsyncTransaction, activity_id: int, exercises: Sequence[dict]) -> list[dict]:
+        # One unnest INSERT for the logs and one for all sets; logs are matched to their
+        # exercises by position.
+        if not exercises:
+            return []
+        log_cols = list(zip(*(
+            (_opt(int, ex.get("exerciseDefinitionId")), _opt(int, ex.get("order")) or (idx + 1), ex.get("notes"))
+            for idx, ex in enumerate(exercises)
+        )))
+        log_rows = sorted(
+            await tx.fetch_all(INSERT_LOGS_SQL, (activity_id, *map(list, log_cols))),
+            key=lambda r: r["id"],
         )
-        if not a:
-            return None
-        logs = execute_query(
-            "SELECT * FROM exercise_logs WHERE garmin_activity_id=%s ORDER BY ord, id",
-            (workout_id,),
+        # psycopg cannot dump mixed int/float lists, so numeric columns are normalized here
+        set_rows = [
+            (
+                log_row["id"],
+                _opt(int, s.get("setNumber")),
+                _opt(int, s.get("reps")),
+                _opt(float, s.get("weight")),
+                _opt(float, s.get("rpe")),
+                bool(s.get("isWarmup", False)),
+            )
+            for log_row, ex in zip(log_rows, exercises)
+            for s in ex.get("sets", []) or []
+        ]
+        if len(set_rows) >= COPY_MIN_SETS:
+            inserted = await self._copy_sets(tx, set_rows, [log_row["id"] for log_row in log_rows])
+        elif set_rows:
+            inserted = await tx.fetch_all(INSERT_SETS_SQL, tuple(map(list, zip(*set_rows))))
+        else:
+            inserted = []
+        by_log: dict[int, list[dict]] = {}
+        for set_row in inserted:
+            by_log.setdefault(set_row["exercise_log_id"], []).append(set_row)
+        for log_row in log_rows:
+            log_row["sets"] = by_log.get(log_row["id"], [])
+        return log_rows
+
+    async def _copy_sets(self, tx: AsyncTransaction, set_rows: list[tuple], log_ids: list[int]) -> list[dict]:
+        # COPY returns no ids; the logs were just inserted, so every set under them is one of
+        # ours and they can be re-selected (id order == COPY order).
+        await tx.copy_rows("exercise_sets", SET_COLUMNS, set_rows)
+        return await tx.fetch_all(
+            f"SELECT {SET_SELECT} FROM exercise_sets WHERE exercise_log_id = ANY(%s) ORDER BY exercise_log_id, id",
+            (log_ids,),
+        )
+
+    async def _sets_by_log(self, log_ids: Sequence[int], columns: str = SET_SELECT) -> dict[int, list[dict]]:
+        # One `= ANY(array)` query for every log instead of a query per log; the SQL text
+        # is the same for any number of ids.
+        if not log_ids:
+            return {}
+        rows = await async_execute_query(
+            _sets_by_log_sql(columns),
+            (list(log_ids),),
             fetch_all=True,
         ) or []
-        for log in logs:
-            sets = execute_query(
-                "SELECT * FROM exercise_sets WHERE exercise_log_id=%s ORDER BY set_number",
-                (log["id"],),
-                fetch_all=True,
-            ) or []
-            log["sets"] = sets
-        out = {"id": a.get("activity_id"), "start_time": a.get("start_time"), "name": a.get("name"), "sub_sport": a.get("sub_sport"), "exercises": logs}
-        # Attach metrics based on activity
-        am = execute_query(
-            "SELECT total_activity_volume FROM v_strength_activity_metrics WHERE garmin_activity_id=%s",
+        out: dict[int, list[dict]] = defaultdict(list)
+        for r in rows:
+            out[r.pop("_log_id")].append(r)
+        return out
+
+    @staticmethod
+    def _workout_out(row: dict) -> dict:
+        volume = row.get("total_activity_volume")
+        return {
+            "id": row.get("activity_id"),
+            "start_time": row.get("start_time"),
+            "name": row.get("name"),
+            "sub_sport": row.get("sub_sport"),
+            "metrics": {"totalVolume": volume if volume is not None else 0},
+        }
+
+    async def _workout_header(self, workout_id: int) -> Optional[dict]:
+        # Treat workout_id as garmin activity id; everything but the logs/sets
+        row = await async_execute_query(
+            f"SELECT {WORKOUT_HEADER_COLS} FROM garmin_activities ga WHERE ga.activity_id = %s",
             (workout_id,),
             fetch_one=True,
             fetch_all=False,
         )
-        out["metrics"] = {"totalVolume": (am or {}).get("total_activity_volume", 0)}
-        return out
+        return self._workout_out(row) if row else None
 
-    def list_workouts(self, *, limit: int = 50, offset: int = 0) -> list[dict]:
-        self.ensure_tables()
-        params: list = []
-        where = ["LOWER(COALESCE(sub_sport,'')) = 'strength_training'"]
-        sql = (
-            "SELECT activity_id AS id, start_time, name, sub_sport FROM garmin_activities "
-            + ("WHERE " + " AND ".join(where) if where else "") +
-            " ORDER BY start_time DESC LIMIT %s OFFSET %s"
-        )
-        params.extend([limit, offset])
-        return execute_query(sql, tuple(params), fetch_all=True) or []
-
-    def update_workout(self, workout_id: int, payload: dict) -> dict:
-        self.ensure_tables()
-        # Replace logs and sets for the garmin activity
-        execute_query("DELETE FROM exercise_sets WHERE exercise_log_id IN (SELECT id FROM exercise_logs WHERE garmin_activity_id=%s)", (workout_id,), fetch_all=False, fetch_one=False)
-        execute_query("DELETE FROM exercise_logs WHERE garmin_activity_id=%s", (workout_id,), fetch_all=False, fetch_one=False)
-
-        out_logs: list[dict] = []
-        for idx, ex in enumerate(payload.get("exercises", []) or []):
-            log_row = execute_query(
-                """
-                INSERT INTO exercise_logs(garmin_activity_id, exercise_definition_id, ord, notes)
-                VALUES(%s,%s,%s,%s)
-                RETURNING id, garmin_activity_id, exercise_definition_id, ord, notes
-                """,
-                (
-                    workout_id,
-                    ex.get("exerciseDefinitionId"),
-                    ex.get("order") or (idx + 1),
-                    ex.get("notes"),
-                ),
-                fetch_one=True,
-                fetch_all=False,
-            )
-            log_id = log_row["id"]
-            out_sets: list[dict] = []
-            for s in ex.get("sets", []) or []:
-                set_row = execute_query(
-                    """
-                    INSERT INTO exercise_sets(exercise_log_id, set_number, reps, weight, rpe, is_warmup)
-                    VALUES(%s,%s,%s,%s,%s,%s)
-                    RETURNING id, exercise_log_id, set_number, reps, weight, rpe, is_warmup
-                    """,
-                    (
-                        log_id,
-                        s.get("setNumber"),
-                        s.get("reps"),
-                        s.get("weight"),
-                        s.get("rpe"),
-                        bool(s.get("isWarmup", False)),
-                    ),
-                    fetch_one=True,
-                    fetch_all=False,
-                )
-                out_sets.append(set_row)
-            log_row["sets"] = out_sets
-            out_logs.append(log_row)
+    async def get_workout(self, workout_id: int) -> Optional[dict]:
+        row = await async_execute_query(GET_WORKOUT_SQL, (workout_id,), fetch_one=True, fetch_all=False)
+        if not row:
+            return None
+        out = self._workout_out(row)
+        out["exercises"] = row.get("exercises") or []  # jsonb arrives decoded
+        return out
 
-        session = self.get_workout(workout_id) or {}
+    async def list_workouts(self, *, limit: int = 50, offset: int = 0) -> list[dict]:
+        return await async_execute_query(LIST_WORKOUTS_SQL, (limit, offset), fetch_all=True) or []
+
+    async def update_workout(self, workout_id: int, payload: dict) -> Optional[dict]:
+        # Replace logs and sets for the garmin activity atomically. A missing activity returns
+        # None (the router's 404) before the child inserts could hit the FK.
+        async with async_transaction() as tx:
+            if not await tx.fetch_one(
+                "SELECT 1 FROM garmin_activities WHERE activity_id=%s FOR SHARE", (workout_id,)
+            ):
+                return None
+            await tx.execute(DELETE_LOGS_SQL, (workout_id,))
+            out_logs = await self._insert_logs(tx, workout_id, payload.get("exercises", []) or [])
+        self._schedule_rollup_refresh()
+
+        # The inserts already returned logs and sets; only the header/metrics need re-reading
+        session = await self._workout_header(workout_id) or {}
         if session:
             session["exercises"] = out_logs
         return session
 
-    def delete_workout(self, workout_id: int) -> bool:
-        self.ensure_tables()
-        # Only delete attached strength logs; do not delete garmin activity
-        execute_query("DELETE FROM exercise_sets WHERE exercise_log_id IN (SELECT id FROM exercise_logs WHERE garmin_activity_id=%s)", (workout_id,), fetch_all=False, fetch_one=False)
-        execute_query("DELETE FROM exercise_logs WHERE garmin_activity_id=%s", (workout_id,), fetch_all=False, fetch_one=False)
-        return True
+    async def delete_workout(self, workout_id: int) -> bool:
+        # Only delete attached strength logs (sets cascade); do not delete garmin activity.
+        # False only when the garmin activity itself does not exist.
+        async with async_transaction() as tx:
+            row = await tx.fetch_one(DELETE_WORKOUT_SQL, (workout_id,))
+        if row and row["deleted"]:
+            self._schedule_rollup_refresh()
+        return bool(row and row["found"])
 
-    def last_exercise_log(self, exercise_definition_id: int) -> Optional[dict]:
-        self.ensure_tables()
+    async def last_exercise_log(self, exercise_definition_id: int) -> Optional[dict]:
         params = [exercise_definition_id]
-        row = execute_query(
+        row = await async_execute_query(
             (
                 "SELECT el.id AS exercise_log_id, ga.start_time, ga.activity_id AS garmin_activity_id\n"
                 "FROM exercise_logs el\n"
@@ -289,7 +449,7 @@ class PostgresStrengthRepository(IStrengthRepository):
         )
         if not row:
             return None
-        sets = execute_query(
+        sets = await async_execute_query(
             "SELECT set_number, reps, weight, rpe, is_warmup FROM exercise_sets WHERE exercise_log_id=%s ORDER BY set_number",
             (row["exercise_log_id"],),
             fetch_all=True,
@@ -298,11 +458,10 @@ class PostgresStrengthRepository(IStrengthRepository):
         return row
 
     # Additional convenience not in protocol: simple exercise stats
-    def exercise_stats(self, exercise_definition_id: int) -> dict:
-        self.ensure_tables()
+    async def exercise_stats(self, exercise_definition_id: int) -> dict:
         # Best e1RM and total volume per activity day
         params: list = [exercise_definition_id]
-        rows = execute_query(
+        rows = await async_execute_query(
             (
                 "SELECT COALESCE(ga.start_time, NOW())::date AS day, m.best_e1rm, m.total_volume "
                 "FROM v_exercise_log_metrics m "
@@ -315,82 +474,102 @@ class PostgresStrengthRepository(IStrengthRepository):
         ) or []
         return {"series": rows}
 
-    def muscle_group_weekly_volume(self, muscle_group_id: int, weeks: int = 12) -> list[dict]:
-        self.ensure_tables()
-        params = [muscle_group_id, weeks]
+    @classmethod
+    def _schedule_rollup_refresh(cls) -> None:
+        # Called after a workout write commits. The refresh rebuilds the whole rollup, so it runs in
+        # one background task per process rather than in the request, and bursts of writes coalesce.
+        cls._refresh_requested = True
+        if cls._refresh_task is None or cls._refresh_task.done():
+            cls._refresh_task = asyncio.get_running_loop().create_task(cls._refresh_rollup())
+
+    @classmethod
+    async def _refresh_rollup(cls) -> None:
+        while cls._refresh_requested:
+            await asyncio.sleep(ROLLUP_REFRESH_DELAY)
+            cls._refresh_requested = False
+            try:
+                # CONCURRENTLY keeps dashboard reads unblocked while the rollup is rebuilt
+                async with async_transaction() as tx:
+                    await tx.execute(REFRESH_ROLLUP_SQL)
+                    await tx.execute(MARK_ROLLUP_SQL)
+            except Exception:
+                # Dashboards keep serving the previous snapshot; the next workout write retries
+                LOGGER.exception("Strength rollup refresh failed")
+
+    async def _cached_analytics(self, key: str, load) -> Any:
+        row = await async_execute_query(ROLLUP_VERSION_SQL, fetch_one=True, fetch_all=False)
+        if not row:
+            # Version unknown (read failed): do not risk serving or storing a stale entry
+            return await load()
+        return await self._cached(f"{key}:{row['version']}", load, self._analytics_cache)
+
+    async def muscle_group_weekly_volume(self, muscle_group_id: int, weeks: int = 12) -> list[dict]:
         sql = (
             """
-            SELECT date_trunc('week', ga.start_time)::date AS week,
+            SELECT date_trunc('week', r.day)::date AS week,
                    SUM(
-                     CASE WHEN e.primary_muscle_group_id = %s THEN m.total_volume
-                          WHEN %s = ANY(e.secondary_muscle_group_ids) THEN m.total_volume * 0.3
+                     CASE WHEN e.primary_muscle_group_id = %s THEN r.total_volume
+                          WHEN %s = ANY(e.secondary_muscle_group_ids) THEN r.total_volume * 0.3
                           ELSE 0 END
                    ) AS total_volume
-            FROM v_exercise_log_metrics m
-            JOIN exercise_definitions e ON e.id = m.exercise_definition_id
-            JOIN exercise_logs el ON el.id = m.exercise_log_id
-            JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id
-            WHERE ga.start_time >= NOW() - INTERVAL %s AND LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training'
+            FROM mv_strength_daily_exdef r
+            JOIN exercise_definitions e ON e.id = r.exercise_definition_id
+            WHERE r.day >= (NOW() - make_interval(weeks => %s))::date
             GROUP BY 1
             ORDER BY 1
             """
         )
-        interval = f"'{weeks} weeks'"
-        sql = sql.replace("%s\n            GROUP BY", interval + "\n            GROUP BY", 1)
-        return execute_query(sql, tuple([muscle_group_id, muscle_group_id]), fetch_all=True) or []
+        return await self._cached_analytics(
+            f"mg_week_vol:{muscle_group_id}:{weeks}",
+            lambda: async_execute_query(sql, (muscle_group_id, muscle_group_id, weeks), fetch_all=True),
+        ) or []
 
-    def exercise_contribution_last_month(self, muscle_group_id: int, days: int = 30) -> list[dict]:
-        self.ensure_tables()
-        params = [muscle_group_id]
+    async def exercise_contribution_last_month(self, muscle_group_id: int, days: int = 30) -> list[dict]:
         sql = (
             """
             WITH vols AS (
               SELECT e.id AS exercise_id, e.name,
-                     SUM(CASE WHEN e.primary_muscle_group_id = %s THEN m.total_volume ELSE 0 END)
-                     + SUM(CASE WHEN %s = ANY(e.secondary_muscle_group_ids) THEN m.total_volume * 0.3 ELSE 0 END) AS volume
-              FROM v_exercise_log_metrics m
-              JOIN exercise_definitions e ON e.id = m.exercise_definition_id
-              JOIN exercise_logs el ON el.id = m.exercise_log_id
-              JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id
-              WHERE ga.start_time >= NOW() - INTERVAL %s AND LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training'
+                     SUM(CASE WHEN e.primary_muscle_group_id = %s THEN r.total_volume ELSE 0 END)
+                     + SUM(CASE WHEN %s = ANY(e.secondary_muscle_group_ids) THEN r.total_volume * 0.3 ELSE 0 END) AS volume
+              FROM mv_strength_daily_exdef r
+              JOIN exercise_definitions e ON e.id = r.exercise_definition_id
+              WHERE r.day >= (NOW() - make_interval(days => %s))::date
+                -- Exercises outside the group contribute 0 and are cut by volume > 0; skip them before grouping
+                AND (e.primary_muscle_group_id = %s OR e.secondary_muscle_group_ids @> ARRAY[%s]::int[])
               GROUP BY e.id, e.name
             )
             SELECT * FROM vols WHERE volume > 0 ORDER BY volume DESC LIMIT 100
             """
         )
-        interval = f"'{days} days'"
-        sql = sql.replace("%s\n              GROUP", interval + "\n              GROUP", 1)
-        return execute_query(sql, tuple([muscle_group_id]), fetch_all=True) or []
+        return await self._cached_analytics(
+            f"mg_contrib:{muscle_group_id}:{days}",
+            lambda: async_execute_query(
+                sql, (muscle_group_id, muscle_group_id, days, muscle_group_id, muscle_group_id), fetch_all=True
+            ),
+        ) or []
 
-    def weekly_training_frequency(self, muscle_group_id: int, weeks: int = 12) -> list[dict]:
-        self.ensure_tables()
-        params = [muscle_group_id]
+    async def weekly_training_frequency(self, muscle_group_id: int, weeks: int = 12) -> list[dict]:
         sql = (
             """
-            SELECT date_trunc('week', ga.start_time)::date AS week,
-                   COUNT(DISTINCT ga.activity_id) AS sessions
-            FROM garmin_activities ga
-            WHERE ga.start_time >= NOW() - INTERVAL %s AND LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training'
-            AND EXISTS (
-              SELECT 1
-              FROM exercise_logs el
-              JOIN exercise_definitions e ON e.id = el.exercise_definition_id
-              WHERE el.garmin_activity_id = ga.activity_id
-                AND (e.primary_muscle_group_id = %s OR %s = ANY(e.secondary_muscle_group_ids))
-            )
+            SELECT date_trunc('week', r.day)::date AS week,
+                   COUNT(DISTINCT a.activity_id) AS sessions
+            FROM mv_strength_daily_exdef r
+            JOIN exercise_definitions e ON e.id = r.exercise_definition_id
+            CROSS JOIN LATERAL unnest(r.activity_ids) AS a(activity_id)
+            WHERE r.day >= (NOW() - make_interval(weeks => %s))::date
+              AND (e.primary_muscle_group_id = %s OR e.secondary_muscle_group_ids @> ARRAY[%s]::int[])
             GROUP BY 1
             ORDER BY 1
             """
         )
-        interval = f"'{weeks} weeks'"
-        sql = sql.replace("%s\n            AND EXISTS", interval + "\n            AND EXISTS", 1)
-        final_params = [muscle_group_id, muscle_group_id]
-        return execute_query(sql, tuple(final_params), fetch_all=True) or []
+        return await self._cached_analytics(
+            f"mg_week_freq:{muscle_group_id}:{weeks}",
+            lambda: async_execute_query(sql, (weeks, muscle_group_id, muscle_group_id), fetch_all=True),
+        ) or []
 
-    def exercise_history(self, exercise_definition_id: int, limit: int = 20) -> list[dict]:
-        self.ensure_tables()
+    async def exercise_history(self, exercise_definition_id: int, limit: int = 20) -> list[dict]:
         params = [exercise_definition_id]
-        rows = execute_query(
+        rows = await async_execute_query(
             (
                 "SELECT el.id AS exercise_log_id, ga.activity_id AS garmin_activity_id, ga.start_time::date AS day "
                 "FROM exercise_logs el JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id "
@@ -399,18 +578,14 @@ class PostgresStrengthRepository(IStrengthRepository):
             tuple(params + [limit]),
             fetch_all=True,
         ) or []
-        # Fetch sets per log
+        # Fetch sets for all logs in one query
+        sets_by_log = await self._sets_by_log([r["exercise_log_id"] for r in rows], columns="set_number, reps, weight, rpe, is_warmup")
         for r in rows:
-            r["sets"] = execute_query(
-                "SELECT set_number, reps, weight, rpe, is_warmup FROM exercise_sets WHERE exercise_log_id=%s ORDER BY set_number",
-                (r["exercise_log_id"],),
-                fetch_all=True,
-            ) or []
+            r["sets"] = sets_by_log.get(r["exercise_log_id"], [])
         return rows
 
     # -------- Analytics series --------
-    def exercise_e1rm_progress(self, exercise_definition_id: int) -> list[dict]:
-        self.ensure_tables()
+    async def exercise_e1rm_progress(self, exercise_definition_id: int) -> list[dict]:
         params: list = [exercise_definition_id]
         sql = (
             "SELECT ga.start_time::date AS day, MAX(m.best_e1rm) AS best_e1rm "
@@ -419,45 +594,35 @@ class PostgresStrengthRepository(IStrengthRepository):
             "JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id \n"
             "WHERE m.exercise_definition_id = %s GROUP BY 1 ORDER BY 1"
         )
-        return execute_query(sql, tuple(params), fetch_all=True) or []
+        return await async_execute_query(sql, tuple(params), fetch_all=True) or []
 
-    def workouts_volume_series(self, days: int = 90) -> list[dict]:
-        self.ensure_tables()
-        params: list = []
+    async def workouts_volume_series(self, days: int = 90) -> list[dict]:
         sql = (
             """
             SELECT ga.start_time::date AS day, COALESCE(v.total_activity_volume, 0) AS total_volume
             FROM garmin_activities ga LEFT JOIN v_strength_activity_metrics v ON v.garmin_activity_id = ga.activity_id
-            WHERE LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training' AND ga.start_time >= NOW() - INTERVAL %s
+            WHERE LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training' AND ga.start_time >= NOW() - make_interval(days => %s)
             ORDER BY day
             """
         )
-        interval = f"'{days} days'"
-        sql = sql.replace("%s\n            ORDER BY", interval + "\n            ORDER BY", 1)
-        return execute_query(sql, None, fetch_all=True) or []
+        return await async_execute_query(sql, (days,), fetch_all=True) or []
 
-    def all_exercises_e1rm_progress(self, days: int = 180) -> list[dict]:
-        self.ensure_tables()
-        params: list = []
+    async def all_exercises_e1rm_progress(self, days: int = 180) -> list[dict]:
         sql = (
             """
             SELECT m.exercise_definition_id, ga.start_time::date AS day, MAX(m.best_e1rm) AS best_e1rm
             FROM v_exercise_log_metrics m
             JOIN exercise_logs el ON el.id = m.exercise_log_id
             JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id
-            WHERE ga.start_time >= NOW() - INTERVAL %s AND LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training'
+            WHERE ga.start_time >= NOW() - make_interval(days => %s) AND LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training'
             GROUP BY m.exercise_definition_id, day
             ORDER BY m.exercise_definition_id, day
             """
         )
-        interval = f"'{days} days'"
-        sql = sql.replace("%s\n            GROUP BY", interval + "\n            GROUP BY", 1)
-        return execute_query(sql, None, fetch_all=True) or []
+        return await async_execute_query(sql, (days,), fetch_all=True) or []
 
     # Not in protocol: counts per day to support correlations
-    def daily_strength_counts(self, days: int = 90) -> list[dict]:
-        self.ensure_tables()
-        params: list = []
+    async def daily_strength_counts(self, days: int = 90) -> list[dict]:
         sql = (
             """
             SELECT ga.start_time::date AS day,
@@ -466,48 +631,38 @@ class PostgresStrengthRepository(IStrengthRepository):
             FROM garmin_activities ga
             LEFT JOIN exercise_logs el ON el.garmin_activity_id = ga.activity_id
             LEFT JOIN exercise_sets es ON es.exercise_log_id = el.id
-            WHERE LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training' AND ga.start_time >= NOW() - INTERVAL %s
+            WHERE LOWER(COALESCE(ga.sub_sport,'')) = 'strength_training' AND ga.start_time >= NOW() - make_interval(days => %s)
             GROUP BY 1
             ORDER BY 1
             """
         )
-        interval = f"'{days} days'"
-        sql = sql.replace("%s\n            GROUP BY", interval + "\n            GROUP BY", 1)
-        return execute_query(sql, None, fetch_all=True) or []
-
-    # Templates using gym_store bucket as generic JSON storage
-    def list_templates(self) -> list[dict]:
-        return execute_query("SELECT payload FROM gym_store WHERE key='strength_templates'", fetch_one=True) or {"payload": []}["payload"]
-
-    def upsert_template(self, tpl: dict) -> dict:
-        existing = self.list_templates()
-        filtered = [t for t in existing if t.get("id") != tpl.get("id")]
-        filtered.append(tpl)
-        execute_query(
+        return await async_execute_query(sql, (days,), fetch_all=True) or []
+
+    # Templates: one row per template (migrated from the gym_store 'strength_templates' blob)
+    async def list_templates(self) -> list[dict]:
+        rows = await async_execute_query("SELECT payload FROM strength_templates ORDER BY updated_at, id", fetch_all=True) or []
+        return [r["payload"] for r in rows]
+
+    async def upsert_template(self, tpl: dict) -> dict:
+        from psycopg.types.json import Jsonb  # psycopg3 only, like the async pool; keeps psycopg2 imports working
+        await async_execute_query(
             """
-            INSERT INTO gym_store(key, payload, updated_at) VALUES('strength_templates', %s, NOW())
-            ON CONFLICT (key) DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW()
+            INSERT INTO strength_templates(id, payload, updated_at) VALUES(%s, %s, NOW())
+            ON CONFLICT (id) DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW()
             """,
-            (filtered,),
+            (tpl.get("id"), Jsonb(tpl)),
             fetch_all=False,
             fetch_one=False,
         )
         return tpl
 
-    def delete_template(self, tpl_id: str) -> bool:
-        existing = self.list_templates()
-        filtered = [t for t in existing if t.get("id") != tpl_id]
-        if len(filtered) == len(existing):
-            return False
-        execute_query(
-            """
-            INSERT INTO gym_store(key, payload, updated_at) VALUES('strength_templates', %s, NOW())
-            ON CONFLICT (key) DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW()
-            """,
-            (filtered,),
+    async def delete_template(self, tpl_id: str) -> bool:
+        row = await async_execute_query(
+            "DELETE FROM strength_templates WHERE id=%s RETURNING id",
+            (tpl_id,),
+            fetch_one=True,
             fetch_all=False,
-            fetch_one=False,
         )
-        return True
+        return row is not None
 
 __all__ = ["PostgresStrengthRepository"]
@@ -15,6 +15,29 @@ class PostgresWeightRepository(IWeightRepository):
     def latest_day_only(self) -> Optional[dict]:
         return execute_query("SELECT day FROM garmin_weight ORDER BY day DESC LIMIT 1", (), fetch_one=True)
 
+    def latest_summary(self) -> Optional[dict]:
+        """latest() and latest_day_only() in one round trip.
+
+        Returns ``{"latest_day": ..., "latest": <latest() row or None>}``, or None when the table is empty.
+        """
+        row = execute_query(
+            """
+            SELECT d.day AS latest_day, w.day, w.weight_kg, w.bmi, w.body_fat_percentage,
+                   w.muscle_mass_kg, w.body_water_percentage
+            FROM (SELECT day FROM garmin_weight ORDER BY day DESC LIMIT 1) d
+            LEFT JOIN LATERAL (
+              SELECT day, weight_kg, bmi, body_fat_percentage, muscle_mass_kg, body_water_percentage
+              FROM garmin_weight WHERE weight_kg IS NOT NULL ORDER BY day DESC LIMIT 1
+            ) w ON TRUE
+            """,
+            (),
+            fetch_one=True,
+        )
+        if not row:
+            return None
+        latest_day = row.pop("latest_day")
+        return {"latest_day": latest_day, "latest": row if row.get("day") is not None else None}
+
     def history(self, limit_days: int) -> list[dict]:
         rows = execute_query(
             """
@@ -31,16 +54,16 @@ class PostgresWeightRepository(IWeightRepository):
 
     def recent_joined(self, days: int) -> list[dict]:
         return execute_query(
-            f"""
+            """
             SELECT w.weight_kg, j.energy_level, j.mood, j.stress_level_manual, ds.sleep_score,
                    ds.steps, ds.resting_heart_rate
             FROM garmin_weight w
             LEFT JOIN daily_journal j ON j.day = w.day
             LEFT JOIN garmin_daily_summaries ds ON ds.day = w.day
             WHERE w.weight_kg IS NOT NULL
-              AND w.day >= (CURRENT_DATE - INTERVAL '{days} day')
+              AND w.day >= (CURRENT_DATE - make_interval(days => %s))
             ORDER BY w.day DESC
             """,
-            (),
+            (days,),
             fetch_all=True,
         ) or []
@@ -1,35 +1,58 @@
 from __future__ import annotations
 
 import time
+from collections import OrderedDict
 from typing import Generic, TypeVar, Callable, Optional
 
 T = TypeVar("T")
 
 class TTLCache(Generic[T]):
-    """A minimal in-memory TTL cache.
+    """A minimal in-memory TTL cache with LRU size bound.
 
     - Per-process only (fine for multi-worker uvicorn; each worker has its own cache)
-    - KISS: no eviction beyond TTL; keys are simple strings
+    - Entries expire after the TTL; beyond ``maxsize`` the least recently used is evicted
+    - Expiry uses the monotonic clock, so wall-clock jumps do not expire or resurrect entries
     - Thread-safe enough for typical FastAPI loads given GIL; for strict safety wrap with a lock.
     """
 
-    def __init__(self, ttl_seconds: float = 300.0) -> None:
+    # Expired entries are dropped on read; every this many writes a sweep drops unread ones too
+    _SWEEP_EVERY = 256
+
+    def __init__(self, ttl_seconds: float = 300.0, maxsize: int = 10_000) -> None:
         self._ttl = float(ttl_seconds)
-        self._store: dict[str, tuple[float, T]] = {}
+        self._maxsize = max(1, int(maxsize))
+        self._store: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
 
     def get(self, key: str) -> Optional[T]:
-        now = time.time()
         item = self._store.get(key)
-        if not item:
+        if item is None:
+            self.misses += 1
             return None
         exp, val = item
-        if exp <= now:
-            self._store.pop(key, None)
+        if exp <= time.monotonic():
+            del self._store[key]
+            self.misses += 1
             return None
+        self._store.move_to_end(key)
+        self.hits += 1
         return val
 
     def set(self, key: str, value: T) -> None:
-        self._store[key] = (time.time() + self._ttl, value)
+        now = time.monotonic()
+        self._writes += 1
+        if self._writes % self._SWEEP_EVERY == 0:
+            self._sweep(now)
+        self._store[key] = (now + self._ttl, value)
+        self._store.move_to_end(key)
+        while len(self._store) > self._maxsize:
+            self._store.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        for k in [k for k, (exp, _) in self._store.items() if exp <= now]:
+            del self._store[k]
 
     def invalidate(self, key: str) -> None:
         self._store.pop(key, None)
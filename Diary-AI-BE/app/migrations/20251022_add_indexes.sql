@@ -4,5 +4,16 @@
 CREATE INDEX IF NOT EXISTS idx_gds_day ON garmin_daily_summaries(day);
 CREATE INDEX IF NOT EXISTS idx_gss_day ON garmin_sleep_sessions(day);
 CREATE INDEX IF NOT EXISTS idx_gha_day ON garmin_heart_rate_data(day);
+-- Range scans on ts (recovery HRV proxy window)
+CREATE INDEX IF NOT EXISTS idx_garmin_hr_ts ON garmin_heart_rate_data(ts);
 CREATE INDEX IF NOT EXISTS idx_gsd_day ON garmin_stress_data(day);
 CREATE INDEX IF NOT EXISTS idx_ga_sport_day ON garmin_activities(LOWER(sport), COALESCE(day, start_time::date));
+-- Running-only partial index for the debug/sample queries (ORDER BY start_time DESC LIMIT n)
+CREATE INDEX IF NOT EXISTS idx_ga_running_start ON garmin_activities(start_time DESC) WHERE LOWER(sport) IN ('running', 'run');
+-- Per-day sleep event lookups use a timestamp range; garmin_sleep_events is created by the event migration, so guard it
+DO $$
+BEGIN
+  IF to_regclass('public.garmin_sleep_events') IS NOT NULL THEN
+    CREATE INDEX IF NOT EXISTS idx_gse_timestamp ON garmin_sleep_events(timestamp);
+  END IF;
+END $$;
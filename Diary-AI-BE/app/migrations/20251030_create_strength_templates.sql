@@ -0,0 +1,23 @@
+-- Migration: move strength templates from the gym_store 'strength_templates' blob to one row per template
+-- Date: 2025-10-30
+-- Idempotent (safe to run multiple times)
+CREATE TABLE IF NOT EXISTS strength_templates (
+  id TEXT PRIMARY KEY,
+  payload JSONB NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Copy existing templates once (gym_store is created lazily, so it may not exist yet)
+DO $$
+BEGIN
+  IF to_regclass('public.gym_store') IS NOT NULL THEN
+    INSERT INTO strength_templates(id, payload, updated_at)
+    SELECT t.value->>'id', t.value, g.updated_at
+    FROM gym_store g
+    CROSS JOIN LATERAL jsonb_array_elements(
+      CASE WHEN jsonb_typeof(g.payload) = 'array' THEN g.payload ELSE '[]'::jsonb END
+    ) AS t(value)
+    WHERE g.key = 'strength_templates' AND t.value->>'id' IS NOT NULL
+    ON CONFLICT (id) DO NOTHING;
+  END IF;
+END $$;
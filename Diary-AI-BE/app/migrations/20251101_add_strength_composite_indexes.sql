@@ -0,0 +1,15 @@
+-- Migration: composite indexes matching the WHERE + ORDER BY shape of hot strength/sleep reads
+-- Date: 2025-11-01
+-- Idempotent (safe to run multiple times). Plain CREATE INDEX: run_sql_migrations executes the
+-- file as one script, and CREATE INDEX CONCURRENTLY cannot run inside that implicit transaction.
+
+-- get_workout: WHERE garmin_activity_id = ? ORDER BY ord, id
+CREATE INDEX IF NOT EXISTS idx_exercise_logs_garmin_ord ON exercise_logs(garmin_activity_id, ord, id);
+-- Sets per log (batched ANY() fetch and last_exercise_log): ORDER BY exercise_log_id, set_number
+CREATE INDEX IF NOT EXISTS idx_exercise_sets_log_setnum ON exercise_sets(exercise_log_id, set_number);
+-- last_exercise_log / exercise_history: filter by exercise, then join to the activity
+CREATE INDEX IF NOT EXISTS idx_exercise_logs_def_garmin ON exercise_logs(exercise_definition_id, garmin_activity_id);
+-- list_workouts and last_exercise_log: strength activities newest first
+-- (covering variant idx_ga_strength_start_cov in 20251104_add_strength_covering_index.sql)
+-- Sleep list pages: ORDER BY sleep_start DESC LIMIT n
+CREATE INDEX IF NOT EXISTS idx_gss_sleep_start_desc ON garmin_sleep_sessions(sleep_start DESC);
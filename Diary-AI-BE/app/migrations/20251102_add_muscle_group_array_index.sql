@@ -0,0 +1,7 @@
+-- Migration: GIN index on exercise_definitions.secondary_muscle_group_ids
+-- Date: 2025-11-02
+-- Idempotent (safe to run multiple times)
+-- Serves the muscle-group filters (secondary_muscle_group_ids @> ARRAY[id]) in exercise search and
+-- weekly_training_frequency. The strength_training start_time, exercise_logs and exercise_sets
+-- indexes those analytics need are in 20251101_add_strength_composite_indexes.sql.
+CREATE INDEX IF NOT EXISTS idx_ex_defs_secondary_groups ON exercise_definitions USING GIN (secondary_muscle_group_ids);
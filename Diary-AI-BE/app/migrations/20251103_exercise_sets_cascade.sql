@@ -0,0 +1,28 @@
+-- Migration: make exercise_sets -> exercise_logs cascade on delete
+-- Date: 2025-11-03
+-- Idempotent (safe to run multiple times)
+-- create_strength_tables.sql declares ON DELETE CASCADE already; this fixes databases whose FK
+-- was created without it. Workout update/delete now remove only exercise_logs and rely on it.
+DO $$
+DECLARE
+  c record;
+BEGIN
+  IF to_regclass('public.exercise_sets') IS NULL OR to_regclass('public.exercise_logs') IS NULL THEN
+    RETURN;
+  END IF;
+  FOR c IN
+    SELECT conname FROM pg_constraint
+     WHERE conrelid = 'public.exercise_sets'::regclass AND contype = 'f'
+       AND confrelid = 'public.exercise_logs'::regclass AND confdeltype <> 'c'
+  LOOP
+    EXECUTE format('ALTER TABLE exercise_sets DROP CONSTRAINT %I', c.conname);
+  END LOOP;
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint
+     WHERE conrelid = 'public.exercise_sets'::regclass AND contype = 'f'
+       AND confrelid = 'public.exercise_logs'::regclass
+  ) THEN
+    ALTER TABLE exercise_sets ADD CONSTRAINT exercise_sets_exercise_log_id_fkey
+      FOREIGN KEY (exercise_log_id) REFERENCES exercise_logs(id) ON DELETE CASCADE;
+  END IF;
+END $$;
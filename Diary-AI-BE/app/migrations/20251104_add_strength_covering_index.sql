@@ -0,0 +1,11 @@
+-- Migration: covering partial index for strength activities newest first
+-- Date: 2025-11-04
+-- Idempotent (safe to run multiple times).
+-- last_exercise_log and list_workouts read only activity_id/start_time/name/sub_sport of strength
+-- activities ordered by start_time DESC; with those INCLUDEd the planner can answer from the index
+-- (Index Only Scan, no heap fetches once the visibility map is current after VACUUM).
+-- Replaces the non-covering idx_ga_strength_start left by earlier runs of 20251101.
+CREATE INDEX IF NOT EXISTS idx_ga_strength_start_cov ON garmin_activities(start_time DESC)
+  INCLUDE (activity_id, name, sub_sport)
+  WHERE LOWER(COALESCE(sub_sport, '')) = 'strength_training';
+DROP INDEX IF EXISTS idx_ga_strength_start;
@@ -0,0 +1,30 @@
+-- Migration: per-day, per-exercise strength volume rollup
+-- Date: 2025-11-05
+-- Idempotent (safe to run multiple times).
+-- muscle_group_weekly_volume, exercise_contribution_last_month and weekly_training_frequency read
+-- this instead of re-aggregating every set of strength history. Muscle groups are joined from
+-- exercise_definitions at query time, so catalog edits never make the rollup stale.
+-- PostgresStrengthRepository refreshes it CONCURRENTLY (needs the unique index) in a debounced
+-- background task after workout writes, stamping strength_rollup_state in the same transaction.
+-- Keep in sync with INIT_SQL there, which creates the same objects at startup.
+CREATE TABLE IF NOT EXISTS strength_rollup_state (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+DO $$
+BEGIN
+  IF to_regclass('public.v_exercise_log_metrics') IS NULL OR to_regclass('public.garmin_activities') IS NULL THEN
+    RETURN;
+  END IF;
+  CREATE MATERIALIZED VIEW IF NOT EXISTS mv_strength_daily_exdef AS
+  SELECT ga.start_time::date AS day,
+         el.exercise_definition_id,
+         SUM(m.total_volume) AS total_volume,
+         array_agg(DISTINCT ga.activity_id) AS activity_ids
+  FROM v_exercise_log_metrics m
+  JOIN exercise_logs el ON el.id = m.exercise_log_id
+  JOIN garmin_activities ga ON ga.activity_id = el.garmin_activity_id
+  WHERE LOWER(COALESCE(ga.sub_sport, '')) = 'strength_training'
+  GROUP BY 1, 2;
+  CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_strength_daily_exdef ON mv_strength_daily_exdef(day, exercise_definition_id);
+END $$;
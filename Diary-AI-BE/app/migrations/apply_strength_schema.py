@@ -3,15 +3,13 @@ from __future__ import annotations
 
 from pathlib import Path
 from app.db import execute_query, get_connection
+from app.migrations.sql_script import execute_script
 
 
 def apply_sql(path: Path) -> None:
-    sql = path.read_text(encoding='utf-8')
-    # execute raw SQL; split on semicolons carefully could break functions; just use one execute
+    # Streamed statement by statement (dollar-quote aware), one transaction per file
     with get_connection() as conn:  # type: ignore
-        with conn.cursor() as cur:  # type: ignore[attr-defined]
-            cur.execute(sql)
-            conn.commit()
+        execute_script(conn, path)
 
 
 def main() -> None:
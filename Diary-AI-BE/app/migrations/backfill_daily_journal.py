@@ -8,91 +8,62 @@ from db import get_connection
 
 
 BACKFILL_SQL = r"""
--- 1) Ensure journal rows exist for each day
-INSERT INTO daily_journal(day)
-SELECT ds.day
+-- One pass over garmin_daily_summaries: insert missing journal days with computed scores, and
+-- fill only the still-empty fields of existing days.
+-- width_bucket(x, bounds) counts the bounds <= x, so +1 maps onto ">= bound" score ladders.
+INSERT INTO daily_journal(day, sleep_quality_manual, stress_level_manual, energy_level, mood, productivity_level, updated_at)
+SELECT DISTINCT ON (ds.day)
+  ds.day,
+  b.sleep_quality_manual,
+  b.stress_level_manual,
+  e.energy_level,
+  e.mood,
+  LEAST(5, GREATEST(1, ROUND((e.energy_level + e.mood)/2.0))) AS productivity_level,
+  NOW()
 FROM garmin_daily_summaries ds
-ON CONFLICT (day) DO NOTHING;
-
--- 2) Prepare computed scores from available data
-WITH base AS (
-  SELECT 
-    ds.day,
-    ds.steps,
-    ds.stress_avg,
-    COALESCE(s.sleep_score, 70) AS sleep_score
-  FROM garmin_daily_summaries ds
-  LEFT JOIN garmin_sleep_sessions s ON s.day = ds.day
-), m AS (
+LEFT JOIN garmin_sleep_sessions s ON s.day = ds.day
+CROSS JOIN LATERAL (
   SELECT
-    day,
-    /* Sleep quality 1..5 mapped from 0..100 */
-    CASE
-      WHEN sleep_score >= 85 THEN 5
-      WHEN sleep_score >= 75 THEN 4
-      WHEN sleep_score >= 65 THEN 3
-      WHEN sleep_score >= 50 THEN 2
-      ELSE 1
-    END AS sleep_quality_manual,
-    /* Steps score 1..5 */
-    CASE
-      WHEN steps >= 12000 THEN 5
-      WHEN steps >= 9000 THEN 4
-      WHEN steps >= 6000 THEN 3
-      WHEN steps >= 4000 THEN 2
-      ELSE 1
-    END AS steps_score,
-    /* Stress level manual 1..5 (higher == worse) */
-    CASE
-      WHEN stress_avg IS NULL THEN NULL
-      WHEN stress_avg <= 25 THEN 1
-      WHEN stress_avg <= 40 THEN 2
-      WHEN stress_avg <= 55 THEN 3
-      WHEN stress_avg <= 75 THEN 4
-      ELSE 5
-    END AS stress_level_manual
-  FROM base
-), c AS (
+    /* Sleep quality 1..5 mapped from 0..100 (missing sleep counts as 70) */
+    width_bucket(COALESCE(s.sleep_score, 70)::numeric, ARRAY[50, 65, 75, 85]::numeric[]) + 1 AS sleep_quality_manual,
+    /* Steps score 1..5 (missing steps score 1) */
+    width_bucket(COALESCE(ds.steps, 0)::numeric, ARRAY[4000, 6000, 9000, 12000]::numeric[]) + 1 AS steps_score,
+    /* Stress level manual 1..5 (higher == worse); bounds are upper-inclusive, hence the negation */
+    5 - width_bucket(-ds.stress_avg::numeric, ARRAY[-75, -55, -40, -25]::numeric[]) AS stress_level_manual
+) b
+CROSS JOIN LATERAL (
   SELECT
-    day,
-    sleep_quality_manual,
-    steps_score,
-    stress_level_manual,
     /* Energy prefers sleep(+steps) */
-    LEAST(5, GREATEST(1, ROUND(0.6*sleep_quality_manual + 0.4*steps_score))) AS energy_level,
+    LEAST(5, GREATEST(1, ROUND(0.6*b.sleep_quality_manual + 0.4*b.steps_score))) AS energy_level,
     /* Mood prefers sleep(+steps) but penalizes stress */
-    LEAST(5, GREATEST(1, ROUND(0.6*sleep_quality_manual + 0.2*steps_score + 0.2*(5-COALESCE(stress_level_manual,3))))) AS mood
-  FROM m
-), c2 AS (
-  SELECT
-    day,
-    sleep_quality_manual,
-    stress_level_manual,
-    energy_level,
-    mood,
-    LEAST(5, GREATEST(1, ROUND((energy_level + mood)/2.0))) AS productivity_level
-  FROM c
-)
-UPDATE daily_journal j
-SET 
-  sleep_quality_manual = COALESCE(j.sleep_quality_manual, c2.sleep_quality_manual),
-  stress_level_manual = COALESCE(j.stress_level_manual, c2.stress_level_manual),
-  energy_level = COALESCE(j.energy_level, c2.energy_level),
-  mood = COALESCE(j.mood, c2.mood),
-  productivity_level = COALESCE(j.productivity_level, c2.productivity_level),
+    LEAST(5, GREATEST(1, ROUND(0.6*b.sleep_quality_manual + 0.2*b.steps_score + 0.2*(5-COALESCE(b.stress_level_manual,3))))) AS mood
+) e
+-- ON CONFLICT may touch each day only once; with several sleep sessions on a day use the best scored
+ORDER BY ds.day, s.sleep_score DESC NULLS LAST
+ON CONFLICT (day) DO UPDATE SET
+  sleep_quality_manual = COALESCE(daily_journal.sleep_quality_manual, EXCLUDED.sleep_quality_manual),
+  stress_level_manual = COALESCE(daily_journal.stress_level_manual, EXCLUDED.stress_level_manual),
+  energy_level = COALESCE(daily_journal.energy_level, EXCLUDED.energy_level),
+  mood = COALESCE(daily_journal.mood, EXCLUDED.mood),
+  productivity_level = COALESCE(daily_journal.productivity_level, EXCLUDED.productivity_level),
   updated_at = NOW()
-FROM c2
-WHERE j.day = c2.day;
+-- Rows with every field filled would be rewritten unchanged; leave them (and their updated_at) alone
+WHERE daily_journal.sleep_quality_manual IS NULL OR daily_journal.stress_level_manual IS NULL
+   OR daily_journal.energy_level IS NULL OR daily_journal.mood IS NULL OR daily_journal.productivity_level IS NULL;
 """
 
+# The join uses idx_gss_day (20251022_add_indexes.sql) and the daily_journal(day) key that
+# ON CONFLICT needs; fresh stats let the planner size them after large Garmin imports.
+ANALYZE_SQL = "ANALYZE garmin_daily_summaries, garmin_sleep_sessions"
+
 COUNT_SQL = r"""
 SELECT 
   COUNT(*) AS total,
-  SUM(CASE WHEN mood IS NOT NULL THEN 1 ELSE 0 END) AS mood_filled,
-  SUM(CASE WHEN energy_level IS NOT NULL THEN 1 ELSE 0 END) AS energy_filled,
-  SUM(CASE WHEN productivity_level IS NOT NULL THEN 1 ELSE 0 END) AS productivity_filled,
-  SUM(CASE WHEN stress_level_manual IS NOT NULL THEN 1 ELSE 0 END) AS stress_filled,
-  SUM(CASE WHEN sleep_quality_manual IS NOT NULL THEN 1 ELSE 0 END) AS sleepq_filled
+  COUNT(mood) AS mood_filled,
+  COUNT(energy_level) AS energy_filled,
+  COUNT(productivity_level) AS productivity_filled,
+  COUNT(stress_level_manual) AS stress_filled,
+  COUNT(sleep_quality_manual) AS sleepq_filled
 FROM daily_journal;
 """
 
@@ -101,6 +72,7 @@ def backfill(dry_run: bool = False) -> None:
     with get_connection() as conn:
         with conn.cursor() as cur:  # type: ignore[attr-defined]
             if not dry_run:
+                cur.execute(ANALYZE_SQL)
                 cur.execute(BACKFILL_SQL)
                 conn.commit()
             cur.execute(COUNT_SQL)
@@ -8,6 +8,7 @@ Usage:
 """
 from __future__ import annotations
 
+import os
 import subprocess
 import sys
 from pathlib import Path
@@ -20,7 +21,12 @@ def pip_install(req_path: Path) -> None:
         print(f"requirements.txt not found at {req_path}")
         return
     print(f"📦 Installing requirements from {req_path}...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", str(req_path)])
+    # Wheels over sdists (no local builds of numpy/scipy/sklearn); pip's own cache persists across runs
+    env = {**os.environ, "PIP_DISABLE_PIP_VERSION_CHECK": "1"}
+    subprocess.check_call(
+        [sys.executable, "-m", "pip", "install", "--prefer-binary", "-r", str(req_path)],
+        env=env,
+    )
 
 
 def verify_config() -> bool:
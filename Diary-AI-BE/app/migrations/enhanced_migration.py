@@ -752,6 +752,9 @@ class EnhancedGarminMigrator:
                 conn.exec_driver_sql(
                     "CREATE INDEX IF NOT EXISTS idx_ga_sport_day ON garmin_activities(LOWER(sport), COALESCE(day, start_time::date));"
                 )
+                conn.exec_driver_sql(
+                    "CREATE INDEX IF NOT EXISTS idx_ga_running_start ON garmin_activities(start_time DESC) WHERE LOWER(sport) IN ('running', 'run');"
+                )
                 logger.info("Ensured analytics indexes (sport/day composites and day indexes)")
             except Exception as e:
                 logger.warning(f"Could not ensure garmin_activities composite index: {e}")
@@ -8,39 +8,47 @@ Rules:
 - Only files starting with a 4-digit year are considered (e.g., 20251025_*.sql)
 - Files are applied in sorted order with a small override to ensure
   'migrate_strength_to_garmin' runs before 'drop_workout_sessions' if both exist.
-- Each file is executed as-is in a single cursor.execute; SQL should be idempotent
-  or use IF EXISTS/IF NOT EXISTS where possible.
+- Each file is streamed statement by statement in one transaction (see sql_script.py);
+  SQL should be idempotent or use IF EXISTS/IF NOT EXISTS where possible.
+- The whole run shares one connection; a failing file is rolled back and stops the run,
+  earlier files stay committed.
 """
 
 import sys
 from pathlib import Path
-from typing import List
+from typing import Any, List, Optional
 
 from app.db import get_connection
+from app.migrations.sql_script import execute_script
 
 
 def list_sql_files() -> List[Path]:
     here = Path(__file__).parent
     files = [p for p in here.glob("*.sql") if p.name[:4].isdigit()]
-    files.sort(key=lambda p: p.name)
-    # Ensure drop_workout_sessions runs after migrate_strength_to_garmin on same day
-    def priority(p: Path) -> int:
+    # Ensure drop_workout_sessions runs after migrate_strength_to_garmin on same day.
+    # sorted() evaluates the key once per file, and the full name breaks ties, so no pre-sort is needed.
+    def sort_key(p: Path) -> tuple[str, int, str]:
         name = p.name.lower()
         if "drop_workout_sessions" in name:
-            return 2
-        if "migrate_strength_to_garmin" in name:
-            return 1
-        return 0
-    files = sorted(files, key=lambda p: (p.name[:8], priority(p), p.name))
-    return files
+            priority = 2
+        elif "migrate_strength_to_garmin" in name:
+            priority = 1
+        else:
+            priority = 0
+        return (p.name[:8], priority, p.name)
+    return sorted(files, key=sort_key)
 
 
-def apply_file(path: Path) -> None:
-    sql = path.read_text(encoding="utf-8")
-    with get_connection() as conn:  # type: ignore
-        with conn.cursor() as cur:  # type: ignore[attr-defined]
-            cur.execute(sql)
-            conn.commit()
+def apply_file(path: Path, conn: Optional[Any] = None) -> None:
+    if conn is None:
+        with get_connection() as own:  # type: ignore
+            execute_script(own, path)
+        return
+    try:
+        execute_script(conn, path)
+    except Exception:
+        conn.rollback()
+        raise
 
 
 def main() -> None:
@@ -49,13 +57,14 @@ def main() -> None:
         print("No timestamped SQL migrations found.")
         return
     print("Applying SQL migrations:")
-    for f in files:
-        print(f" - {f.name}")
-        try:
-            apply_file(f)
-        except Exception as e:
-            print(f"Error applying {f.name}: {e}", file=sys.stderr)
-            raise
+    with get_connection() as conn:  # type: ignore
+        for f in files:
+            print(f" - {f.name}")
+            try:
+                apply_file(f, conn)
+            except Exception as e:
+                print(f"Error applying {f.name}: {e}", file=sys.stderr)
+                raise
     print("✅ SQL migrations applied")
 
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import Dict, List
 
-from app.db import execute_query
+from app.db import execute_values
 
 
 MUSCLE_GROUPS = [
@@ -192,41 +192,39 @@ EXERCISES = [
 
 def main() -> None:
     # Ensure tables exist (the SQL file should be applied before running this seeder)
-    # Upsert muscle groups
-    for g in MUSCLE_GROUPS:
-        execute_query(
-            """
-            INSERT INTO muscle_groups(name, description)
-            VALUES(%s, %s)
-            ON CONFLICT (name) DO UPDATE SET description=EXCLUDED.description
-            """,
-            (g["name"], g.get("description")),
-            fetch_all=False,
-            fetch_one=False,
-        )
-
-    # Build name -> id map
-    mg_rows = execute_query("SELECT id, name FROM muscle_groups", fetch_all=True) or []
+    # Upsert muscle groups in one statement; RETURNING covers inserted and updated rows,
+    # so it doubles as the name -> id map
+    mg_rows = execute_values(
+        """
+        INSERT INTO muscle_groups(name, description)
+        VALUES %s
+        ON CONFLICT (name) DO UPDATE SET description=EXCLUDED.description
+        RETURNING id, name
+        """,
+        [(g["name"], g.get("description")) for g in MUSCLE_GROUPS],
+        fetch=True,
+    ) or []
     mg_by_name: Dict[str, int] = {r["name"]: r["id"] for r in mg_rows}
 
-    # Upsert exercises
+    # Upsert exercises (names are unique in EXERCISES, so no row is hit twice by ON CONFLICT)
+    rows = []
     for ex in EXERCISES:
         pmg = mg_by_name.get(ex["primary"])
         sec = [mg_by_name.get(n) for n in (ex.get("secondary") or []) if mg_by_name.get(n) is not None]
-        execute_query(
-            """
-            INSERT INTO exercise_definitions(name, primary_muscle_group_id, secondary_muscle_group_ids, equipment_type, exercise_type)
-            VALUES(%s,%s,%s,%s,%s)
-            ON CONFLICT (name) DO UPDATE SET
-              primary_muscle_group_id=EXCLUDED.primary_muscle_group_id,
-              secondary_muscle_group_ids=EXCLUDED.secondary_muscle_group_ids,
-              equipment_type=EXCLUDED.equipment_type,
-              exercise_type=EXCLUDED.exercise_type
-            """,
-            (ex["name"], pmg, sec, ex["equipment"], ex["etype"]),
-            fetch_all=False,
-            fetch_one=False,
-        )
+        rows.append((ex["name"], pmg, sec, ex["equipment"], ex["etype"]))
+    execute_values(
+        """
+        INSERT INTO exercise_definitions(name, primary_muscle_group_id, secondary_muscle_group_ids, equipment_type, exercise_type)
+        VALUES %s
+        ON CONFLICT (name) DO UPDATE SET
+          primary_muscle_group_id=EXCLUDED.primary_muscle_group_id,
+          secondary_muscle_group_ids=EXCLUDED.secondary_muscle_group_ids,
+          equipment_type=EXCLUDED.equipment_type,
+          exercise_type=EXCLUDED.exercise_type
+        """,
+        rows,
+        template="(%s,%s,%s::int[],%s,%s)",
+    )
 
     print("Seeded strength data: muscle groups and exercises.")
 
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Stream a .sql file statement by statement.
+
+The file is read line by line and split on top-level semicolons, honouring '...' strings,
+"..." identifiers, $tag$ dollar quotes (DO blocks, function bodies), -- line comments and
+/* */ block comments. Memory stays bounded by the largest statement rather than the file,
+and a failing statement is reported with the line it starts on.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+from app.db import execute_raw_script
+
+_DOLLAR_TAG = re.compile(r"\$[A-Za-z_0-9]*\$")
+
+
+def iter_statements(path: Path) -> Iterator[Tuple[int, str]]:
+    """Yield (start_line, statement) for each top-level statement in ``path``."""
+    buf: list[str] = []
+    start = 0
+    quote: str | None = None  # "'", '"', a $tag$, or "/*" while inside a block comment
+    with path.open(encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            i, n = 0, len(line)
+            seg = 0  # start of the not-yet-buffered part of this line
+            while i < n:
+                if quote is None:
+                    ch = line[i]
+                    if ch == "-" and line.startswith("--", i):
+                        break  # rest of the line is a comment; keep it, it is harmless
+                    if ch == "/" and line.startswith("/*", i):
+                        quote, i = "/*", i + 2
+                        continue
+                    if ch in ("'", '"'):
+                        quote, i = ch, i + 1
+                        continue
+                    if ch == "$":
+                        m = _DOLLAR_TAG.match(line, i)
+                        if m:
+                            quote, i = m.group(0), m.end()
+                            continue
+                    if ch == ";":
+                        buf.append(line[seg:i])
+                        stmt = "".join(buf).strip()
+                        if _has_code(stmt):
+                            yield start or lineno, stmt
+                        buf, start, seg = [], 0, i + 1
+                    elif not ch.isspace() and not start:
+                        start = lineno
+                    i += 1
+                else:
+                    close = "*/" if quote == "/*" else quote
+                    j = line.find(close, i)
+                    if j < 0:
+                        i = n
+                    else:
+                        quote, i = None, j + len(close)
+            buf.append(line[seg:])
+    stmt = "".join(buf).strip()
+    if _has_code(stmt):
+        yield start or 1, stmt
+
+
+def _has_code(stmt: str) -> bool:
+    return any(ln.strip() and not ln.lstrip().startswith("--") for ln in stmt.splitlines())
+
+
+def execute_script(conn: Any, path: Path) -> None:
+    """Run every statement of ``path`` on ``conn`` in one transaction and commit."""
+    with conn.cursor() as cur:  # type: ignore[attr-defined]
+        for lineno, stmt in iter_statements(path):
+            try:
+                execute_raw_script(cur, stmt)
+            except Exception as e:
+                raise RuntimeError(f"{path.name}:{lineno}: {e}") from e
+    conn.commit()
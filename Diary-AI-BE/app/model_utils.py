@@ -2,4 +2,6 @@
 Required because various modules use `from model_utils import ...`.
 This forwards to the canonical implementation in `analytics.model_utils`.
 """
-from analytics.model_utils import *  # type: ignore  # noqa: F401,F403
+from analytics.model_utils import MODELS_DIR, load_model, model_path, save_model  # type: ignore
+
+__all__ = ["MODELS_DIR", "load_model", "model_path", "save_model"]
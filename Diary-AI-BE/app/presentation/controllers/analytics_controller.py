@@ -4,14 +4,22 @@ import asyncio
 from typing import Any, Dict
 
 from application.services.analytics_service import AnalyticsService
-from infrastructure.analytics import ActivityAnalytics, SleepAnalytics, StressAnalytics
+from infrastructure.analytics import ActivityAnalytics, SleepAnalytics, StressAnalytics, RecoveryPatternAnalytics
 from domain.repositories.activities import IActivitiesRepository
 from presentation.di import di
 # Note: Avoid direct DB access in controllers; use services/DI. Kept here for the legacy correlations_legacy endpoint (to be moved).
 from infrastructure.analytics import EnhancedHealthAnalytics
 from datetime import date as _date, timedelta as _td
+from functools import lru_cache
 import inspect
 
+# The analytics engines keep no per-request state; share one of each like the other controllers
+_recovery = RecoveryPatternAnalytics()
+_sleep = SleepAnalytics()
+_stress = StressAnalytics()
+_activity = ActivityAnalytics()
+_enh = EnhancedHealthAnalytics()
+
 # Enhanced analytics
 async def enhanced_comprehensive(days: int, svc=None) -> Dict[str, Any]:
     svc = svc or di.analytics_service()
@@ -33,9 +41,27 @@ async def enhanced_recovery(compare: bool, start_date: str | None, end_date: str
     svc = svc or di.analytics_service()
     return await svc.enhanced_recovery(compare=compare, start_date=start_date, end_date=end_date, days=days)
 
+async def recovery_patterns_version(days: int) -> str | None:
+    return await asyncio.to_thread(_recovery.data_version, days)
+
+def recovery_patterns_etag(version: str | None, days: int, baseline_window: int, recent_window: int) -> str | None:
+    return RecoveryPatternAnalytics.etag(version, days, baseline_window, recent_window)
+
+async def recovery_patterns(days: int, baseline_window: int, recent_window: int, version: str | None = None) -> Dict[str, Any]:
+    # No timestamp: the payload must stay identical for a given ETag
+    analysis = await asyncio.to_thread(
+        _recovery.analyze_recovery_patterns, days, baseline_window, recent_window, version
+    )
+    return {
+        "status": "success",
+        "analysis_type": "recovery_patterns",
+        "period_days": days,
+        "recovery_patterns": analysis,
+    }
+
 # Classic analytics (kept here for consolidation)
 async def sleep_comprehensive(days: int) -> Dict[str, Any]:
-    analysis = SleepAnalytics().analyze_sleep_efficiency(days)
+    analysis = await asyncio.to_thread(_sleep.analyze_sleep_efficiency, days)
     return {
         "status": "success",
         "analysis_type": "comprehensive_sleep",
@@ -45,7 +71,7 @@ async def sleep_comprehensive(days: int) -> Dict[str, Any]:
     }
 
 async def stress_comprehensive(days: int) -> Dict[str, Any]:
-    analysis = await asyncio.to_thread(StressAnalytics().analyze_stress_patterns, days)
+    analysis = await asyncio.to_thread(_stress.analyze_stress_patterns, days)
     return {
         "status": "success",
         "analysis_type": "comprehensive_stress",
@@ -55,7 +81,7 @@ async def stress_comprehensive(days: int) -> Dict[str, Any]:
     }
 
 async def activity_comprehensive(days: int) -> Dict[str, Any]:
-    analysis = await asyncio.to_thread(ActivityAnalytics().analyze_activity_patterns, days)
+    analysis = await asyncio.to_thread(_activity.analyze_activity_patterns, days)
     return {
         "status": "success",
         "analysis_type": "comprehensive_activity",
@@ -67,21 +93,15 @@ async def activity_comprehensive(days: int) -> Dict[str, Any]:
 # Debug helpers via repository
 async def debug_running_counts(days: int, repo: IActivitiesRepository | None = None) -> Dict[str, Any]:
     repo = repo or di.activities_repo()
-    total, with_pace = await repo.debug_counts(days)
-    with_vo2 = await repo.vo2_count(days)
-    labels = await repo.labels(days)
-    sample = await repo.debug_sample(days)
-    for r in sample:
-        if r.get('start_time') and hasattr(r['start_time'], 'isoformat'):
-            r['start_time'] = r['start_time'].isoformat()
+    ov = await repo.debug_overview(days)
     return {
         'status': 'success',
         'period_days': days,
-        'total_activities': int(total or 0),
-        'with_pace': int(with_pace or 0),
-        'with_vo2': int(with_vo2 or 0),
-        'sport_labels': labels,
-        'recent_sample': sample,
+        'total_activities': ov['running_count'],
+        'with_pace': ov['running_with_pace'],
+        'with_vo2': ov['with_vo2'],
+        'sport_labels': ov['labels'],
+        'recent_sample': ov['sample'],
     }
 
 async def debug_raw_running_range(start_date: str, end_date: str, repo: IActivitiesRepository | None = None) -> Dict[str, Any]:
@@ -105,36 +125,30 @@ async def compare_periods(period1_days: int, period2_days: int, offset_days: int
     start1 = end1 - _td(days=period1_days - 1)
     end2 = start1 - _td(days=offset_days)
     start2 = end2 - _td(days=period2_days - 1)
-    _enh = EnhancedHealthAnalytics()
-
-    def _fetch_range(s: _date, e: _date):
-        return _enh.get_comprehensive_health_data_range(s.isoformat(), e.isoformat()) or []
-
-    def _avg(nums):
-        vals = [float(x) for x in nums if x is not None]
-        return (sum(vals) / len(vals)) if vals else None
-
-    def _summarize(rows):
-        keys = [
-            "steps",
-            "calories_total",
-            "rhr",
-            "stress_avg",
-            "sleep_score",
-            "time_in_bed_minutes",
-            "mood",
-            "energy_level",
-        ]
-        summary: Dict[str, Any] = {}
-        for k in keys:
-            summary[f"{k}_avg"] = _avg([r.get(k) for r in rows])
-        summary["count"] = len(rows)
+
+    keys = [
+        "steps",
+        "calories_total",
+        "rhr",
+        "stress_avg",
+        "sleep_score",
+        "time_in_bed_minutes",
+        "mood",
+        "energy_level",
+    ]
+
+    def _summarize(s: _date, e: _date) -> Dict[str, Any]:
+        # Averaged in SQL: one row per period instead of every day's full health record
+        row = _enh.get_period_averages(s.isoformat(), e.isoformat()) or {}
+        summary: Dict[str, Any] = {f"{k}_avg": row.get(f"{k}_avg") for k in keys}
+        summary["count"] = int(row.get("count") or 0)
         return summary
 
-    data1 = _fetch_range(start1, end1)
-    data2 = _fetch_range(start2, end2)
-    sum1 = _summarize(data1)
-    sum2 = _summarize(data2)
+    # Both ranges are independent sync queries; run them concurrently off the event loop
+    sum1, sum2 = await asyncio.gather(
+        asyncio.to_thread(_summarize, start1, end1),
+        asyncio.to_thread(_summarize, start2, end2),
+    )
     deltas: Dict[str, Any] = {}
     for k, v in sum1.items():
         if k.endswith("_avg"):
@@ -150,21 +164,27 @@ async def compare_periods(period1_days: int, period2_days: int, offset_days: int
     }
 
 
+@lru_cache(maxsize=1)
+def _activity_source_info() -> Dict[str, Any]:
+    # Fixed for the life of the process; computed on first request rather than at import
+    cls = ActivityAnalytics
+    mod = cls.__module__
+    try:
+        src = inspect.getsourcefile(cls) or inspect.getsourcefile(__import__(mod))
+    except Exception:
+        src = None
+    return {
+        'module': mod,
+        'class': cls.__name__,
+        'source_file': src,
+        # Checked on the class: instantiating ActivityAnalytics just for this is wasted work
+        'has_analyze_running': hasattr(cls, 'analyze_running'),
+    }
+
+
 def debug_activity_source() -> Dict[str, Any]:
     """Return module/file info for ActivityAnalytics class for diagnostics."""
     try:
-        cls = ActivityAnalytics
-        mod = cls.__module__
-        try:
-            src = inspect.getsourcefile(cls) or inspect.getsourcefile(__import__(mod))
-        except Exception:
-            src = None
-        has_method = hasattr(cls(), 'analyze_running')
-        return {
-            'module': mod,
-            'class': cls.__name__,
-            'source_file': src,
-            'has_analyze_running': has_method,
-        }
+        return dict(_activity_source_info())
     except Exception as e:
         return {'error': str(e)}
@@ -45,7 +45,7 @@ def _build_health_brief(days: int = 30) -> str:
 
 async def health_report(days: int = 30, language: str = "en") -> Dict[str, Any]:
     svc = di.llm_service()
-    brief = _build_health_brief(days)
+    brief = await asyncio.to_thread(_build_health_brief, days)
     system_prompt = (
         "You are a health and sports assistant. You will receive a summary of trends and insights. "
         "Prepare a concise report (max 400–600 words) in English, including: \n"
@@ -80,8 +80,9 @@ def latest_report(language: Optional[str] = None) -> Dict[str, Any]:
 
 
 async def generate_and_store(days: int = 30, language: str = "en") -> Dict[str, Any]:
-    ensure_table()
-    brief = _build_health_brief(days)
+    # Sync DB/analytics work runs off the event loop
+    await asyncio.to_thread(ensure_table)
+    brief = await asyncio.to_thread(_build_health_brief, days)
     system_prompt = (
         "You are a health and sports assistant. You will receive a summary of trends and insights. "
         "Prepare a concise report (max 400–600 words) in English."
@@ -96,5 +97,5 @@ async def generate_and_store(days: int = 30, language: str = "en") -> Dict[str,
     res = await svc.chat(messages, temperature=0.2, max_tokens=700, top_p=0.9)
     content = res.get("content", "")
     today = date.today().isoformat()
-    saved = upsert_report(today, language, days, content, res.get("raw"))
+    saved = await asyncio.to_thread(upsert_report, today, language, days, content, res.get("raw"))
     return {"status": "success", "saved": saved}
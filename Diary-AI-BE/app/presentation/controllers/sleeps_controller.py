@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from application.services.sleeps_service import SleepsService
 from presentation.di import di
 
@@ -7,6 +7,10 @@ async def latest(limit: int, offset: int, start_date: Optional[str], end_date: O
     svc = svc or di.sleeps_service()
     return await svc.latest(limit, offset, start_date, end_date)
 
+def export(start_date: Optional[str], end_date: Optional[str], svc=None) -> AsyncIterator[Dict[str, Any]]:
+    svc = svc or di.sleeps_service()
+    return svc.export(start_date, end_date)
+
 async def detail(sleep_id: int, svc=None) -> Dict[str, Any]:
     svc = svc or di.sleeps_service()
     return await svc.detail(sleep_id)
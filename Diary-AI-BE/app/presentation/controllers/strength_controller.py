@@ -4,108 +4,108 @@ from typing import Optional
 from presentation.di import di
 
 
-def list_muscle_groups(svc=None) -> list:
+async def list_muscle_groups(svc=None) -> list:
     svc = svc or di.strength_service()
-    return svc.list_muscle_groups()
+    return await svc.list_muscle_groups()
 
 
-def search_exercises(query: str | None = None, muscle_group_id: int | None = None, svc=None) -> list:
+async def search_exercises(query: str | None = None, muscle_group_id: int | None = None, svc=None) -> list:
     svc = svc or di.strength_service()
-    return svc.search_exercises(query=query, muscle_group_id=muscle_group_id)
+    return await svc.search_exercises(query=query, muscle_group_id=muscle_group_id)
 
 
-def list_exercises(svc=None) -> list:
+async def list_exercises(svc=None) -> list:
     svc = svc or di.strength_service()
-    return svc.list_exercises()
+    return await svc.list_exercises()
 
 
-def create_workout(payload: dict, svc=None) -> dict:
+async def create_workout(payload: dict, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.save_workout(payload)
+    return await svc.save_workout(payload)
 
 
-def get_workout(workout_id: int, svc=None) -> dict | None:
+async def get_workout(workout_id: int, svc=None) -> dict | None:
     svc = svc or di.strength_service()
-    return svc.get_workout(workout_id)
+    return await svc.get_workout(workout_id)
 
 
-def list_workouts(limit: int = 50, offset: int = 0, svc=None) -> list:
+async def list_workouts(limit: int = 50, offset: int = 0, svc=None) -> list:
     svc = svc or di.strength_service()
-    return svc.list_workouts(limit=limit, offset=offset)
+    return await svc.list_workouts(limit=limit, offset=offset)
 
 
-def delete_workout(workout_id: int, svc=None) -> bool:
+async def delete_workout(workout_id: int, svc=None) -> bool:
     svc = svc or di.strength_service()
-    return svc.delete_workout(workout_id)
+    return await svc.delete_workout(workout_id)
 
-def update_workout(workout_id: int, payload: dict, svc=None) -> dict:
+async def update_workout(workout_id: int, payload: dict, svc=None) -> dict | None:
     svc = svc or di.strength_service()
-    return svc.update_workout(workout_id, payload)
+    return await svc.update_workout(workout_id, payload)
 
 
-def suggestion_for_next(exercise_definition_id: int, svc=None) -> dict | None:
+async def suggestion_for_next(exercise_definition_id: int, svc=None) -> dict | None:
     svc = svc or di.strength_service()
-    return svc.suggestion_for_next(exercise_definition_id=exercise_definition_id)
+    return await svc.suggestion_for_next(exercise_definition_id=exercise_definition_id)
 
 
-def exercise_stats(exercise_definition_id: int, svc=None) -> dict:
+async def exercise_stats(exercise_definition_id: int, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.exercise_stats(exercise_definition_id)
+    return await svc.exercise_stats(exercise_definition_id)
 
 
-def muscle_group_weekly_volume(muscle_group_id: int, weeks: int = 12, svc=None) -> dict:
+async def muscle_group_weekly_volume(muscle_group_id: int, weeks: int = 12, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.muscle_group_weekly_volume(muscle_group_id, weeks)
+    return await svc.muscle_group_weekly_volume(muscle_group_id, weeks)
 
 
-def exercise_contribution_last_month(muscle_group_id: int, days: int = 30, svc=None) -> dict:
+async def exercise_contribution_last_month(muscle_group_id: int, days: int = 30, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.exercise_contribution_last_month(muscle_group_id, days)
+    return await svc.exercise_contribution_last_month(muscle_group_id, days)
 
 
-def weekly_training_frequency(muscle_group_id: int, weeks: int = 12, svc=None) -> dict:
+async def weekly_training_frequency(muscle_group_id: int, weeks: int = 12, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.weekly_training_frequency(muscle_group_id, weeks)
+    return await svc.weekly_training_frequency(muscle_group_id, weeks)
 
 
-def exercise_history(exercise_definition_id: int, limit: int = 20, svc=None) -> dict:
+async def exercise_history(exercise_definition_id: int, limit: int = 20, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.exercise_history(exercise_definition_id, limit)
+    return await svc.exercise_history(exercise_definition_id, limit)
 
-def exercise_e1rm_progress(exercise_definition_id: int, svc=None) -> dict:
+async def exercise_e1rm_progress(exercise_definition_id: int, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.exercise_e1rm_progress(exercise_definition_id)
+    return await svc.exercise_e1rm_progress(exercise_definition_id)
 
-def workouts_overview(days: int = 90, svc=None) -> dict:
+async def workouts_overview(days: int = 90, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.workouts_volume_series(days)
+    return await svc.workouts_volume_series(days)
 
-def exercise_summary(exercise_definition_id: int, days: int = 180, svc=None) -> dict:
+async def exercise_summary(exercise_definition_id: int, days: int = 180, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.exercise_summary(exercise_definition_id, days)
+    return await svc.exercise_summary(exercise_definition_id, days)
 
-def top_progress(days: int = 90, limit: int = 5, svc=None) -> dict:
+async def top_progress(days: int = 90, limit: int = 5, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.top_progress(days, limit)
+    return await svc.top_progress(days, limit)
 
-def strength_correlations(days: int = 90, svc=None) -> dict:
+async def strength_correlations(days: int = 90, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.correlations(days)
+    return await svc.correlations(days)
 
 
-def list_templates(svc=None) -> list:
+async def list_templates(svc=None) -> list:
     svc = svc or di.strength_service()
-    return svc.list_templates()
+    return await svc.list_templates()
 
 
-def upsert_template(tpl: dict, svc=None) -> dict:
+async def upsert_template(tpl: dict, svc=None) -> dict:
     svc = svc or di.strength_service()
-    return svc.upsert_template(tpl)
+    return await svc.upsert_template(tpl)
 
 
-def delete_template(tpl_id: str, svc=None) -> bool:
+async def delete_template(tpl_id: str, svc=None) -> bool:
     svc = svc or di.strength_service()
-    return svc.delete_template(tpl_id)
+    return await svc.delete_template(tpl_id)
 
 __all__ = [
     "list_muscle_groups",
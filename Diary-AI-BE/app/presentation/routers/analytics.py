@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 from __future__ import annotations
+import asyncio
 from datetime import datetime
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
 from presentation.http import http_error
 from app.db import async_execute_query
 from infrastructure.analytics import (
@@ -59,6 +60,39 @@ async def enhanced_recovery(
     except Exception as e:  # pragma: no cover
         return http_error(str(e), 500)
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(',')]
+    return '*' in tags or any(t.removeprefix('W/') == etag for t in tags)
+
+@router.get("/analytics/recovery/patterns")
+async def recovery_patterns(
+    request: Request,
+    response: Response,
+    days: int = Query(90, ge=1, le=365),
+    baseline_window: int = Query(30, ge=1, le=365),
+    recent_window: int = Query(7, ge=1, le=90),
+):
+    """Recovery pattern analysis with ETag revalidation.
+
+    The ETag is derived from a DB-side version of the analysed rows (read once per request and
+    shared with the memoized payload), so it changes on any re-sync or journal edit, agrees across
+    workers, and dashboard polls sending If-None-Match get a bodiless 304 without the analysis.
+    """
+    try:
+        version = await ctl.recovery_patterns_version(days)
+        etag = ctl.recovery_patterns_etag(version, days, baseline_window, recent_window)
+        tag = f'"{etag}"' if etag else None
+        if tag and _etag_matches(request.headers.get('if-none-match'), tag):
+            return Response(status_code=304, headers={'ETag': tag})
+        payload = await ctl.recovery_patterns(days, baseline_window, recent_window, version)
+        if tag:
+            response.headers['ETag'] = tag
+        return payload
+    except Exception as e:  # pragma: no cover
+        return http_error(str(e), 500)
+
 @router.get("/analytics/sleep/comprehensive")
 async def sleep_comprehensive(days: int = Query(30, ge=1, le=365)):
     try:
@@ -86,6 +120,7 @@ async def running_comprehensive(
     days: int = Query(90, ge=1, le=365),
     start_date: str | None = Query(None, description="Optional explicit start date (YYYY-MM-DD)"),
     end_date: str | None = Query(None, description="Optional explicit end date (YYYY-MM-DD)"),
+    weekly_limit: int | None = Query(None, ge=1, le=520, description="Optional number of most recent weeks to return"),
 ):
     """Comprehensive running analytics with optional explicit date range.
 
@@ -93,27 +128,31 @@ async def running_comprehensive(
     Returned data will have ascending runs list so the newest dates render at the right end of an X axis naturally.
     """
     try:
-        analysis = _activity.analyze_running(days, start_date=start_date, end_date=end_date)
+        analysis = await asyncio.to_thread(
+            _activity.analyze_running, days, start_date=start_date, end_date=end_date, weekly_limit=weekly_limit
+        )
         # Run a raw diagnostic SQL (mirrors the analyzer's COALESCE filter) to compare results
         raw_sample = None
         try:
             if start_date and end_date:
-                q = f"""
+                q = """
                 SELECT activity_id, sport, start_time, day, distance, avg_pace
                 FROM garmin_activities
-                WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
-                  AND (COALESCE(day, start_time::date) BETWEEN '{start_date}' AND '{end_date}')
+                WHERE LOWER(sport) IN ('running', 'run')
+                  AND (COALESCE(day, start_time::date) BETWEEN %s AND %s)
                 ORDER BY start_time DESC LIMIT 20
                 """
+                q_params = (start_date, end_date)
             else:
-                q = f"""
+                q = """
                 SELECT activity_id, sport, start_time, day, distance, avg_pace
                 FROM garmin_activities
-                WHERE (LOWER(sport) = 'running' OR LOWER(sport) = 'run')
-                  AND (COALESCE(day, start_time::date) >= (CURRENT_DATE - INTERVAL '{days} days'))
+                WHERE LOWER(sport) IN ('running', 'run')
+                  AND (COALESCE(day, start_time::date) >= (CURRENT_DATE - make_interval(days => %s)))
                 ORDER BY start_time DESC LIMIT 20
                 """
-            raw_rows = await async_execute_query(q) or []
+                q_params = (days,)
+            raw_rows = await async_execute_query(q, q_params) or []
             for r in raw_rows:
                 if r.get('start_time') and hasattr(r['start_time'], 'isoformat'):
                     r['start_time'] = r['start_time'].isoformat()
@@ -53,31 +53,31 @@ class SessionModel(BaseModel):
 from application.services.gym_service import GymService  # kept import for typing/forward ref; instance not needed
 
 @router.get('/templates', response_model=list[TemplateModel])
-def list_templates():
-    return ctl.list_templates()
+async def list_templates():
+    return await ctl.list_templates()
 
 @router.post('/templates', response_model=TemplateModel)
-def upsert_template(tpl: TemplateModel):
-    return TemplateModel(**ctl.upsert_template(tpl.model_dump()))
+async def upsert_template(tpl: TemplateModel):
+    return TemplateModel(**await ctl.upsert_template(tpl.model_dump()))
 
 @router.delete('/templates/{tpl_id}')
-def delete_template(tpl_id: str):
-    ok = ctl.delete_template(tpl_id)
+async def delete_template(tpl_id: str):
+    ok = await ctl.delete_template(tpl_id)
     if not ok:
         raise HTTPException(status_code=404, detail='Template not found')
     return {'status': 'ok'}
 
 @router.get('/sessions', response_model=list[SessionModel])
-def list_sessions():
-    return ctl.list_sessions()
+async def list_sessions():
+    return await ctl.list_sessions()
 
 @router.post('/sessions', response_model=SessionModel)
-def upsert_session(session: SessionModel):
-    return SessionModel(**ctl.upsert_session(session.model_dump()))
+async def upsert_session(session: SessionModel):
+    return SessionModel(**await ctl.upsert_session(session.model_dump()))
 
 @router.delete('/sessions/{session_id}')
-def delete_session(session_id: str):
-    ok = ctl.delete_session(session_id)
+async def delete_session(session_id: str):
+    ok = await ctl.delete_session(session_id)
     if not ok:
         raise HTTPException(status_code=404, detail='Session not found')
     return {'status': 'ok'}
@@ -89,16 +89,16 @@ class Manual1RMEntry(BaseModel):
     date: datetime
 
 @router.get('/manual-1rm', response_model=list[Manual1RMEntry])
-def list_manual_1rm():
-    return ctl.list_manual_1rm()
+async def list_manual_1rm():
+    return await ctl.list_manual_1rm()
 
 @router.post('/manual-1rm', response_model=Manual1RMEntry)
-def upsert_manual_1rm(entry: Manual1RMEntry):
-    return Manual1RMEntry(**ctl.upsert_manual_1rm(entry.model_dump()))
+async def upsert_manual_1rm(entry: Manual1RMEntry):
+    return Manual1RMEntry(**await ctl.upsert_manual_1rm(entry.model_dump()))
 
 @router.delete('/manual-1rm/{entry_id}')
-def delete_manual_1rm(entry_id: str):
-    ok = ctl.delete_manual_1rm(entry_id)
+async def delete_manual_1rm(entry_id: str):
+    ok = await ctl.delete_manual_1rm(entry_id)
     if not ok:
         raise HTTPException(status_code=404, detail='Entry not found')
     return {'status': 'ok'}
@@ -1,5 +1,7 @@
 from __future__ import annotations
+import json
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from schemas import SleepListResponse, SleepDetailResponse, SleepSession
 from pydantic import BaseModel
 from datetime import datetime, date
@@ -39,6 +41,14 @@ async def get_latest_sleeps(
     except Exception as e:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/sleeps/export")
+async def export_sleeps(start_date: str | None = None, end_date: str | None = None):
+    """All sessions in range as NDJSON, streamed from a server-side cursor (newest first)."""
+    async def lines():
+        async for item in ctl.export(start_date, end_date):
+            yield json.dumps(item, default=str) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @router.get("/sleeps/{sleep_id}", response_model=SleepDetailResponse)
 async def get_sleep_detail(sleep_id: int):
     try:
@@ -112,11 +112,11 @@ def check_data_availability() -> bool:
         for table, min_records, date_col, window in tables_to_check:
             query = (
                 f"SELECT COUNT(*) as count FROM {table} "
-                f"WHERE {date_col} >= CURRENT_DATE - INTERVAL '{window} days'"
+                f"WHERE {date_col} >= CURRENT_DATE - make_interval(days => %s)"
             )
 
             try:
-                result = execute_query(query, fetch_one=True)
+                result = execute_query(query, (window,), fetch_one=True)
                 count = result.get("count", 0) if result else 0
                 if count >= min_records:
                     LOGGER.info("   ✅ %s: %d records (last %d days)", table, count, window)
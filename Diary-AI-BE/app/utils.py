@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
 import os
 from pathlib import Path
@@ -32,11 +33,13 @@ def get_logger(name: str | None = None) -> logging.Logger:
     return logging.getLogger(name if name else __name__)
 
 
+@lru_cache(maxsize=1)
 def scripts_dir() -> Path:
-    """Return the scripts directory (this file's parent)."""
+    """Return the scripts directory (this file's parent). Resolved once per process."""
     return Path(__file__).resolve().parent
 
 
+@lru_cache(maxsize=1)
 def project_dir() -> Path:
     """Return the project root directory (parent of scripts)."""
     return scripts_dir().parent